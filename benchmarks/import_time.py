@@ -0,0 +1,85 @@
+"""
+Import-time benchmark for CF-Ares.
+
+Measures how long ``import cf_ares`` takes in a fresh interpreter and checks
+that no browser stack (selenium, seleniumbase, undetected-chromedriver) is
+loaded as a side effect.
+
+Usage:
+    python -m benchmarks.import_time [--runs 10] [--module cf_ares]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+BROWSER_PACKAGES = ("selenium", "seleniumbase", "undetected_chromedriver")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = sorted({{name.split(".")[0] for name in sys.modules}} & set({packages!r}))
+print(json.dumps({{"seconds": elapsed, "browser_packages": loaded}}))
+"""
+
+
+def measure_once(module: str = "cf_ares") -> Dict[str, Any]:
+    """
+    Import a module in a fresh interpreter.
+
+    Args:
+        module: Module to import.
+
+    Returns:
+        Dict[str, Any]: Import time in seconds and the browser packages that were loaded.
+    """
+    code = _PROBE.format(module=module, packages=BROWSER_PACKAGES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs: int = 10, module: str = "cf_ares") -> Dict[str, Any]:
+    """
+    Run the import benchmark several times.
+
+    Args:
+        runs: Number of fresh interpreters to start.
+        module: Module to import.
+
+    Returns:
+        Dict[str, Any]: Summary statistics.
+    """
+    samples: List[Dict[str, Any]] = [measure_once(module) for _ in range(runs)]
+    times = [sample["seconds"] for sample in samples]
+    loaded = sorted({pkg for sample in samples for pkg in sample["browser_packages"]})
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": statistics.median(times) * 1000,
+        "min_ms": min(times) * 1000,
+        "max_ms": max(times) * 1000,
+        "browser_packages": loaded,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--module", default="cf_ares")
+    args = parser.parse_args()
+
+    result = run(args.runs, args.module)
+    print(json.dumps(result, indent=2))
+    if result["browser_packages"]:
+        sys.exit(f"import {args.module} loaded browser packages: {result['browser_packages']}")
+
+
+if __name__ == "__main__":
+    main()
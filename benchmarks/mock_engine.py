@@ -0,0 +1,158 @@
+"""
+Mock browser engine for the benchmarks.
+
+MockBrowserEngine implements BaseEngine without a browser: launching,
+navigating and solving only sleep for configurable times, and the "solved"
+session carries a cf_clearance cookie that the benchmark server accepts. It
+measures everything CF-Ares does around a solve, minus the browser itself.
+"""
+
+import secrets
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from cf_ares.engines.base import BaseEngine, BrowserPage
+from cf_ares.engines.registry import register_engine
+
+ENGINE_NAME = "mock"
+
+
+class MockBrowserEngine(BaseEngine):
+    """Browser engine that solves challenges by sleeping."""
+
+    # Defaults, overridable per engine through the constructor or engine_options
+    launch_delay = 0.0
+    navigate_delay = 0.0
+    solve_delay = 0.05
+
+    solves = 0
+    _count_lock = threading.Lock()
+
+    def __init__(
+        self,
+        headless: bool = True,
+        proxy: Optional[str] = None,
+        timeout: int = 30,
+        fingerprint: Optional[str] = None,
+        launch_delay: Optional[float] = None,
+        navigate_delay: Optional[float] = None,
+        solve_delay: Optional[float] = None,
+        **kwargs: Any,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            headless: Ignored.
+            proxy: Ignored.
+            timeout: Ignored.
+            fingerprint: Ignored.
+            launch_delay: Seconds a browser launch takes. Defaults to the class setting.
+            navigate_delay: Seconds loading a page takes. Defaults to the class setting.
+            solve_delay: Seconds a challenge takes to clear. Defaults to the class setting.
+            **kwargs: Other engine options, ignored.
+        """
+        super().__init__(headless, proxy, timeout, fingerprint)
+        if launch_delay is not None:
+            self.launch_delay = launch_delay
+        if navigate_delay is not None:
+            self.navigate_delay = navigate_delay
+        if solve_delay is not None:
+            self.solve_delay = solve_delay
+        self.running = False
+        self.url: Optional[str] = None
+        self.token: Optional[str] = None
+
+    def start(self) -> None:
+        """Launch the mock browser if it is not already running."""
+        if not self.running:
+            time.sleep(self.launch_delay)
+            self.running = True
+
+    @property
+    def is_running(self) -> bool:
+        """
+        Whether the mock browser is running.
+
+        Returns:
+            bool: True if it is running.
+        """
+        return self.running
+
+    def get(self, url: str) -> Any:
+        """
+        Visit a URL.
+
+        Args:
+            url: URL to visit.
+
+        Returns:
+            Any: None.
+        """
+        self.start()
+        time.sleep(self.navigate_delay)
+        self.url = url
+        self.token = None
+        return None
+
+    def wait_for_cloudflare(self) -> bool:
+        """
+        Wait for the mock challenge to clear.
+
+        Returns:
+            bool: True.
+        """
+        time.sleep(self.solve_delay)
+        self.token = secrets.token_hex(16)
+        with MockBrowserEngine._count_lock:
+            MockBrowserEngine.solves += 1
+        self.last_wait_timings = {"detect": 0.0, "solve": self.solve_delay, "settle": 0.0}
+        return True
+
+    def get_cookies(self) -> Dict[str, str]:
+        """
+        Get the cookies of the solved session.
+
+        Returns:
+            Dict[str, str]: Cookies as a dictionary.
+        """
+        return {"cf_clearance": self.token} if self.token else {}
+
+    def get_cookie_expiry(self) -> Dict[str, float]:
+        """
+        Get the expiry time of the cookies of the solved session.
+
+        Returns:
+            Dict[str, float]: Unix expiry time by cookie name.
+        """
+        return {"cf_clearance": time.time() + 3600} if self.token else {}
+
+    def get_headers(self) -> Dict[str, str]:
+        """
+        Get the headers of the mock browser.
+
+        Returns:
+            Dict[str, str]: Headers as a dictionary.
+        """
+        return {"User-Agent": "Mozilla/5.0 (cf-ares benchmark)"}
+
+    def get_page(self) -> Optional[BrowserPage]:
+        """
+        Get the page the mock browser displays.
+
+        Returns:
+            Optional[BrowserPage]: Page snapshot, or None before the first visit.
+        """
+        if self.url is None:
+            return None
+        return BrowserPage(self.url, b"<html>solved</html>", self.get_cookies())
+
+    def close(self) -> None:
+        """Close the mock browser."""
+        self.running = False
+
+
+def register() -> None:
+    """Register MockBrowserEngine as the "mock" browser engine."""
+    register_engine(ENGINE_NAME, MockBrowserEngine)
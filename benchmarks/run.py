@@ -0,0 +1,454 @@
+"""
+Throughput and latency benchmarks for CF-Ares.
+
+Runs entirely on localhost against benchmarks.server with the mock browser
+engine, so results measure CF-Ares itself: CurlEngine, SessionManager and the
+AresClient / AsyncAresClient request and solve orchestration. Each workload
+reports requests per second, p50/p95/p99 latency and the process RSS.
+Results can be saved as a JSON baseline and compared with a later run.
+
+Usage:
+    python -m benchmarks.run [--requests 500] [--concurrency 8] [--latency 0]
+        [--body-size 1024] [--solve-delay 0.05] [--http2]
+        [--workloads curl_sequential,client_threaded] [--save baseline.json]
+        [--compare baseline.json] [--tolerance 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from benchmarks.mock_engine import ENGINE_NAME, MockBrowserEngine, register
+from benchmarks.server import CHALLENGE_PATH, BenchServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def rss_mb() -> Optional[float]:
+    """
+    Get the resident set size of this process.
+
+    Returns:
+        Optional[float]: Current RSS in MiB on Linux, peak RSS on other Unix
+            systems, or None where neither is available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    except (OSError, AttributeError, IndexError, ValueError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """
+    Get a percentile of sorted samples by the nearest-rank method.
+
+    Args:
+        samples: Samples in ascending order.
+        fraction: Percentile as a fraction, e.g. 0.95.
+
+    Returns:
+        float: Percentile, or 0 for no samples.
+    """
+    if not samples:
+        return 0.0
+    rank = max(int(fraction * len(samples) + 0.999999) - 1, 0)
+    return samples[min(rank, len(samples) - 1)]
+
+
+def summarize(name: str, latencies: List[float], seconds: float, errors: int = 0) -> Dict[str, Any]:
+    """
+    Summarise one workload.
+
+    Args:
+        name: Workload name.
+        latencies: Per-operation latencies in seconds.
+        seconds: Wall-clock time of the workload.
+        errors: Number of failed operations.
+
+    Returns:
+        Dict[str, Any]: Operation count, throughput, latency percentiles in
+            milliseconds and RSS in MiB.
+    """
+    latencies = sorted(latencies)
+    return {
+        "name": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": seconds,
+        "rps": len(latencies) / seconds if seconds > 0 else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "rss_mb": rss_mb(),
+    }
+
+
+def timed_loop(name: str, operation: Callable[[int], Any], count: int, concurrency: int = 1) -> Dict[str, Any]:
+    """
+    Run an operation count times, sequentially or on a thread pool.
+
+    Args:
+        name: Workload name.
+        operation: Callable taking the operation index.
+        count: Number of operations.
+        concurrency: Number of threads; 1 runs on the calling thread.
+
+    Returns:
+        Dict[str, Any]: Workload summary.
+    """
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(index: int) -> None:
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            operation(index)
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        for index in range(count):
+            one(index)
+    else:
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(executor.map(one, range(count)))
+    return summarize(name, latencies, time.perf_counter() - start, errors)
+
+
+class Benchmarks:
+    """Benchmark workloads sharing one server configuration."""
+
+    def __init__(
+        self,
+        server: BenchServer,
+        requests: int = 500,
+        concurrency: int = 8,
+        solve_delay: float = 0.05,
+    ):
+        """
+        Initialize the workloads.
+
+        Args:
+            server: Running benchmark server.
+            requests: Operations per workload.
+            concurrency: Threads or concurrent tasks in the parallel workloads.
+            solve_delay: Seconds the mock browser takes per challenge.
+        """
+        self.server = server
+        self.requests = requests
+        self.concurrency = concurrency
+        self.solve_delay = solve_delay
+        self.request_kwargs: Dict[str, Any] = {}
+        if server.http2:
+            from curl_cffi.const import CurlHttpVersion
+
+            self.request_kwargs["http_version"] = CurlHttpVersion.V2_PRIOR_KNOWLEDGE
+        register()
+
+    def _client_options(self) -> Dict[str, Any]:
+        return {
+            "browser_engine": ENGINE_NAME,
+            "engine_options": {"solve_delay": self.solve_delay},
+        }
+
+    def curl_sequential(self) -> Dict[str, Any]:
+        """Plain CurlEngine GETs on one connection, without session handling."""
+        from cf_ares.engines.curl import CurlEngine
+
+        engine = CurlEngine()
+        url = self.server.url("/")
+        try:
+            return timed_loop(
+                "curl_sequential", lambda _: engine.request("GET", url, **self.request_kwargs), self.requests
+            )
+        finally:
+            engine.close()
+
+    def client_sequential(self) -> Dict[str, Any]:
+        """AresClient GETs of a challenge-protected path; the first one solves."""
+        from cf_ares import AresClient
+
+        url = self.server.url(f"{CHALLENGE_PATH}/page")
+        with AresClient(**self._client_options()) as client:
+            return timed_loop(
+                "client_sequential", lambda _: _check(client.get(url, **self.request_kwargs)), self.requests
+            )
+
+    def client_threaded(self) -> Dict[str, Any]:
+        """Thread-safe AresClient shared by a thread pool, across a few hosts."""
+        from cf_ares import AresClient
+
+        # 127.0.0.1 and localhost are distinct session keys, so two solves run
+        port = self.server.base_url.rsplit(":", 1)[1]
+        urls = [f"http://{host}:{port}{CHALLENGE_PATH}/page" for host in ("127.0.0.1", "localhost")]
+        with AresClient(thread_safe=True, **self._client_options()) as client:
+            return timed_loop(
+                "client_threaded",
+                lambda i: _check(client.get(urls[i % len(urls)], **self.request_kwargs)),
+                self.requests,
+                self.concurrency,
+            )
+
+    def client_async(self) -> Dict[str, Any]:
+        """AsyncAresClient GETs with a fixed number of concurrent tasks."""
+        from cf_ares import AsyncAresClient
+
+        url = self.server.url(f"{CHALLENGE_PATH}/page")
+
+        async def workload() -> Dict[str, Any]:
+            latencies: List[float] = []
+            errors = 0
+            queue = iter(range(self.requests))
+            async with AsyncAresClient(max_clients=self.concurrency, **self._client_options()) as client:
+
+                async def worker() -> None:
+                    nonlocal errors
+                    for _ in queue:
+                        start = time.perf_counter()
+                        try:
+                            _check(await client.get(url, **self.request_kwargs))
+                        except Exception:
+                            errors += 1
+                            continue
+                        latencies.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+                return summarize("client_async", latencies, time.perf_counter() - start, errors)
+
+        return asyncio.run(workload())
+
+    def solve(self) -> Dict[str, Any]:
+        """
+        Explicit solve_challenge calls, verified from the browser page; latency
+        minus solve_delay is the orchestration overhead of a solve.
+        """
+        from cf_ares import AresClient
+
+        url = self.server.url(f"{CHALLENGE_PATH}/page")
+        count = max(self.requests // 25, 5)
+        with AresClient(**self._client_options()) as client:
+            return timed_loop("solve", lambda _: client.solve_challenge(url), count)
+
+    def session_manager(self) -> Dict[str, Any]:
+        """SessionManager update and lookup across many domains, without I/O."""
+        from cf_ares.utils.session import SessionManager
+
+        manager = SessionManager()
+        cookies = {"cf_clearance": "x" * 40}
+        headers = {"User-Agent": "Mozilla/5.0 (cf-ares benchmark)"}
+        expiry = {"cf_clearance": time.time() + 3600}
+        domains = max(self.requests // 10, 1)
+
+        def operation(index: int) -> None:
+            url = f"https://www{index % domains}.example.com/path"
+            if index < domains:
+                manager.update(url, cookies, headers, expiry)
+            elif manager.get(url) is None:
+                raise AssertionError(f"lost session for {url}")
+
+        return timed_loop("session_manager", operation, self.requests * 20)
+
+
+WORKLOADS = ("curl_sequential", "client_sequential", "client_threaded", "client_async", "solve", "session_manager")
+
+
+def _check(response: Any) -> Any:
+    """
+    Fail a benchmark operation that did not get the real page.
+
+    Args:
+        response: Response.
+
+    Returns:
+        Any: The response.
+    """
+    if response.status_code != 200:
+        raise AssertionError(f"unexpected status {response.status_code}")
+    return response
+
+
+def run(
+    workloads: Sequence[str] = WORKLOADS,
+    requests: int = 500,
+    concurrency: int = 8,
+    latency: float = 0.0,
+    body_size: int = 1024,
+    solve_delay: float = 0.05,
+    http2: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run benchmark workloads against a fresh local server.
+
+    Args:
+        workloads: Names of the workloads to run, see WORKLOADS.
+        requests: Operations per workload.
+        concurrency: Threads or concurrent tasks in the parallel workloads.
+        latency: Server response latency in seconds.
+        body_size: Server response body size in bytes.
+        solve_delay: Seconds the mock browser takes per challenge.
+        http2: Use cleartext HTTP/2 instead of HTTP/1.1.
+
+    Returns:
+        Dict[str, Any]: Run metadata and the summary of each workload.
+
+    Raises:
+        ValueError: If a workload name is unknown.
+    """
+    unknown = set(workloads) - set(WORKLOADS)
+    if unknown:
+        raise ValueError(f"Unknown workloads: {sorted(unknown)}")
+
+    import curl_cffi
+
+    from cf_ares import __version__
+
+    results: Dict[str, Any] = {}
+    solves_before = MockBrowserEngine.solves
+    with BenchServer(latency=latency, body_size=body_size, http2=http2) as server:
+        benchmarks = Benchmarks(server, requests, concurrency, solve_delay)
+        for name in workloads:
+            results[name] = getattr(benchmarks, name)()
+        challenges = server.site.challenges
+
+    return {
+        "meta": {
+            "cf_ares": __version__,
+            "curl_cffi": getattr(curl_cffi, "__version__", None),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.time(),
+            "options": {
+                "requests": requests,
+                "concurrency": concurrency,
+                "latency": latency,
+                "body_size": body_size,
+                "solve_delay": solve_delay,
+                "http2": http2,
+            },
+            "solves": MockBrowserEngine.solves - solves_before,
+            "challenges_served": challenges,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """
+    Find regressions against a baseline.
+
+    A workload regresses if its throughput dropped, or its p95 latency grew,
+    by more than the tolerance.
+
+    Args:
+        baseline: Result of an earlier run().
+        current: Result of this run().
+        tolerance: Allowed relative change, e.g. 0.2 for 20%.
+
+    Returns:
+        List[str]: One line per regression; empty if there are none.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        if before["rps"] > 0 and result["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {result['rps']:.0f} req/s, baseline {before['rps']:.0f} req/s")
+        if before["p95_ms"] > 0 and result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']:.2f} ms, baseline {before['p95_ms']:.2f} ms")
+    return regressions
+
+
+def format_table(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Render results as a text table.
+
+    Args:
+        result: Result of run().
+        baseline: Optional earlier result to show throughput changes against.
+
+    Returns:
+        str: Table.
+    """
+    lines = [f"{'workload':<18}{'req/s':>11}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'RSS MiB':>10}{'errors':>8}"]
+    for name, row in result["results"].items():
+        rss = f"{row['rss_mb']:.1f}" if row["rss_mb"] is not None else "-"
+        line = (
+            f"{name:<18}{row['rps']:>11.1f}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}"
+            f"{row['p99_ms']:>10.2f}{rss:>10}{row['errors']:>8}"
+        )
+        before = (baseline or {}).get("results", {}).get(name)
+        if before and before["rps"] > 0:
+            line += f"  ({row['rps'] / before['rps'] - 1:+.1%} req/s)"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--body-size", type=int, default=1024)
+    parser.add_argument("--solve-delay", type=float, default=0.05)
+    parser.add_argument("--http2", action="store_true")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS))
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare with a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    result = run(
+        [name for name in args.workloads.split(",") if name],
+        requests=args.requests,
+        concurrency=args.concurrency,
+        latency=args.latency,
+        body_size=args.body_size,
+        solve_delay=args.solve_delay,
+        http2=args.http2,
+    )
+    print(json.dumps(result, indent=2) if args.json else format_table(result, baseline))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare(baseline, result, args.tolerance)
+        if regressions:
+            sys.exit("Regressions against baseline:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Local stand-in for a Cloudflare-protected site, used by the benchmarks.
+
+Serves HTTP/1.1 with the standard library and, when the optional ``h2``
+package is installed, cleartext HTTP/2 with prior knowledge (h2c). Every
+response waits ``latency`` seconds and returns ``body_size`` bytes; both can
+be overridden per request with the ``latency`` and ``size`` query
+parameters. Paths under ``/challenge`` answer with a Cloudflare-style
+interstitial until the request carries a ``cf_clearance`` cookie.
+
+Usage:
+    python -m benchmarks.server [--port 8080] [--latency 0.01] [--body-size 1024] [--http2]
+"""
+
+import argparse
+import socket
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+CHALLENGE_PATH = "/challenge"
+CLEARANCE_COOKIE = "cf_clearance"
+
+INTERSTITIAL = (
+    b"<!DOCTYPE html><html><head><title>Just a moment...</title></head>"
+    b"<body><div id=\"cf-challenge-running\"></div>"
+    b"<script src=\"/cdn-cgi/challenge-platform/h/g/orchestrate/chl_page/v1\"></script>"
+    b"</body></html>"
+)
+
+
+class Reply:
+    """Status, headers and body of a stand-in response."""
+
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: List[Tuple[str, str]], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class Site:
+    """Response logic shared by the HTTP/1.1 and HTTP/2 front ends."""
+
+    def __init__(self, latency: float = 0.0, body_size: int = 1024):
+        """
+        Initialize the site.
+
+        Args:
+            latency: Seconds every response is delayed by.
+            body_size: Size of regular response bodies in bytes.
+        """
+        self.latency = latency
+        self.body_size = body_size
+        self.requests = 0
+        self.challenges = 0
+        self._lock = threading.Lock()
+        self._bodies: Dict[int, bytes] = {}
+
+    def _body(self, size: int) -> bytes:
+        """
+        Get a cached body of a given size.
+
+        Args:
+            size: Size in bytes.
+
+        Returns:
+            bytes: Body.
+        """
+        body = self._bodies.get(size)
+        if body is None:
+            body = self._bodies.setdefault(size, (b"cf-ares benchmark payload " * (size // 26 + 1))[:size])
+        return body
+
+    def handle(self, method: str, target: str, cookie: str) -> Reply:
+        """
+        Build the response to a request, sleeping for the configured latency.
+
+        Args:
+            method: HTTP method.
+            target: Request target (path and query).
+            cookie: Value of the Cookie header.
+
+        Returns:
+            Reply: Response.
+        """
+        parts = urlsplit(target)
+        query = parse_qs(parts.query)
+        latency = float(query["latency"][0]) if "latency" in query else self.latency
+        size = int(query["size"][0]) if "size" in query else self.body_size
+        with self._lock:
+            self.requests += 1
+        if latency > 0:
+            time.sleep(latency)
+
+        if parts.path.startswith(CHALLENGE_PATH) and f"{CLEARANCE_COOKIE}=" not in cookie:
+            with self._lock:
+                self.challenges += 1
+            headers = [
+                ("Content-Type", "text/html; charset=UTF-8"),
+                ("Server", "cloudflare"),
+                ("cf-mitigated", "challenge"),
+                ("Cache-Control", "no-store"),
+            ]
+            return Reply(403, headers, INTERSTITIAL)
+
+        body = b"" if method == "HEAD" else self._body(size)
+        return Reply(200, [("Content-Type", "application/octet-stream"), ("Server", "cloudflare")], body)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP/1.1 front end of a Site."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; Nagle would delay the body by an ACK
+    disable_nagle_algorithm = True
+    site: Site
+
+    def _respond(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        reply = self.site.handle(self.command, self.path, self.headers.get("Cookie", ""))
+        self.send_response(reply.status)
+        for name, value in reply.headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(reply.body)))
+        self.end_headers()
+        self.wfile.write(reply.body)
+
+    do_GET = do_POST = do_HEAD = _respond
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class _H2Handler(socketserver.BaseRequestHandler):
+    """
+    HTTP/2 (h2c, prior knowledge) front end of a Site.
+    Streams are answered on their own threads, so slow responses do not hold
+    up the others multiplexed on the connection.
+    """
+
+    site: Site
+
+    def setup(self) -> None:
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, True)
+        from h2.config import H2Configuration
+        from h2.connection import H2Connection
+
+        self.conn = H2Connection(config=H2Configuration(client_side=False, header_encoding="utf-8"))
+        self.lock = threading.Lock()
+        # Signalled when the peer opens its flow-control window
+        self.window = threading.Condition(self.lock)
+        self.closed = False
+
+    def _flush(self) -> None:
+        data = self.conn.data_to_send()
+        if data:
+            self.request.sendall(data)
+
+    def handle(self) -> None:
+        from h2.events import (
+            ConnectionTerminated,
+            RequestReceived,
+            StreamReset,
+            WindowUpdated,
+        )
+
+        with self.lock:
+            self.conn.initiate_connection()
+            self._flush()
+        try:
+            while True:
+                data = self.request.recv(65536)
+                if not data:
+                    break
+                with self.lock:
+                    events = self.conn.receive_data(data)
+                    self._flush()
+                    for event in events:
+                        if isinstance(event, (WindowUpdated, StreamReset)):
+                            self.window.notify_all()
+                        elif isinstance(event, ConnectionTerminated):
+                            return
+                for event in events:
+                    if isinstance(event, RequestReceived):
+                        threading.Thread(
+                            target=self._respond, args=(event.stream_id, dict(event.headers)), daemon=True
+                        ).start()
+        except OSError:
+            pass
+        finally:
+            with self.lock:
+                self.closed = True
+                self.window.notify_all()
+
+    def _respond(self, stream_id: int, headers: Dict[str, str]) -> None:
+        reply = self.site.handle(headers.get(":method", "GET"), headers.get(":path", "/"), headers.get("cookie", ""))
+        response_headers = [(":status", str(reply.status)), ("content-length", str(len(reply.body)))]
+        response_headers += [(name.lower(), value) for name, value in reply.headers]
+        body = memoryview(reply.body)
+        try:
+            with self.lock:
+                self.conn.send_headers(stream_id, response_headers, end_stream=not body)
+                self._flush()
+                while body:
+                    size = min(self.conn.local_flow_control_window(stream_id), self.conn.max_outbound_frame_size)
+                    if size <= 0:
+                        if self.closed:
+                            return
+                        self.window.wait()
+                        continue
+                    chunk, body = body[:size], body[size:]
+                    self.conn.send_data(stream_id, chunk.tobytes(), end_stream=not body)
+                    self._flush()
+        except Exception:
+            # The stream was reset or the connection closed
+            pass
+
+
+class _H2Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class BenchServer:
+    """
+    Local benchmark server running on a background thread.
+
+    Example:
+        with BenchServer(latency=0.005, body_size=4096) as server:
+            client.get(server.url("/challenge/page"))
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        body_size: int = 1024,
+        http2: bool = False,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            latency: Seconds every response is delayed by.
+            body_size: Size of regular response bodies in bytes.
+            http2: Serve cleartext HTTP/2 (prior knowledge) instead of HTTP/1.1.
+                Requires the h2 package.
+            host: Address to bind.
+            port: Port to bind; 0 picks a free one.
+
+        Raises:
+            ImportError: If http2 is requested and h2 is not installed.
+        """
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                raise ImportError("HTTP/2 benchmarks require the h2 package: pip install h2")
+        self.site = Site(latency=latency, body_size=body_size)
+        self.http2 = http2
+        handler = type("Handler", (_H2Handler if http2 else _Handler,), {"site": self.site})
+        server_class = _H2Server if http2 else ThreadingHTTPServer
+        self._server: Any = server_class((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """URL of the server root, without a trailing slash."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str = "/") -> str:
+        """
+        Get the URL of a path on the server.
+
+        Args:
+            path: Path, optionally with a query string.
+
+        Returns:
+            str: Absolute URL.
+        """
+        return self.base_url + path
+
+    def start(self) -> "BenchServer":
+        """Start serving on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "BenchServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--body-size", type=int, default=1024)
+    parser.add_argument("--http2", action="store_true")
+    args = parser.parse_args()
+
+    server = BenchServer(args.latency, args.body_size, args.http2, args.host, args.port)
+    print(f"Serving {'h2c' if args.http2 else 'HTTP/1.1'} on {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,8 @@
 CF-Ares - 下一代Cloudflare对抗框架
 """
 
+from cf_ares.async_client import AsyncAresClient
 from cf_ares.client import AresClient
 from cf_ares.version import __version__
 
-__all__ = ["AresClient", "__version__"] 
\ No newline at end of file
+__all__ = ["AresClient", "AsyncAresClient", "__version__"] 
\ No newline at end of file
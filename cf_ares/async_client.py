@@ -0,0 +1,606 @@
+"""
+Asynchronous client implementation for CF-Ares.
+"""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Mapping, Optional, TypeVar, Union
+from urllib.parse import urlparse
+
+from cf_ares.client import AresClient, AresResponse
+from cf_ares.engines.curl import AsyncCurlEngine, PoolConfig
+from cf_ares.engines.pool import BrowserPool
+from cf_ares.exceptions import AresError, CloudflareSessionExpired
+from cf_ares.utils.cache import ResponseCache
+from cf_ares.utils.detection import is_challenge
+from cf_ares.utils.dns import DNSCache
+from cf_ares.utils.metrics import MetricsRegistry
+from cf_ares.utils.profile import CHALLENGED, CLEAN, DomainProfile
+from cf_ares.utils.ratelimit import AsyncRateLimiter
+from cf_ares.utils.retry import RetryPolicy
+from cf_ares.utils.session import DEFAULT_MAX_SESSIONS
+from cf_ares.utils.singleflight import AsyncSingleFlight
+from cf_ares.utils.store import SessionStore
+from cf_ares.utils.telemetry import SolveStats
+
+T = TypeVar("T")
+
+
+class AsyncAresClient:
+    """
+    Asynchronous client for CF-Ares.
+    Requests run on curl_cffi's AsyncSession; browser challenge solves run in an
+    executor so they never block the event loop.
+    """
+
+    def __init__(
+        self,
+        browser_engine: str = "auto",  # "seleniumbase", "undetected", "auto"
+        headless: bool = True,
+        fingerprint: Optional[str] = None,
+        proxy: Optional[str] = None,
+        timeout: int = 30,
+        max_retries: int = 3,
+        debug: bool = False,
+        chrome_path: Optional[str] = None,
+        use_edge: bool = False,
+        browser_idle_timeout: Optional[float] = None,
+        browser_pool: Optional[BrowserPool] = None,
+        engine_options: Optional[Dict[str, Any]] = None,
+        solve_verification: str = "page",
+        session_store: Optional[SessionStore] = None,
+        refresh_ahead: Optional[float] = None,
+        refresh_probe_interval: Optional[float] = None,
+        max_sessions: Optional[int] = DEFAULT_MAX_SESSIONS,
+        probe_first: bool = False,
+        domain_profile: Optional[Union[str, DomainProfile]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        solve_stats: Optional[SolveStats] = None,
+        connection_pool: Optional[PoolConfig] = None,
+        dns_cache: Union[bool, DNSCache, None] = None,
+        max_clients: int = 100,
+        executor: Optional[Executor] = None,
+    ):
+        """
+        Initialize AsyncAresClient.
+
+        Args:
+            browser_engine: Browser engine to use. One of "seleniumbase", "undetected", "auto".
+            headless: Whether to run browser in headless mode.
+            fingerprint: Browser fingerprint to use.
+            proxy: Proxy to use.
+            timeout: Request timeout in seconds.
+            max_retries: Maximum number of retries for failed requests.
+            debug: Enable debug logging.
+            chrome_path: Custom path to Chrome binary. If not provided, will search in default locations.
+            use_edge: Whether to use Edge WebDriver instead of Chrome.
+            browser_idle_timeout: Shut the browser down after this many idle seconds.
+            browser_pool: Shared pool of warm browsers to solve challenges with.
+            engine_options: Extra keyword arguments for the browser engine.
+            solve_verification: How solve_challenge checks a fresh session.
+            session_store: Backend for solved sessions, shared with other workers.
+            refresh_ahead: Re-solve sessions in a background thread this many
+                seconds before they expire. None disables background refresh.
+            refresh_probe_interval: Seconds between liveness probes of refreshed sessions.
+            max_sessions: Maximum number of domain sessions kept in memory.
+            probe_first: Try hosts without a session with curl first and only
+                solve in a browser if the response is a challenge.
+            domain_profile: Per-host challenge outcomes, or a JSON file path to
+                persist them to.
+            retry_policy: When and how often to retry transient failures. Defaults
+                to RetryPolicy(max_retries=max_retries).
+            rate_limiter: Per-host request rate and concurrency limits applied to
+                every request attempt. None disables rate limiting.
+            cache: HTTP cache for GET responses. None disables caching.
+            metrics: Registry aggregating request timings, responses, errors and
+                bytes per host and method. Defaults to a registry of this client.
+            solve_stats: Rolling per-domain window of challenge solve reports.
+                Defaults to one of this client.
+            connection_pool: Connection pool settings, applied to the curl multi
+                handle all requests share: total and per-host connection limits,
+                idle timeout, HTTP/2 preference, multiplexing and streams per
+                connection. Defaults to libcurl's.
+            dns_cache: DNS cache shared by the async curl engine and the
+                synchronous one used around challenge solving. True uses the
+                process-wide cache, None leaves lookups to curl.
+            max_clients: Maximum number of concurrent in-flight requests.
+            executor: Executor used for blocking browser work. Defaults to one
+                thread per browser: a single thread, or browser_pool.size threads
+                when a pool is used.
+        """
+        self.proxy = proxy
+        self.timeout = timeout
+        self.fingerprint = fingerprint
+        self.max_retries = max_retries
+        self.debug = debug
+        self.max_clients = max_clients
+        self.connection_pool = connection_pool
+        self.dns_cache = dns_cache
+
+        # The synchronous client owns the browser engine and the session manager
+        self._client = AresClient(
+            browser_engine=browser_engine,
+            headless=headless,
+            fingerprint=fingerprint,
+            proxy=proxy,
+            timeout=timeout,
+            max_retries=max_retries,
+            debug=debug,
+            chrome_path=chrome_path,
+            use_edge=use_edge,
+            browser_idle_timeout=browser_idle_timeout,
+            browser_pool=browser_pool,
+            engine_options=engine_options,
+            solve_verification=solve_verification,
+            session_store=session_store,
+            refresh_ahead=refresh_ahead,
+            refresh_probe_interval=refresh_probe_interval,
+            max_sessions=max_sessions,
+            probe_first=probe_first,
+            domain_profile=domain_profile,
+            retry_policy=retry_policy,
+            cache=cache,
+            metrics=metrics,
+            solve_stats=solve_stats,
+            connection_pool=connection_pool,
+            dns_cache=dns_cache,
+        )
+        self.browser_pool = browser_pool
+        self._session_manager = self._client._session_manager
+        self.retry_policy = self._client.retry_policy
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.metrics = self._client.metrics
+        self.solve_stats = self._client.solve_stats
+        self._curl_engine: Optional[AsyncCurlEngine] = None
+        # Session timestamp last bound to the async curl engine, per session key
+        self._applied_sessions: Dict[str, float] = {}
+        self._solve_flight = AsyncSingleFlight()
+        self._executor = executor
+        self._owns_executor = executor is None
+
+    async def __aenter__(self) -> "AsyncAresClient":
+        """Enter the async context manager."""
+        self._initialize()
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Exit the async context manager."""
+        await self.close()
+
+    def _initialize(self) -> None:
+        """Initialize the async curl engine if not already initialized."""
+        if self._curl_engine is not None:
+            return
+
+        self._curl_engine = AsyncCurlEngine(
+            proxy=self.proxy,
+            timeout=self.timeout,
+            fingerprint=self.fingerprint,
+            max_clients=self.max_clients,
+            pool=self.connection_pool,
+            dns_cache=self.dns_cache,
+        )
+        if self._executor is None:
+            workers = self.browser_pool.size if self.browser_pool else 1
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cf-ares-browser")
+
+    async def _run_blocking(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking callable in the browser executor.
+
+        Args:
+            func: Callable to run.
+            *args: Positional arguments for the callable.
+
+        Returns:
+            T: Result of the callable.
+        """
+        self._initialize()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _apply_session(self, url: str, record: Optional[Mapping[str, Any]]) -> None:
+        """
+        Copy a URL's session onto the async curl engine.
+
+        Args:
+            url: URL whose session should be applied.
+            record: Session record, or None if there is none.
+        """
+        if not self._curl_engine or record is None:
+            return
+        domain = urlparse(url).hostname
+        self._curl_engine.set_cookies(record["cookies"], domain=domain)
+        self._curl_engine.set_headers(record["headers"], domain=domain)
+        self._applied_sessions[self._session_manager.session_key(url)] = record["timestamp"]
+
+    async def _sync_session(self, url: str) -> bool:
+        """
+        Bind the stored session for a URL if the async curl engine does not have it yet.
+
+        Args:
+            url: URL to check.
+
+        Returns:
+            bool: True if a valid session exists.
+        """
+        record = await self._session_manager.aget(url)
+        if record is None:
+            return False
+        if self._applied_sessions.get(self._session_manager.session_key(url)) != record["timestamp"]:
+            self._apply_session(url, record)
+        return True
+
+    async def _handle_cloudflare(self, url: str) -> None:
+        """
+        Handle Cloudflare challenge using the browser engine in the executor.
+
+        Args:
+            url: URL to visit.
+
+        Raises:
+            CloudflareError: If Cloudflare challenge fails.
+        """
+        await self._run_blocking(self._client._handle_cloudflare, url)
+        self._apply_session(url, await self._session_manager.aget(url))
+
+    async def _ensure_session(self, url: str) -> None:
+        """
+        Make sure a valid session exists for a URL, solving the challenge if needed.
+
+        Concurrent coroutines for the same domain await a single solve.
+
+        Args:
+            url: URL that is about to be requested.
+
+        Raises:
+            CloudflareError: If Cloudflare challenge fails.
+        """
+        self._initialize()
+        if self._client._refresher:
+            self._client._refresher.touch(url)
+        if await self._sync_session(url):
+            return
+
+        async def solve() -> None:
+            await self._run_blocking(self._client._ensure_session, url)
+            self._apply_session(url, await self._session_manager.aget(url))
+
+        await self._solve_flight.do(self._session_manager.session_key(url), solve)
+
+    async def solve_challenge(
+        self, url: str, max_retries: int = 3, verify: Optional[str] = None
+    ) -> AresResponse:
+        """
+        Explicitly solve the Cloudflare challenge for a URL.
+
+        Args:
+            url: URL to visit.
+            max_retries: Maximum number of retries.
+            verify: Verification mode, see AresClient.solve_verification.
+
+        Returns:
+            AresResponse: Response object, with the SolveReport of the solve in solve_report.
+
+        Raises:
+            CloudflareChallengeFailed: If the challenge fails.
+        """
+        response = await self._run_blocking(self._client.solve_challenge, url, max_retries, verify)
+        self._apply_session(url, await self._session_manager.aget(url))
+        return response
+
+    def get_session_info(self, url: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get current session information.
+
+        Args:
+            url: URL to get session information for. If None, return all sessions.
+
+        Returns:
+            dict: Session information including cookies and headers.
+        """
+        return self._client.get_session_info(url)
+
+    def set_session_info(self, session_info: Dict[str, Any], url: Optional[str] = None) -> None:
+        """
+        Set session information.
+
+        Args:
+            session_info: Session information including cookies and headers.
+            url: URL the session belongs to. If None, use the url in session_info.
+        """
+        self._initialize()
+        self._client.set_session_info(session_info, url)
+        url = url or session_info["url"]
+        self._apply_session(url, self._session_manager.get(url))
+
+    def save_session(self, file_path: str, url: Optional[str] = None) -> None:
+        """
+        Save the current session to a file.
+
+        Args:
+            file_path: File path.
+            url: URL to save the session for. If None, save all sessions.
+        """
+        self._client.save_session(file_path, url)
+
+    def load_session(self, file_path: str) -> None:
+        """
+        Load sessions from a file.
+
+        Args:
+            file_path: File path.
+        """
+        self._initialize()
+        self._client.load_session(file_path)
+        for domain in list(self._session_manager.sessions):
+            url = f"https://{domain.lstrip('.')}"
+            self._apply_session(url, self._session_manager.get(url))
+
+    async def _probe_request(
+        self, method: str, url: str, request_kwargs: Dict[str, Any]
+    ) -> Optional[Any]:
+        """
+        Send a request without a solved session and classify the response.
+
+        Args:
+            method: HTTP method.
+            url: URL to request.
+            request_kwargs: Arguments for AsyncCurlEngine.request.
+
+        Returns:
+            Optional[Any]: The response, or None if the host challenged it (or is
+                known to) and a browser solve is needed.
+        """
+        profile = self._client._domain_profile
+        host = self._session_manager.session_key(url)
+        if profile.get(host) == CHALLENGED:
+            return None
+
+        response = await self._fetch(method, url, request_kwargs)
+        if is_challenge(response):
+            profile.record(host, CHALLENGED)
+            return None
+        profile.record(host, CLEAN)
+        return response
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Any] = None,
+        json: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> AresResponse:
+        """
+        Make a request with automatic Cloudflare handling.
+
+        Args:
+            method: HTTP method.
+            url: URL to request.
+            params: Query parameters.
+            data: Request data.
+            json: JSON data.
+            headers: Request headers.
+            **kwargs: Additional arguments.
+
+        Returns:
+            AresResponse: Response object.
+
+        Raises:
+            CloudflareSessionExpired: If the Cloudflare session has expired.
+            RequestError: If the request fails and is not retried.
+            ValueError: If stream=True is passed; use AresClient to stream bodies.
+        """
+        if kwargs.get("stream"):
+            # AresResponse reads streamed bodies synchronously, which would block the loop
+            raise ValueError("stream=True is not supported by AsyncAresClient, use AresClient")
+        self._initialize()
+
+        if not self._curl_engine:
+            raise AresError("Curl engine not initialized")
+
+        request_kwargs = dict(params=params, data=data, json=json, headers=headers, **kwargs)
+
+        # Try without a browser first for hosts not known to challenge
+        if self._client.probe_first and not await self._sync_session(url):
+            response = await self._probe_request(method, url, request_kwargs)
+            if response is not None:
+                return AresResponse(response)
+
+        # Check if we need to handle Cloudflare first
+        await self._ensure_session(url)
+
+        response = await self._fetch(method, url, request_kwargs)
+        if is_challenge(response):
+            # The session was rejected
+            await self._session_manager.aclear(url)
+            if not self._client.probe_first:
+                raise CloudflareSessionExpired("Cloudflare 会话已过期，请重新执行 solve_challenge 方法")
+            # Solve again and retry once
+            await self._ensure_session(url)
+            response = await self._fetch(method, url, request_kwargs)
+        return AresResponse(response)
+
+    async def _fetch(self, method: str, url: str, request_kwargs: Dict[str, Any]) -> Any:
+        """
+        Answer a request from the cache or send it.
+
+        Args:
+            method: HTTP method.
+            url: URL to request.
+            request_kwargs: Arguments for AsyncCurlEngine.request.
+
+        Returns:
+            Any: Cached or fetched response.
+        """
+        if self.cache is None:
+            return await self._send(method, url, request_kwargs)
+        lookup = self.cache.before(method, url, request_kwargs, await self._session_manager.aget(url))
+        if lookup.response is not None:
+            return lookup.response
+        response = await self._send(method, url, lookup.request_kwargs)
+        return self.cache.after(method, lookup, response)
+
+    async def _send(self, method: str, url: str, request_kwargs: Dict[str, Any]) -> Any:
+        """
+        Send a request with the async curl engine under the retry policy and rate limiter.
+
+        Args:
+            method: HTTP method.
+            url: URL to request.
+            request_kwargs: Arguments for AsyncCurlEngine.request.
+
+        Returns:
+            Any: Response of the last attempt.
+
+        Raises:
+            RequestError: If the last attempt fails.
+        """
+        if not self._curl_engine:
+            raise AresError("Curl engine not initialized")
+        engine = self._curl_engine
+        host = self._session_manager.session_key(url)
+        limiter = self.rate_limiter
+
+        async def attempt() -> Any:
+            try:
+                if limiter is None:
+                    response = await engine.request(method=method, url=url, **request_kwargs)
+                else:
+                    async with limiter.limit(host):
+                        response = await engine.request(method=method, url=url, **request_kwargs)
+            except Exception as e:
+                self.metrics.error(host, method, e)
+                raise
+            self.metrics.observe(host, method, response)
+            if limiter is not None:
+                await limiter.afeedback(host, response)
+            return response
+
+        return await self.retry_policy.arun(attempt, host, method)
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> AresResponse:
+        """Make a GET request. See AresClient.get."""
+        return await self._request("GET", url, params=params, headers=headers, **kwargs)
+
+    async def post(
+        self,
+        url: str,
+        data: Optional[Any] = None,
+        json: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> AresResponse:
+        """Make a POST request. See AresClient.post."""
+        return await self._request("POST", url, data=data, json=json, headers=headers, **kwargs)
+
+    async def put(
+        self,
+        url: str,
+        data: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> AresResponse:
+        """Make a PUT request. See AresClient.put."""
+        return await self._request("PUT", url, data=data, headers=headers, **kwargs)
+
+    async def delete(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> AresResponse:
+        """Make a DELETE request. See AresClient.delete."""
+        return await self._request("DELETE", url, headers=headers, **kwargs)
+
+    async def head(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> AresResponse:
+        """Make a HEAD request. See AresClient.head."""
+        return await self._request("HEAD", url, headers=headers, **kwargs)
+
+    async def options(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> AresResponse:
+        """Make an OPTIONS request. See AresClient.options."""
+        return await self._request("OPTIONS", url, headers=headers, **kwargs)
+
+    async def patch(
+        self,
+        url: str,
+        data: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> AresResponse:
+        """Make a PATCH request. See AresClient.patch."""
+        return await self._request("PATCH", url, data=data, headers=headers, **kwargs)
+
+    @property
+    def cookies(self) -> Dict[str, str]:
+        """
+        Get all cookies from the current session.
+
+        Returns:
+            Dict[str, str]: All cookies.
+        """
+        if self._curl_engine:
+            return self._curl_engine.get_cookies()
+        return {}
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """
+        Get all headers from the current session.
+
+        Returns:
+            Dict[str, str]: All headers.
+        """
+        if self._curl_engine:
+            return self._curl_engine.get_headers()
+        return {}
+
+    def connection_stats(self, host: Optional[str] = None) -> Dict[str, Any]:
+        """Get connection reuse statistics of the async curl engine. See AresClient.connection_stats."""
+        self._initialize()
+        if not self._curl_engine:
+            raise AresError("Curl engine not initialized")
+        return self._curl_engine.connection_stats.snapshot(host)
+
+    def shared_cache_stats(self) -> Dict[str, Any]:
+        """Get shared cache hit counts of the async curl engine. See AresClient.shared_cache_stats."""
+        self._initialize()
+        if not self._curl_engine:
+            raise AresError("Curl engine not initialized")
+        return self._curl_engine.shared_cache_stats()
+
+    async def close(self) -> None:
+        """Close all resources."""
+        if self._curl_engine:
+            await self._curl_engine.close()
+            self._curl_engine = None
+        self._applied_sessions.clear()
+        if self._executor is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._client.close)
+            if self._owns_executor:
+                self._executor.shutdown(wait=False)
+                self._executor = None
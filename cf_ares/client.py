@@ -4,49 +4,217 @@ Main client implementation for CF-Ares.
 
 import json
 import os
+import threading
 import time
-from typing import Any, Dict, List, Optional, Union
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from cf_ares.engines.base import BaseEngine, BrowserPage, split_cookie_records
+from cf_ares.engines.curl import CurlEngine, PoolConfig, release_on_close
+from cf_ares.engines.pool import BrowserPool
+from cf_ares.engines.registry import available_engines, get_engine_class
+from cf_ares.exceptions import (
+    AresError,
+    CloudflareChallengeFailed,
+    CloudflareError,
+    CloudflareSessionExpired,
+    RequestError,
+    StreamConsumedError,
+)
+from cf_ares.utils.cache import ResponseCache
+from cf_ares.utils.detection import (
+    DEFAULT_SCAN_BYTES,
+    is_challenge,
+    is_challenge_document,
+    is_challenge_response,
+    needs_body,
+)
+from cf_ares.utils.dns import DNSCache
+from cf_ares.utils.metrics import MetricsRegistry, RequestTimings
+from cf_ares.utils.profile import CHALLENGED, CLEAN, DomainProfile
+from cf_ares.utils.ratelimit import RateLimiter
+from cf_ares.utils.refresher import SessionRefresher
+from cf_ares.utils.retry import RetryPolicy
+from cf_ares.utils.session import DEFAULT_MAX_SESSIONS, SessionManager
+from cf_ares.utils.singleflight import SingleFlight
+from cf_ares.utils.store import SessionStore
+from cf_ares.utils.telemetry import SolveReport, SolveStats
+
+SOLVE_VERIFICATION_MODES = ("page", "head", "get", "none")
+
+# Bytes per chunk yielded by AresResponse.iter_content and written by download()
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def _rechunk(chunks: Iterator[bytes], chunk_size: Optional[int]) -> Iterator[bytes]:
+    """
+    Regroup chunks of any size into chunks of chunk_size bytes.
+
+    Args:
+        chunks: Source chunks.
+        chunk_size: Size of every chunk but the last. None passes chunks through.
+
+    Returns:
+        Iterator[bytes]: Chunks.
+    """
+    if not chunk_size:
+        yield from (chunk for chunk in chunks if chunk)
+        return
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+def _close_response(response: Any) -> None:
+    """
+    Release the connection of a streamed response that will not be read.
 
-from cf_ares.engines.base import BaseEngine
-from cf_ares.engines.curl import CurlEngine
-from cf_ares.engines.selenium import SeleniumBaseEngine
-from cf_ares.engines.undetected import UndetectedEngine
-from cf_ares.exceptions import AresError, CloudflareError, CloudflareChallengeFailed, CloudflareSessionExpired
-from cf_ares.utils.session import SessionManager
+    Args:
+        response: Response, streamed or not.
+    """
+    close = getattr(response, "close", None)
+    if callable(close):
+        close()
 
 
 class AresResponse:
     """
     Response object returned by AresClient.
     Compatible with requests.Response interface.
+
+    A response requested with stream=True holds its connection open and reads
+    the body only when content, text, json(), iter_content() or iter_lines()
+    is used. Close it (or use it as a context manager) when not reading the
+    whole body.
     """
 
-    def __init__(self, response: Any):
+    def __init__(self, response: Any, stream: bool = False):
         self._response = response
         self.status_code = getattr(response, "status_code", None)
         self.headers = getattr(response, "headers", {})
         self.cookies = getattr(response, "cookies", {})
-        self._content = getattr(response, "content", b"")
+        self.stream = stream
+        self._content: Optional[bytes] = None if stream else getattr(response, "content", b"")
+        self._consumed = False
         self.url = getattr(response, "url", "")
+        self.from_cache = getattr(response, "from_cache", False)
+        # libcurl phase timings and sizes; None for cached responses
+        self.timings: Optional[RequestTimings] = RequestTimings.from_response(response)
+        # Set by solve_challenge
+        self.solve_report: Optional[SolveReport] = None
 
     @property
     def text(self) -> str:
         """Get response text."""
+        content = self.content
         if hasattr(self._response, "text"):
             return self._response.text
-        return self._content.decode("utf-8", errors="replace")
+        return content.decode("utf-8", errors="replace")
 
     @property
     def content(self) -> bytes:
-        """Get response content as bytes."""
+        """Get response content as bytes, reading a streamed body to the end."""
+        if self._content is None:
+            self._content = b"".join(self._iter_body())
+            if self.stream and hasattr(self._response, "content"):
+                # Let the underlying response decode text and JSON from it
+                self._response.content = self._content
         return self._content
 
+    @property
+    def raw(self) -> Any:
+        """Get the underlying curl_cffi response."""
+        return self._response
+
+    def _iter_body(self) -> Iterator[bytes]:
+        """
+        Iterate over the body as it arrives from curl, or over the buffered body.
+
+        Returns:
+            Iterator[bytes]: Chunks of any size.
+
+        Raises:
+            StreamConsumedError: If a streamed body was already iterated over.
+            RequestError: If the transfer fails while the body is read.
+        """
+        if self._content is not None:
+            yield self._content
+            return
+        if self._consumed:
+            raise StreamConsumedError("The response body has already been consumed")
+        self._consumed = True
+        try:
+            yield from self._response.iter_content()
+        except Exception as e:
+            raise RequestError(f"Request failed: {e}") from e
+
+    def iter_content(self, chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Iterate over the body in chunks without buffering a streamed body.
+
+        Args:
+            chunk_size: Bytes per chunk; the last chunk may be shorter. None
+                yields chunks as curl delivers them.
+
+        Returns:
+            Iterator[bytes]: Chunks.
+
+        Raises:
+            StreamConsumedError: If a streamed body was already iterated over.
+        """
+        return _rechunk(self._iter_body(), chunk_size)
+
+    def iter_lines(
+        self, chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE, delimiter: Optional[bytes] = None
+    ) -> Iterator[bytes]:
+        """
+        Iterate over the body line by line without buffering a streamed body.
+
+        Args:
+            chunk_size: Bytes read at a time.
+            delimiter: Line separator. None splits on any line ending.
+
+        Returns:
+            Iterator[bytes]: Lines without their line endings.
+
+        Raises:
+            StreamConsumedError: If a streamed body was already iterated over.
+        """
+        pending = b""
+        for chunk in self.iter_content(chunk_size):
+            data = pending + chunk
+            lines = data.split(delimiter) if delimiter else data.splitlines(True)
+            # The last line may continue in the next chunk
+            pending = lines.pop()
+            for line in lines:
+                yield line if delimiter else line.rstrip(b"\r\n")
+        if pending:
+            yield pending if delimiter else pending.rstrip(b"\r\n")
+
+    def close(self) -> None:
+        """Release the connection of a streamed response."""
+        if self.stream:
+            _close_response(self._response)
+
+    def __enter__(self) -> "AresResponse":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
+
     def json(self) -> Any:
         """Parse response as JSON."""
+        content = self.content
         if hasattr(self._response, "json"):
             return self._response.json()
         import json
-        return json.loads(self.text)
+        return json.loads(content)
 
     def __repr__(self) -> str:
         return f"<AresResponse [{self.status_code}]>"
@@ -69,6 +237,25 @@ class AresClient:
         debug: bool = False,
         chrome_path: Optional[str] = None,
         use_edge: bool = False,
+        browser_idle_timeout: Optional[float] = None,
+        browser_pool: Optional[BrowserPool] = None,
+        thread_safe: bool = False,
+        max_connections_per_host: Optional[int] = None,
+        connection_pool: Optional[PoolConfig] = None,
+        engine_options: Optional[Dict[str, Any]] = None,
+        solve_verification: str = "page",
+        session_store: Optional[SessionStore] = None,
+        refresh_ahead: Optional[float] = None,
+        refresh_probe_interval: Optional[float] = None,
+        max_sessions: Optional[int] = DEFAULT_MAX_SESSIONS,
+        probe_first: bool = False,
+        domain_profile: Optional[Union[str, DomainProfile]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        solve_stats: Optional[SolveStats] = None,
+        dns_cache: Union[bool, DNSCache, None] = None,
     ):
         """
         Initialize AresClient.
@@ -79,10 +266,70 @@ class AresClient:
             fingerprint: Browser fingerprint to use.
             proxy: Proxy to use.
             timeout: Request timeout in seconds.
-            max_retries: Maximum number of retries for failed requests.
+            max_retries: Maximum number of retries for failed requests. Ignored
+                when retry_policy is given.
             debug: Enable debug logging.
             chrome_path: Custom path to Chrome binary. If not provided, will search in default locations.
             use_edge: Whether to use Edge WebDriver instead of Chrome.
+            browser_idle_timeout: Shut the browser down after this many seconds without
+                a challenge solve. The browser is launched again on the next solve.
+                None keeps it running until close().
+            browser_pool: Shared pool of warm browsers to solve challenges with. When
+                set, solves check an engine out of the pool instead of using a
+                browser owned by this client, so several solves can run at once.
+                The client's proxy, headless and engine options fill in whatever
+                the pool's engine_kwargs leave unset. The pool is not closed by close().
+            thread_safe: Make the client safe to share between threads. Requests use
+                a pool of curl handles over a shared cookie jar and headers, one per
+                request in flight, reusing warm handles first.
+            max_connections_per_host: Maximum number of concurrent connections per host.
+            connection_pool: Connection pool settings of the curl engine: total and
+                per-host connection limits, idle timeout, HTTP/2 preference and
+                multiplexing. Defaults to libcurl's.
+            engine_options: Extra keyword arguments for the browser engine, e.g.
+                {"completion": "cookie"} for UndetectedEngine.
+            solve_verification: How solve_challenge checks a fresh session.
+                "page" returns the page the browser already loaded without another
+                request; "head" sends a HEAD request and checks status and headers;
+                "get" re-fetches the URL and scans the start of the body;
+                "none" skips verification.
+            session_store: Backend for solved sessions, e.g. SQLiteSessionStore or
+                RedisSessionStore. A shared store lets one solve serve every
+                worker process. Defaults to an in-memory store. The store is not
+                closed by close().
+            refresh_ahead: Re-solve sessions in the background this many seconds
+                before they expire, so requests never wait for a solve. Requests
+                keep using the old session until the new one is swapped in.
+                None disables background refresh.
+            refresh_probe_interval: With background refresh, send a HEAD request
+                with each session this often and re-solve at once if Cloudflare
+                challenges it (cf-mitigated: challenge). None disables probing.
+            max_sessions: Maximum number of domain sessions kept in memory. The
+                least recently used are evicted first. None means unbounded.
+            probe_first: For hosts without a session, send the request with curl
+                first and only solve the challenge in a browser if the response
+                is a Cloudflare challenge. Hosts that never challenge then never
+                start a browser.
+            domain_profile: Per-host challenge outcomes used by probe_first, or a
+                JSON file path to persist them to, so hosts known to challenge
+                go straight to the browser. Defaults to an in-memory profile.
+            retry_policy: When and how often to retry transient failures of
+                requests and challenge solves. Defaults to
+                RetryPolicy(max_retries=max_retries).
+            rate_limiter: Per-host request rate and concurrency limits applied to
+                every request attempt, including retries. Give it the shared
+                session store to share each host's rate between processes.
+                None disables rate limiting.
+            cache: HTTP cache for GET responses. Fresh responses are served
+                without a request and stale ones are revalidated with
+                If-None-Match / If-Modified-Since. None disables caching.
+            metrics: Registry aggregating request timings, responses, errors and
+                bytes per host and method. Defaults to a registry of this client.
+            solve_stats: Rolling per-domain window of challenge solve reports.
+                Defaults to one of this client.
+            dns_cache: DNS cache the curl engine resolves hosts with, shared
+                between its handles. True uses the process-wide cache shared by
+                every client, None leaves lookups to each curl handle.
         """
         self.browser_engine = browser_engine
         self.headless = headless
@@ -93,11 +340,43 @@ class AresClient:
         self.debug = debug
         self.chrome_path = chrome_path
         self.use_edge = use_edge
-
-        # Initialize engines
+        self.browser_idle_timeout = browser_idle_timeout
+        self.browser_pool = browser_pool
+        self.thread_safe = thread_safe
+        self.max_connections_per_host = max_connections_per_host
+        self.connection_pool = connection_pool
+        self.dns_cache = dns_cache
+        self.engine_options = engine_options or {}
+        if browser_pool is not None:
+            browser_pool.inherit(self._browser_engine_kwargs(browser_pool.engine_name))
+        if solve_verification not in SOLVE_VERIFICATION_MODES:
+            raise ValueError(f"Unknown verification mode: {solve_verification!r}")
+        self.solve_verification = solve_verification
+
+        # Initialize engines. The browser engine is only created when a challenge
+        # actually has to be solved.
         self._browser_engine: Optional[BaseEngine] = None
+        self._browser_lock = threading.RLock()
+        self._browser_last_used = 0.0
+        self._idle_timer: Optional[threading.Timer] = None
         self._curl_engine: Optional[CurlEngine] = None
-        self._session_manager = SessionManager()
+        self._session_manager = SessionManager(store=session_store, max_sessions=max_sessions)
+        # Session timestamp last bound to the curl engine, per session key
+        self._applied_sessions: Dict[str, float] = {}
+        self.refresh_ahead = refresh_ahead
+        self.refresh_probe_interval = refresh_probe_interval
+        self._refresher: Optional[SessionRefresher] = None
+        self.probe_first = probe_first
+        if isinstance(domain_profile, str):
+            domain_profile = DomainProfile(domain_profile)
+        self._domain_profile = domain_profile if domain_profile is not None else DomainProfile()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy(max_retries)
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.solve_stats = solve_stats if solve_stats is not None else SolveStats()
+        self._solve_flight = SingleFlight()
+        self._init_lock = threading.Lock()
         self._initialized = False
 
     def __enter__(self) -> "AresClient":
@@ -114,136 +393,412 @@ class AresClient:
         if self._initialized:
             return
 
-        # Initialize curl engine
-        self._curl_engine = CurlEngine(
-            proxy=self.proxy,
-            timeout=self.timeout,
-            fingerprint=self.fingerprint,
-        )
+        with self._init_lock:
+            if self._initialized:
+                return
 
-        # Initialize browser engine based on configuration
-        if self.browser_engine == "seleniumbase":
-            self._browser_engine = SeleniumBaseEngine(
-                headless=self.headless,
-                proxy=self.proxy,
-                timeout=self.timeout,
-                fingerprint=self.fingerprint,
-            )
-        elif self.browser_engine == "undetected":
-            self._browser_engine = UndetectedEngine(
-                headless=self.headless,
+            # Initialize curl engine
+            self._curl_engine = CurlEngine(
                 proxy=self.proxy,
                 timeout=self.timeout,
                 fingerprint=self.fingerprint,
-                chrome_path=self.chrome_path,
-                use_edge=self.use_edge,
+                thread_safe=self.thread_safe,
+                max_connections_per_host=self.max_connections_per_host,
+                pool=self.connection_pool,
+                dns_cache=self.dns_cache,
             )
-        else:  # auto
+            self._session_manager.open()
+
+            if self.refresh_ahead is not None:
+                self._refresher = SessionRefresher(
+                    self, self.refresh_ahead, self.refresh_probe_interval
+                )
+                self._refresher.start()
+
+            self._initialized = True
+
+    def _create_browser_engine(self) -> BaseEngine:
+        """
+        Create the configured browser engine.
+
+        Engine modules are imported on first use so the browser stacks are only
+        loaded when needed. Creating the engine does not launch the browser.
+
+        Returns:
+            BaseEngine: Browser engine.
+        """
+        engine_name = self.browser_engine
+        if engine_name == "auto" or engine_name not in available_engines():
             # Start with undetected, fallback to seleniumbase if needed
-            self._browser_engine = UndetectedEngine(
-                headless=self.headless,
-                proxy=self.proxy,
-                timeout=self.timeout,
-                fingerprint=self.fingerprint,
-                chrome_path=self.chrome_path,
-                use_edge=self.use_edge,
-            )
+            engine_name = "undetected"
 
-        self._initialized = True
+        return get_engine_class(engine_name)(**self._browser_engine_kwargs(engine_name))
 
-    def _handle_cloudflare(self, url: str) -> None:
+    def _browser_engine_kwargs(self, engine_name: str) -> Dict[str, Any]:
         """
-        Handle Cloudflare challenge using browser engine.
+        Get the constructor arguments for a browser engine of this client.
+
+        Args:
+            engine_name: Registered engine name.
+
+        Returns:
+            Dict[str, Any]: Engine keyword arguments.
+        """
+        engine_kwargs: Dict[str, Any] = {
+            "headless": self.headless,
+            "proxy": self.proxy,
+            "timeout": self.timeout,
+            "fingerprint": self.fingerprint,
+        }
+        if engine_name == "undetected":
+            engine_kwargs["chrome_path"] = self.chrome_path
+            engine_kwargs["use_edge"] = self.use_edge
+        engine_kwargs.update(self.engine_options)
+        return engine_kwargs
+
+    def _get_browser_engine(self) -> BaseEngine:
+        """
+        Get the browser engine, creating it on first use.
+
+        Returns:
+            BaseEngine: Browser engine.
+        """
+        self._initialize()
+        if self._browser_engine is None:
+            self._browser_engine = self._create_browser_engine()
+        return self._browser_engine
+
+    def _touch_browser(self) -> None:
+        """Record browser use and (re)arm the idle shutdown timer."""
+        self._browser_last_used = time.monotonic()
+        if self.browser_idle_timeout is None:
+            return
+
+        if self._idle_timer:
+            self._idle_timer.cancel()
+        self._idle_timer = threading.Timer(self.browser_idle_timeout, self._shutdown_idle_browser)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _shutdown_idle_browser(self) -> None:
+        """Close the browser if it has not been used for browser_idle_timeout seconds."""
+        with self._browser_lock:
+            if self._browser_engine is None or not self._browser_engine.is_running:
+                return
+            idle = time.monotonic() - self._browser_last_used
+            if self.browser_idle_timeout is not None and idle >= self.browser_idle_timeout:
+                if self.debug:
+                    print(f"浏览器空闲 {idle:.1f} 秒，关闭浏览器")
+                self._browser_engine.close()
+
+    def _apply_session(self, url: str, record: Mapping[str, Any]) -> None:
+        """
+        Bind a domain's session to the curl engine.
+
+        Cookies and headers are scoped to the URL's host, so requests to other
+        hosts never carry them and re-solving a host replaces its old session.
+
+        Args:
+            url: URL the session belongs to.
+            record: Session record with cookies, headers and timestamp.
+        """
+        if self._curl_engine:
+            domain = urlparse(url).hostname
+            self._curl_engine.set_cookies(record["cookies"], domain=domain)
+            self._curl_engine.set_headers(record["headers"], domain=domain)
+            self._applied_sessions[self._session_manager.session_key(url)] = record["timestamp"]
+
+    def _sync_session(self, url: str) -> bool:
+        """
+        Bind the stored session for a URL if the curl engine does not have it yet.
+
+        The session may have been solved by another client sharing the store.
+
+        Args:
+            url: URL to check.
+
+        Returns:
+            bool: True if a valid session exists.
+        """
+        record = self._session_manager.get(url)
+        if record is None:
+            return False
+        if self._applied_sessions.get(self._session_manager.session_key(url)) != record["timestamp"]:
+            self._apply_session(url, record)
+        return True
+
+    def _run_browser_solve(
+        self,
+        browser_engine: BaseEngine,
+        url: str,
+        capture_page: bool = False,
+        report: Optional[SolveReport] = None,
+        fresh: bool = False,
+    ) -> Tuple[
+        Dict[str, str], Dict[str, str], Tuple[Dict[str, float], Dict[str, str]], Optional[BrowserPage]
+    ]:
+        """
+        Drive a browser engine through a challenge and extract the session.
 
         Args:
+            browser_engine: Engine to use.
             url: URL to visit.
+            capture_page: Also snapshot the page the browser ended up on.
+            report: Solve report to time the phases in.
+            fresh: Delete the browser's cookies for the URL first, so a still
+                valid clearance is replaced instead of reused.
 
-        Raises:
-            CloudflareError: If Cloudflare challenge fails.
+        Returns:
+            Tuple: Cookies, headers, cookie metadata (expiry times and domains)
+                and the page snapshot (or None).
         """
-        if not self._browser_engine:
-            self._initialize()
+        if report is None:
+            report = SolveReport(url, self._session_manager.session_key(url))
 
-        if not self._browser_engine:
-            raise AresError("Browser engine not initialized")
+        # Launch the browser up front so its startup is not counted as navigation
+        with report.phase("launch"):
+            if not browser_engine.is_running:
+                browser_engine.start()
 
         # Visit URL with browser engine
-        self._browser_engine.get(url)
+        with report.phase("navigate"):
+            if fresh:
+                browser_engine.clear_cookies(url)
+            browser_engine.get(url)
 
         # Wait for Cloudflare challenge to complete
-        self._browser_engine.wait_for_cloudflare()
+        start = time.perf_counter()
+        browser_engine.wait_for_cloudflare()
+        elapsed = time.perf_counter() - start
+        detect = min((browser_engine.last_wait_timings or {}).get("detect", 0.0), elapsed)
+        report.add("detect", detect)
+        report.add("wait", elapsed - detect)
 
         # Extract session information
-        cookies = self._browser_engine.get_cookies()
-        headers = self._browser_engine.get_headers()
+        with report.phase("extract"):
+            # One read, so values, expiry and domains come from the same snapshot
+            cookies, expiry, domains = split_cookie_records(browser_engine.get_cookie_records())
+            headers = browser_engine.get_headers()
+            cookie_meta = (expiry, domains)
+            page = browser_engine.get_page() if capture_page else None
+        if self.debug:
+            print(f"Cloudflare 挑战耗时: {report!r}")
+        return cookies, headers, cookie_meta, page
+
+    def _handle_cloudflare(
+        self,
+        url: str,
+        capture_page: bool = False,
+        report: Optional[SolveReport] = None,
+        fresh: bool = False,
+    ) -> Optional[BrowserPage]:
+        """
+        Handle Cloudflare challenge using browser engine.
+
+        Args:
+            url: URL to visit.
+            capture_page: Return a snapshot of the page the browser ended up on.
+            report: Solve report to time the phases in. When omitted, the solve
+                gets its own report, which is finished and recorded in solve_stats.
+            fresh: Obtain a new clearance even if the browser still holds a
+                valid one, e.g. to extend a session before it expires.
+
+        Returns:
+            Optional[BrowserPage]: Page snapshot if requested and available.
+
+        Raises:
+            CloudflareError: If Cloudflare challenge fails.
+        """
+        self._initialize()
+        if report is None:
+            report = SolveReport(url, self._session_manager.session_key(url))
+            try:
+                page = self._handle_cloudflare(url, capture_page, report, fresh)
+            except Exception as e:
+                self.solve_stats.record(report.finish(e))
+                raise
+            self.solve_stats.record(report.finish())
+            return page
+
+        if self.browser_pool is not None:
+            start = time.perf_counter()
+            with self.browser_pool.engine(timeout=self.timeout) as browser_engine:
+                report.add("acquire", time.perf_counter() - start)
+                cookies, headers, cookie_meta, page = self._run_browser_solve(
+                    browser_engine, url, capture_page, report, fresh
+                )
+        else:
+            with report.phase("acquire"):
+                self._browser_lock.acquire()
+            try:
+                cookies, headers, cookie_meta, page = self._run_browser_solve(
+                    self._get_browser_engine(), url, capture_page, report, fresh
+                )
+            finally:
+                self._touch_browser()
+                self._browser_lock.release()
 
         # Update session manager
-        self._session_manager.update(url, cookies, headers)
+        record = self._session_manager.update(url, cookies, headers, *cookie_meta)
 
         # Apply session to curl engine
-        if self._curl_engine:
-            self._curl_engine.set_cookies(cookies)
-            self._curl_engine.set_headers(headers)
+        self._apply_session(url, record)
+        if self._refresher:
+            # Only sessions solved here; those from a shared store have their own solver
+            self._refresher.track(url)
+        return page
+
+    def _ensure_session(self, url: str) -> None:
+        """
+        Make sure a valid session exists for a URL, solving the challenge if needed.
+
+        Concurrent callers for the same domain share a single solve: the first
+        one runs it, the others wait and get the same result or error.
+
+        Args:
+            url: URL that is about to be requested.
+
+        Raises:
+            CloudflareError: If Cloudflare challenge fails.
+        """
+        self._initialize()
+        if self._refresher:
+            self._refresher.touch(url)
+        if self._sync_session(url):
+            return
+
+        def solve() -> None:
+            # Another caller or worker may have finished a solve since our check above
+            if not self._sync_session(url):
+                self._handle_cloudflare(url)
 
-    def solve_challenge(self, url: str, max_retries: int = 3) -> AresResponse:
+        self._solve_flight.do(self._session_manager.session_key(url), solve)
+
+    def _prefix_is_challenge(self, url: str) -> bool:
+        """
+        Check whether a URL still serves a challenge, reading only the start of the page.
+
+        Args:
+            url: URL to check.
+
+        Returns:
+            bool: True if the page is a challenge page.
+        """
+        if not self._curl_engine:
+            raise AresError("Curl engine not initialized")
+        response = self._curl_engine.request("GET", url, stream=True)
+        prefix = b""
+        try:
+            for chunk in response.iter_content():
+                prefix += chunk
+                if len(prefix) >= DEFAULT_SCAN_BYTES:
+                    break
+        finally:
+            response.close()
+        return is_challenge_response(response.status_code, response.headers, prefix)
+
+    def _verify_solve(self, url: str, page: Optional[BrowserPage], verify: str) -> AresResponse:
+        """
+        Check a freshly solved session and build the solve_challenge response.
+
+        In "page" mode a snapshot that is not the fully loaded destination page
+        (e.g. taken on cookie completion) is not trusted; the session is
+        checked with a HEAD request instead. A HEAD answer that headers alone
+        cannot classify is settled by the first bytes of a GET.
+
+        Args:
+            url: URL that was solved.
+            page: Page the browser ended up on, if captured.
+            verify: Verification mode, see AresClient.solve_verification.
+
+        Returns:
+            AresResponse: Response object.
+
+        Raises:
+            CloudflareChallengeFailed: If the session still gets a challenge.
+        """
+        if not self._curl_engine:
+            raise AresError("Curl engine not initialized")
+        if verify == "none" and page is not None:
+            return AresResponse(page)
+
+        usable_page = page if page is not None and page.complete else None
+        if verify == "page" and usable_page is not None:
+            if is_challenge(usable_page, scan_bytes=DEFAULT_SCAN_BYTES) or is_challenge_document(
+                usable_page.content
+            ):
+                raise CloudflareChallengeFailed("Cloudflare 挑战失败，浏览器页面仍为挑战页面")
+            return AresResponse(usable_page)
+
+        if verify == "head" or (verify == "page" and usable_page is None):
+            response = self._curl_engine.request("HEAD", url)
+            challenged = is_challenge_response(response.status_code, response.headers)
+            if not challenged and needs_body(response.status_code, response.headers):
+                # The origin may refuse HEAD itself; only the page can tell
+                challenged = self._prefix_is_challenge(url)
+            if challenged:
+                raise CloudflareChallengeFailed("Cloudflare 挑战失败，HEAD 验证仍返回挑战页面")
+            return AresResponse(response)
+
+        # 使用 curl 引擎发送请求，只扫描响应开头部分判断是否仍为挑战页面
+        response = self._curl_engine.request("GET", url)
+        if verify != "none" and is_challenge(response, scan_bytes=DEFAULT_SCAN_BYTES):
+            raise CloudflareChallengeFailed("Cloudflare 挑战失败，响应中包含挑战页面")
+        return AresResponse(response)
+
+    def solve_challenge(self, url: str, max_retries: int = 3, verify: Optional[str] = None) -> AresResponse:
         """
         显式执行 Cloudflare 挑战
         
         参数:
             url (str): 要访问的 URL
             max_retries (int): 最大重试次数
+            verify (str, optional): 验证方式，默认使用 solve_verification 配置
             
         返回:
-            AresResponse: 响应对象
+            AresResponse: 响应对象，其 solve_report 属性为本次挑战的 SolveReport（各阶段耗时、重试次数与结果）
             
         抛出:
-            CloudflareChallengeFailed: 如果挑战失败
+            CloudflareChallengeFailed: 如果挑战失败，其 solve_report 属性记录失败的挑战
         """
         self._initialize()
-        
-        if not self._browser_engine:
-            raise AresError("Browser engine not initialized")
-            
-        retries = 0
-        last_error = None
-        
-        while retries < max_retries:
-            try:
-                # 使用浏览器引擎访问 URL
-                self._browser_engine.get(url)
-                
-                # 等待 Cloudflare 挑战完成
-                self._browser_engine.wait_for_cloudflare()
-                
-                # 提取会话信息
-                cookies = self._browser_engine.get_cookies()
-                headers = self._browser_engine.get_headers()
-                
-                # 更新会话管理器
-                self._session_manager.update(url, cookies, headers)
-                
-                # 应用会话到 curl 引擎
-                if self._curl_engine:
-                    self._curl_engine.set_cookies(cookies)
-                    self._curl_engine.set_headers(headers)
-                
-                # 使用 curl 引擎发送请求，验证会话是否有效
-                response = self._curl_engine.request("GET", url)
-                
-                # 如果响应中包含 Cloudflare 挑战页面，则认为挑战失败
-                if "challenge" in response.text.lower() or "cloudflare" in response.text.lower():
-                    raise CloudflareChallengeFailed("Cloudflare 挑战失败，响应中包含挑战页面")
-                
-                return AresResponse(response)
-            except Exception as e:
-                last_error = e
-                retries += 1
-                if self.debug:
-                    print(f"Cloudflare 挑战失败，重试 {retries}/{max_retries}: {str(e)}")
-                time.sleep(2)  # 等待一段时间后重试
-        
-        # 所有重试都失败
-        raise CloudflareChallengeFailed(f"无法通过 Cloudflare 挑战，最大重试次数已用尽: {str(last_error)}")
+        verify = verify or self.solve_verification
+        if verify not in SOLVE_VERIFICATION_MODES:
+            raise ValueError(f"Unknown verification mode: {verify!r}")
+
+        report = SolveReport(url, self._session_manager.session_key(url))
+
+        def attempt() -> AresResponse:
+            # 使用浏览器引擎执行挑战并将会话应用到 curl 引擎
+            page = self._handle_cloudflare(url, capture_page=verify in ("page", "none"), report=report)
+
+            # 验证会话并构建响应
+            with report.phase("verify"):
+                return self._verify_solve(url, page, verify)
+
+        def on_retry(retry: int, delay: float, error: Any) -> None:
+            report.retries = retry
+            if self.debug:
+                print(f"Cloudflare 挑战失败，{delay:.2f} 秒后重试 {retry}/{max_retries - 1}: {error}")
+
+        # max_retries 为总尝试次数，按重试策略退避并计入该主机的重试预算
+        try:
+            response = self.retry_policy.run(
+                attempt,
+                self._session_manager.session_key(url),
+                max_retries=max(max_retries - 1, 0),
+                on_retry=on_retry,
+            )
+        except Exception as e:
+            self.solve_stats.record(report.finish(e))
+            error = CloudflareChallengeFailed(f"无法通过 Cloudflare 挑战，最大重试次数已用尽: {str(e)}")
+            error.solve_report = report
+            raise error from e
+
+        # 记录挑战各阶段耗时并附加到响应
+        self.solve_stats.record(report.finish())
+        response.solve_report = report
+        return response
 
     def get_session_info(self, url: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -253,41 +808,59 @@ class AresClient:
             url (str, optional): 要获取会话信息的 URL。如果为 None，则返回所有会话信息。
             
         返回:
-            dict: 包含 cookies、headers 等会话信息的字典
+            dict: 包含 cookies、headers 等会话信息的字典，solve_report 为最近一次挑战的耗时报告（没有则为 None）
         """
         if not self._initialized:
             self._initialize()
             
         if url:
-            cookies = self._session_manager.get_cookies(url)
-            headers = self._session_manager.get_headers(url)
+            session = self._session_manager.get(url)
             
-            if not cookies or not headers:
+            if not session or not session["cookies"] or not session["headers"]:
                 return {}
                 
             return {
-                "cookies": cookies,
-                "headers": headers,
+                "cookies": session["cookies"],
+                "headers": session["headers"],
+                "cookie_expiry": session.get("cookie_expiry", {}),
+                "cookie_domains": session.get("cookie_domains", {}),
                 "timestamp": time.time(),
-                "url": url
+                "url": url,
+                "solve_report": self._last_solve_report(self._session_manager.session_key(url)),
             }
         else:
             # 返回所有会话信息
             result = {}
-            for domain, session in self._session_manager.sessions.items():
+            for domain, record in self._session_manager.sessions.items():
                 result[domain] = {
-                    "cookies": session["cookies"],
-                    "headers": session["headers"],
-                    "timestamp": session["timestamp"],
+                    "cookies": record["cookies"],
+                    "headers": record["headers"],
+                    "cookie_expiry": record.get("cookie_expiry", {}),
+                    "cookie_domains": record.get("cookie_domains", {}),
+                    "timestamp": record["timestamp"],
+                    "solve_report": self._last_solve_report(domain),
                 }
             return result
 
+    def _last_solve_report(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest solve report of a session as a dictionary.
+
+        Args:
+            key: Session key.
+
+        Returns:
+            Optional[Dict[str, Any]]: Report, or None if the session was not solved by this client.
+        """
+        report = self.solve_stats.last(key)
+        return report.to_dict() if report is not None else None
+
     def set_session_info(self, session_info: Dict[str, Any], url: Optional[str] = None) -> None:
         """
         设置会话信息
         
         参数:
-            session_info (dict): 包含 cookies、headers 等会话信息的字典
+            session_info (dict): 包含 cookies、headers 等会话信息的字典，可选 cookie_expiry（cookie 名称到过期时间戳）与 cookie_domains（cookie 名称到 Domain 属性）
             url (str, optional): 要设置会话信息的 URL。如果为 None，则使用 session_info 中的 url。
         """
         if not self._initialized:
@@ -301,14 +874,14 @@ class AresClient:
             
         cookies = session_info.get("cookies", {})
         headers = session_info.get("headers", {})
+        cookie_expiry = session_info.get("cookie_expiry")
+        cookie_domains = session_info.get("cookie_domains")
         
         # 更新会话管理器
-        self._session_manager.update(url, cookies, headers)
+        record = self._session_manager.update(url, cookies, headers, cookie_expiry, cookie_domains)
         
         # 应用会话到 curl 引擎
-        if self._curl_engine:
-            self._curl_engine.set_cookies(cookies)
-            self._curl_engine.set_headers(headers)
+        self._apply_session(url, record)
 
     def save_session(self, file_path: str, url: Optional[str] = None) -> None:
         """
@@ -344,10 +917,13 @@ class AresClient:
                 # 多个会话
                 for domain, info in session_info.items():
                     if "cookies" in info and "headers" in info:
-                        url = f"https://{domain}"
+                        # 以 "." 开头的键表示覆盖该域名及其子域名的会话
+                        url = f"https://{domain.lstrip('.')}"
                         self.set_session_info({
                             "cookies": info["cookies"],
                             "headers": info["headers"],
+                            "cookie_expiry": info.get("cookie_expiry"),
+                            "cookie_domains": info.get("cookie_domains"),
                             "url": url
                         })
 
@@ -371,41 +947,142 @@ class AresClient:
             data: Request data.
             json: JSON data.
             headers: Request headers.
-            **kwargs: Additional arguments.
+            **kwargs: Additional arguments. stream=True returns once the body starts
+                arriving and leaves the rest to be read from the response. The
+                response holds its connection, per-host and rate limiter slots
+                until it is closed or read to the end.
 
         Returns:
             AresResponse: Response object.
             
         Raises:
             CloudflareSessionExpired: 如果 Cloudflare 会话过期
+            RequestError: If the request fails and is not retried.
         """
         self._initialize()
 
         if not self._curl_engine:
             raise AresError("Curl engine not initialized")
 
+        request_kwargs = dict(params=params, data=data, json=json, headers=headers, **kwargs)
+        stream = bool(kwargs.get("stream"))
+
+        # Try without a browser first for hosts not known to challenge
+        if self.probe_first and not self._sync_session(url):
+            response = self._probe_request(method, url, request_kwargs)
+            if response is not None:
+                return AresResponse(response, stream)
+
         # Check if we need to handle Cloudflare first
-        if not self._session_manager.has_valid_session(url):
-            self._handle_cloudflare(url)
+        self._ensure_session(url)
 
         # Make request with curl engine
-        try:
-            response = self._curl_engine.request(
-                method=method,
-                url=url,
-                params=params,
-                data=data,
-                json=json,
-                headers=headers,
-                **kwargs,
-            )
-            return AresResponse(response)
-        except Exception as e:
-            # If request fails, check if it's a Cloudflare issue
-            error_str = str(e).lower()
-            if "cloudflare" in error_str or "challenge" in error_str or "captcha" in error_str:
-                raise CloudflareSessionExpired("Cloudflare 会话已过期，请重新执行 solve_challenge 方法") from e
-            raise
+        response = self._fetch(method, url, request_kwargs)
+        if is_challenge(response):
+            # The session was rejected
+            _close_response(response)
+            self._session_manager.clear(url)
+            if not self.probe_first:
+                raise CloudflareSessionExpired("Cloudflare 会话已过期，请重新执行 solve_challenge 方法")
+            # Solve again and retry once
+            self._ensure_session(url)
+            response = self._fetch(method, url, request_kwargs)
+        return AresResponse(response, stream)
+
+    def _fetch(self, method: str, url: str, request_kwargs: Dict[str, Any]) -> Any:
+        """
+        Answer a request from the cache or send it.
+
+        Args:
+            method: HTTP method.
+            url: URL to request.
+            request_kwargs: Arguments for CurlEngine.request.
+
+        Returns:
+            Any: Cached or fetched response.
+        """
+        if self.cache is None or request_kwargs.get("stream"):
+            # Streamed bodies are never buffered, so they cannot be cached
+            return self._send(method, url, request_kwargs)
+        lookup = self.cache.before(method, url, request_kwargs, self._session_manager.get(url))
+        if lookup.response is not None:
+            return lookup.response
+        response = self._send(method, url, lookup.request_kwargs)
+        return self.cache.after(method, lookup, response)
+
+    def _send(self, method: str, url: str, request_kwargs: Dict[str, Any]) -> Any:
+        """
+        Send a request with the curl engine under the retry policy and rate limiter.
+
+        Args:
+            method: HTTP method.
+            url: URL to request.
+            request_kwargs: Arguments for CurlEngine.request.
+
+        Returns:
+            Any: Response of the last attempt.
+
+        Raises:
+            RequestError: If the last attempt fails.
+        """
+        if not self._curl_engine:
+            raise AresError("Curl engine not initialized")
+        engine = self._curl_engine
+        host = self._session_manager.session_key(url)
+        limiter = self.rate_limiter
+
+        def attempt() -> Any:
+            try:
+                with ExitStack() as slot:
+                    if limiter is not None:
+                        slot.enter_context(limiter.limit(host))
+                    response = engine.request(method=method, url=url, **request_kwargs)
+                    if limiter is not None and request_kwargs.get("stream"):
+                        # A streamed body keeps the request in flight until it is read
+                        release_on_close(response, slot.pop_all().close)
+            except Exception as e:
+                self.metrics.error(host, method, e)
+                raise
+            self.metrics.observe(host, method, response)
+            if limiter is not None:
+                limiter.feedback(host, response)
+            return response
+
+        def on_retry(retry: int, delay: float, outcome: Any) -> None:
+            if not isinstance(outcome, BaseException):
+                _close_response(outcome)
+            if self.debug:
+                reason = getattr(outcome, "status_code", None) or outcome
+                print(f"{method} {url} 失败 ({reason})，{delay:.2f} 秒后重试 {retry}/{self.retry_policy.max_retries}")
+
+        return self.retry_policy.run(attempt, host, method, on_retry=on_retry)
+
+    def _probe_request(self, method: str, url: str, request_kwargs: Dict[str, Any]) -> Optional[Any]:
+        """
+        Send a request without a solved session and classify the response.
+
+        Args:
+            method: HTTP method.
+            url: URL to request.
+            request_kwargs: Arguments for CurlEngine.request.
+
+        Returns:
+            Optional[Any]: The response, or None if the host challenged it (or is
+                known to) and a browser solve is needed.
+        """
+        host = self._session_manager.session_key(url)
+        if self._domain_profile.get(host) == CHALLENGED:
+            return None
+
+        response = self._fetch(method, url, request_kwargs)
+        if is_challenge(response):
+            _close_response(response)
+            if self.debug:
+                print(f"{host} 返回 Cloudflare 挑战，切换到浏览器")
+            self._domain_profile.record(host, CHALLENGED)
+            return None
+        self._domain_profile.record(host, CLEAN)
+        return response
 
     def get(
         self,
@@ -573,6 +1250,62 @@ class AresClient:
         """
         return self._request("PATCH", url, data=data, headers=headers, **kwargs)
 
+    def download(
+        self,
+        url: str,
+        path: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None,
+        **kwargs: Any,
+    ) -> AresResponse:
+        """
+        Download a URL to a file chunk by chunk, without buffering the body in memory.
+
+        The body is written to "<path>.part" and renamed to path once complete,
+        so path never holds a partial download.
+
+        Args:
+            url: URL to download.
+            path: File to write.
+            chunk_size: Bytes written at a time.
+            progress: Called after every chunk with the bytes written so far and
+                the expected total, or None if the server did not announce it.
+            **kwargs: Additional arguments for the GET request.
+
+        Returns:
+            AresResponse: The response, whose body has been consumed.
+
+        Raises:
+            CloudflareSessionExpired: 如果 Cloudflare 会话过期
+            RequestError: 如果请求失败或服务器返回错误状态码
+        """
+        response = self.get(url, stream=True, **kwargs)
+        with response:
+            if not 200 <= (response.status_code or 0) < 300:
+                raise RequestError(f"下载失败: {url} 返回状态码 {response.status_code}")
+
+            # curl decodes compressed bodies, so the announced length only
+            # counts written bytes for identity-encoded ones
+            length = response.headers.get("Content-Length")
+            encoded = response.headers.get("Content-Encoding", "identity").lower() != "identity"
+            total = int(length) if length and length.isdigit() and not encoded else None
+
+            partial = f"{path}.part"
+            written = 0
+            try:
+                with open(partial, "wb") as file:
+                    for chunk in response.iter_content(chunk_size):
+                        file.write(chunk)
+                        written += len(chunk)
+                        if progress is not None:
+                            progress(written, total)
+                os.replace(partial, path)
+            except BaseException:
+                if os.path.exists(partial):
+                    os.remove(partial)
+                raise
+        return response
+
     @property
     def cookies(self) -> Dict[str, str]:
         """
@@ -597,10 +1330,51 @@ class AresClient:
             return self._curl_engine.get_headers()
         return {}
 
+    def connection_stats(self, host: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get connection reuse statistics of the curl engine.
+
+        Args:
+            host: Host to report on. None sums all hosts.
+
+        Returns:
+            Dict[str, Any]: Requests, new connections opened, requests served on
+                a reused connection, the reuse ratio, full TLS handshakes and
+                requests by HTTP version.
+        """
+        self._initialize()
+        if not self._curl_engine:
+            raise AresError("Curl engine not initialized")
+        return self._curl_engine.connection_stats.snapshot(host)
+
+    def shared_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get hit counts of the DNS cache, curl handles and connections shared between requests.
+
+        Returns:
+            Dict[str, Any]: DNS cache counters (None without a DNS cache), curl
+                handles created and reused, new and reused connections and full
+                TLS handshakes.
+        """
+        self._initialize()
+        if not self._curl_engine:
+            raise AresError("Curl engine not initialized")
+        return self._curl_engine.shared_cache_stats()
+
     def close(self) -> None:
         """Close all resources."""
+        if self._refresher:
+            self._refresher.stop()
+            self._refresher = None
+        if self._idle_timer:
+            self._idle_timer.cancel()
+            self._idle_timer = None
         if self._browser_engine:
-            self._browser_engine.close()
+            with self._browser_lock:
+                self._browser_engine.close()
         if self._curl_engine:
             self._curl_engine.close()
+        self._session_manager.close()
+        self._domain_profile.close()
+        self._applied_sessions.clear()
         self._initialized = False 
\ No newline at end of file
@@ -1,10 +1,48 @@
 """
 Engine implementations for CF-Ares.
+
+Browser engines are resolved lazily so importing this package does not load
+selenium or undetected-chromedriver.
 """
 
+from typing import Any
+
 from cf_ares.engines.base import BaseEngine
-from cf_ares.engines.curl import CurlEngine
-from cf_ares.engines.selenium import SeleniumBaseEngine
-from cf_ares.engines.undetected import UndetectedEngine
+from cf_ares.engines.curl import (
+    AsyncCurlEngine,
+    ConnectionStats,
+    CurlEngine,
+    PoolConfig,
+)
+from cf_ares.engines.pool import BrowserPool
+from cf_ares.engines.registry import (
+    available_engines,
+    get_engine_class,
+    register_engine,
+)
+
+_LAZY_ENGINES = {
+    "SeleniumBaseEngine": "seleniumbase",
+    "UndetectedEngine": "undetected",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ENGINES:
+        return get_engine_class(_LAZY_ENGINES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-__all__ = ["BaseEngine", "CurlEngine", "SeleniumBaseEngine", "UndetectedEngine"] 
\ No newline at end of file
+__all__ = [
+    "AsyncCurlEngine",
+    "BaseEngine",
+    "BrowserPool",
+    "ConnectionStats",
+    "CurlEngine",
+    "PoolConfig",
+    "SeleniumBaseEngine",
+    "UndetectedEngine",
+    "available_engines",
+    "get_engine_class",
+    "register_engine",
+]
@@ -3,7 +3,74 @@ Base engine interface for CF-Ares.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class BrowserPage:
+    """
+    Snapshot of the page a browser engine currently displays.
+    Exposes the attributes AresResponse reads from HTTP responses.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        content: bytes,
+        cookies: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        status_code: int = 200,
+        complete: bool = True,
+    ):
+        """
+        Initialize the page snapshot.
+
+        Args:
+            url: Current URL.
+            content: Page source.
+            cookies: Browser cookies.
+            headers: Response headers, if known. WebDriver does not expose them.
+            status_code: Status code. WebDriver does not expose it, so a page that
+                rendered past the challenge is reported as 200.
+            complete: Whether the snapshot is the fully loaded destination page.
+                False if it was taken while the page was still loading.
+        """
+        self.url = url
+        self.content = content
+        self.cookies = cookies or {}
+        self.headers = headers or {}
+        self.status_code = status_code
+        self.complete = complete
+
+    @property
+    def text(self) -> str:
+        """Get page source as text."""
+        return self.content.decode("utf-8", errors="replace")
+
+
+def split_cookie_records(
+    records: List[Dict[str, Any]],
+) -> Tuple[Dict[str, str], Dict[str, float], Dict[str, str]]:
+    """
+    Split WebDriver-style cookie records into the views the session needs.
+
+    Args:
+        records: Cookie dicts with "name", "value" and optionally "expiry" and "domain".
+
+    Returns:
+        Tuple[Dict[str, str], Dict[str, float], Dict[str, str]]: Values, expiry
+            times (session cookies left out) and domains, each by cookie name.
+    """
+    cookies: Dict[str, str] = {}
+    expiry: Dict[str, float] = {}
+    domains: Dict[str, str] = {}
+    for record in records:
+        name = record["name"]
+        cookies[name] = record["value"]
+        if record.get("expiry") is not None:
+            expiry[name] = float(record["expiry"])
+        if record.get("domain"):
+            domains[name] = record["domain"]
+    return cookies, expiry, domains
 
 
 class BaseEngine(ABC):
@@ -32,6 +99,103 @@ class BaseEngine(ABC):
         self.proxy = proxy
         self.timeout = timeout
         self.fingerprint = fingerprint
+        # Seconds spent in each phase of the last wait_for_cloudflare() call
+        self.last_wait_timings: Dict[str, float] = {}
+
+    def start(self) -> None:
+        """
+        Launch the underlying browser ahead of first use.
+
+        Engines start lazily on the first call to get(), so calling this is
+        only needed to take the launch cost off the critical path.
+        """
+        pass
+
+    @property
+    def is_running(self) -> bool:
+        """
+        Whether the engine currently holds a live browser process.
+
+        Returns:
+            bool: True if a browser is running.
+        """
+        return False
+
+    def is_healthy(self) -> bool:
+        """
+        Check that the engine is running and responsive.
+
+        Returns:
+            bool: True if the engine can be used.
+        """
+        return self.is_running
+
+    def get_page(self) -> Optional[BrowserPage]:
+        """
+        Get the page the browser currently displays.
+
+        Returns:
+            Optional[BrowserPage]: Page snapshot, or None if the engine cannot provide one.
+        """
+        return None
+
+    def get_cookie_expiry(self) -> Dict[str, float]:
+        """
+        Get the expiry time of the cookies in the current session.
+
+        Returns:
+            Dict[str, float]: Unix expiry time by cookie name. Session cookies
+                and engines that cannot tell are left out.
+        """
+        return {}
+
+    def get_cookie_domains(self) -> Dict[str, str]:
+        """
+        Get the Domain attribute of the cookies in the current session.
+
+        Returns:
+            Dict[str, str]: Cookie domain by cookie name, with a leading dot for
+                cookies that are also sent to subdomains. Engines that cannot
+                tell return an empty dict.
+        """
+        return {}
+
+    def get_cookie_records(self) -> List[Dict[str, Any]]:
+        """
+        Get the cookies of the current session with their attributes in one read.
+
+        Engines backed by a browser override this with a single round-trip;
+        the default combines get_cookies(), get_cookie_expiry() and
+        get_cookie_domains().
+
+        Returns:
+            List[Dict[str, Any]]: WebDriver-style cookie dicts with "name",
+                "value" and, where known, "expiry" and "domain".
+        """
+        expiry = self.get_cookie_expiry()
+        domains = self.get_cookie_domains()
+        records = []
+        for name, value in self.get_cookies().items():
+            record: Dict[str, Any] = {"name": name, "value": value}
+            if name in expiry:
+                record["expiry"] = expiry[name]
+            if name in domains:
+                record["domain"] = domains[name]
+            records.append(record)
+        return records
+
+    def clear_cookies(self, url: str) -> None:
+        """
+        Delete the browser's cookies for a URL.
+
+        A browser that still holds a valid clearance is not challenged again,
+        so it must forget the old one before it can obtain a new one. Engines
+        without persistent cookies do nothing.
+
+        Args:
+            url: URL whose cookies to delete.
+        """
+        pass
 
     @abstractmethod
     def get(self, url: str) -> Any:
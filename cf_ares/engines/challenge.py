@@ -0,0 +1,272 @@
+"""
+Cloudflare challenge detection shared by the WebDriver-based engines.
+
+Completion is detected with a single JavaScript probe that checks all
+challenge markers in one WebDriver round-trip, polled by WebDriverWait at a
+short interval, instead of fixed sleeps and one find_elements call per
+selector. Chromium engines can alternatively complete as soon as the
+clearance cookie is issued (see wait_for_cookie).
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from cf_ares.exceptions import CloudflareError
+
+# Common Cloudflare challenge selectors and patterns
+CF_SELECTORS = [
+    "#cf-challenge-running",
+    "#cf-please-wait",
+    "#cf-content",
+    "div.cf-browser-verification",
+    "#challenge-form",
+    "#challenge-running",
+    "#challenge-error-title",
+]
+
+CF_TITLES = ["just a moment", "attention required"]
+
+# Returns the page state, whether any challenge marker is present and the
+# challenge error text, in one round-trip.
+PROBE_SCRIPT = """
+var selectors = arguments[0], titles = arguments[1];
+var challenge = document.querySelector(selectors) !== null;
+var title = (document.title || "").toLowerCase();
+for (var i = 0; i < titles.length && !challenge; i++) {
+    if (title.indexOf(titles[i]) !== -1) { challenge = true; }
+}
+var error = document.querySelector("#challenge-error-title");
+return {
+    ready: document.readyState,
+    challenge: challenge,
+    error: error ? (error.textContent || "").trim() : null
+};
+"""
+
+DEFAULT_POLL_FREQUENCY = 0.1
+DEFAULT_SETTLE_TIMEOUT = 5.0
+
+
+def probe(driver: Any) -> Dict[str, Any]:
+    """
+    Inspect the current page for Cloudflare challenge markers.
+
+    Args:
+        driver: WebDriver instance.
+
+    Returns:
+        Dict[str, Any]: "ready" (document.readyState), "challenge" (bool) and
+            "error" (challenge error text or None).
+    """
+    result = driver.execute_script(PROBE_SCRIPT, ", ".join(CF_SELECTORS), CF_TITLES)
+    return result or {"ready": "complete", "challenge": False, "error": None}
+
+
+def wait_for_challenge(
+    driver: Any,
+    timeout: float,
+    poll_frequency: float = DEFAULT_POLL_FREQUENCY,
+    settle_timeout: float = DEFAULT_SETTLE_TIMEOUT,
+) -> Dict[str, float]:
+    """
+    Wait until the current page is past any Cloudflare challenge.
+
+    Returns as soon as the page settles: immediately when no challenge is
+    present, otherwise as soon as the challenge markers disappear and the
+    destination page has finished loading.
+
+    Args:
+        driver: WebDriver instance.
+        timeout: Maximum seconds to wait for the challenge to be solved.
+        poll_frequency: Seconds between probes.
+        settle_timeout: Maximum seconds to wait for the destination page to load.
+
+    Returns:
+        Dict[str, float]: Seconds spent in each phase: "detect", "solve", "settle".
+
+    Raises:
+        CloudflareError: If the challenge reports an error or times out.
+    """
+    timings = {"detect": 0.0, "solve": 0.0, "settle": 0.0}
+
+    # Detect: a single probe of the loaded page
+    start = time.perf_counter()
+    try:
+        state = probe(driver)
+    except WebDriverException:
+        # Page is still navigating; let the polling below decide
+        state = {"ready": "loading", "challenge": True, "error": None}
+    timings["detect"] = time.perf_counter() - start
+    if state.get("error"):
+        raise CloudflareError(f"Cloudflare challenge failed: {state['error']}")
+    if not state.get("challenge"):
+        return timings
+
+    # Solve: poll the probe until the challenge markers are gone
+    start = time.perf_counter()
+
+    def solved(d: Any) -> Any:
+        current = probe(d)
+        if current.get("error"):
+            raise CloudflareError(f"Cloudflare challenge failed: {current['error']}")
+        return current if not current.get("challenge") else False
+
+    try:
+        state = WebDriverWait(
+            driver, timeout, poll_frequency=poll_frequency, ignored_exceptions=(WebDriverException,)
+        ).until(solved)
+    except TimeoutException:
+        raise CloudflareError("Cloudflare challenge timed out") from None
+    finally:
+        timings["solve"] = time.perf_counter() - start
+
+    # Settle: wait for the destination page to finish loading
+    start = time.perf_counter()
+    if state.get("ready") != "complete":
+        try:
+            WebDriverWait(
+                driver, settle_timeout, poll_frequency=poll_frequency, ignored_exceptions=(WebDriverException,)
+            ).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+        except TimeoutException:
+            pass
+    timings["settle"] = time.perf_counter() - start
+
+    return timings
+
+
+DEFAULT_READY_COOKIE = "cf_clearance"
+
+
+def cookie_state(driver: Any, url: str, name: str) -> Optional[Tuple[str, float]]:
+    """
+    Read a cookie for a URL through DevTools.
+
+    Unlike driver.get_cookies(), this does not depend on the current page and
+    works while the destination page is still loading.
+
+    Args:
+        driver: Chromium-based WebDriver instance.
+        url: URL the cookie must apply to.
+        name: Cookie name.
+
+    Returns:
+        Optional[Tuple[str, float]]: Value and expiry time (-1 for a session
+            cookie), or None if the cookie is not set for the URL.
+    """
+    try:
+        result = driver.execute_cdp_cmd("Network.getCookies", {"urls": [url]})
+    except WebDriverException:
+        return None
+    for cookie in result.get("cookies", []):
+        if cookie.get("name") == name:
+            return cookie.get("value", ""), cookie.get("expires", -1)
+    return None
+
+
+def has_cookie(driver: Any, url: str, name: str) -> bool:
+    """
+    Check through DevTools whether the browser holds a cookie for a URL.
+
+    Args:
+        driver: Chromium-based WebDriver instance.
+        url: URL the cookie must apply to.
+        name: Cookie name.
+
+    Returns:
+        bool: True if the cookie is set for the URL.
+    """
+    return cookie_state(driver, url, name) is not None
+
+
+def delete_cookies(driver: Any, url: str) -> None:
+    """
+    Delete the cookies a browser would send to a URL.
+
+    Uses DevTools where available, so it works whatever page the browser is
+    on, and falls back to deleting the cookies of the current page.
+
+    Args:
+        driver: WebDriver instance.
+        url: URL whose cookies to delete.
+    """
+    try:
+        result = driver.execute_cdp_cmd("Network.getCookies", {"urls": [url]})
+        for cookie in result.get("cookies", []):
+            driver.execute_cdp_cmd(
+                "Network.deleteCookies",
+                {"name": cookie["name"], "domain": cookie.get("domain"), "path": cookie.get("path", "/")},
+            )
+    except (AttributeError, WebDriverException):
+        driver.delete_all_cookies()
+
+
+def wait_for_cookie(
+    driver: Any,
+    url: str,
+    cookie_name: str,
+    timeout: float,
+    poll_frequency: float = DEFAULT_POLL_FREQUENCY,
+    cookie_event: Optional[threading.Event] = None,
+    previous: Optional[Tuple[str, float]] = None,
+) -> Dict[str, float]:
+    """
+    Wait until the browser is issued the "ready" cookie for a URL.
+
+    Returns the moment the cookie is set, without waiting for the destination
+    page to load. Pages that never present a challenge are recognised by the
+    DOM probe, so they do not wait for a cookie that will not come. A cookie
+    left over from an earlier visit does not count: pass its state as
+    previous and only a newly issued cookie ends the wait.
+
+    Args:
+        driver: Chromium-based WebDriver instance.
+        url: URL the cookie must apply to.
+        cookie_name: Name of the cookie that marks a solved challenge.
+        timeout: Maximum seconds to wait.
+        poll_frequency: Seconds between checks.
+        cookie_event: Optional event set by a DevTools Network listener when a
+            matching Set-Cookie is seen, used to wake up early.
+        previous: Value and expiry of the cookie before navigating, as
+            returned by cookie_state(), or None if it was not set.
+
+    Returns:
+        Dict[str, float]: Seconds spent in each phase: "detect", "solve", "settle".
+
+    Raises:
+        CloudflareError: If the challenge reports an error or times out.
+    """
+    timings = {"detect": 0.0, "solve": 0.0, "settle": 0.0}
+    start = time.perf_counter()
+    deadline = start + timeout
+
+    while True:
+        cookie = cookie_state(driver, url, cookie_name)
+        if cookie is not None and cookie != previous:
+            break
+
+        try:
+            state = probe(driver)
+        except WebDriverException:
+            state = {"ready": "loading", "challenge": True, "error": None}
+        if state.get("error"):
+            raise CloudflareError(f"Cloudflare challenge failed: {state['error']}")
+        if not state.get("challenge") and state.get("ready") == "complete":
+            # No challenge on this page, nothing to wait for
+            timings["detect"] = time.perf_counter() - start
+            return timings
+
+        if time.perf_counter() >= deadline:
+            raise CloudflareError("Cloudflare challenge timed out waiting for clearance cookie")
+        if cookie_event is not None:
+            cookie_event.wait(poll_frequency)
+        else:
+            time.sleep(poll_frequency)
+
+    timings["solve"] = time.perf_counter() - start
+    return timings
@@ -2,19 +2,270 @@
 curl_cffi engine implementation for CF-Ares.
 """
 
-from typing import Any, Dict, List, Optional, Union
+import threading
+import weakref
+from collections import Counter
+from contextlib import ExitStack, contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Union, cast
+from urllib.parse import urlparse
 
 from curl_cffi import requests
+from curl_cffi.const import CurlHttpVersion, CurlInfo, CurlMOpt, CurlOpt
+
+try:
+    # Private API, used to set multi handle options (see AsyncCurlEngine._configure_multi)
+    from curl_cffi._wrapper import ffi, lib  # type: ignore[import-not-found]
+except ImportError:
+    ffi = lib = None
 
 from cf_ares.engines.base import BaseEngine
 from cf_ares.exceptions import RequestError
+from cf_ares.utils.dns import DNSCache, shared_dns_cache
 from cf_ares.utils.fingerprint import FingerprintManager
+from cf_ares.utils.metrics import TIMING_INFOS
+
+# libcurl CURLMOPT_PIPELINING values
+CURLPIPE_NOTHING = 0
+CURLPIPE_MULTIPLEX = 2
+
+# Response.http_version values by protocol name
+HTTP_VERSION_NAMES = {
+    int(CurlHttpVersion.V1_0): "1.0",
+    int(CurlHttpVersion.V1_1): "1.1",
+    int(CurlHttpVersion.V2_0): "2",
+    int(CurlHttpVersion.V3): "3",
+}
+
+
+def release_on_close(response: Any, release: Callable[[], None]) -> None:
+    """
+    Hand slots held for a request over to its streamed response.
+
+    curl_cffi returns a streamed response as soon as the body starts, while the
+    transfer keeps its connection busy until the body is read or the response
+    closed. release runs once, when the response is closed, read to the end
+    or garbage collected.
+
+    Args:
+        response: Streamed curl_cffi response.
+        release: Callable releasing the slots.
+    """
+    # Runs at most once, whichever comes first
+    finalizer = weakref.finalize(response, release)
+    original_close = response.close
+    original_iter_content = response.iter_content
+
+    def close() -> None:
+        try:
+            original_close()
+        finally:
+            finalizer()
+
+    def iter_content(*args: Any, **kwargs: Any) -> Iterator[bytes]:
+        try:
+            yield from original_iter_content(*args, **kwargs)
+        finally:
+            # Ends the transfer if the caller stopped early, then releases
+            close()
+
+    response.close = close
+    response.iter_content = iter_content
+
+
+class PoolConfig:
+    """
+    Connection pool settings of a curl engine.
+
+    Synchronous engines give each request in flight its own curl handle (and
+    connection cache), so max_connections bounds each handle's cache and the
+    number of requests in flight across all threads. Asynchronous engines run every
+    transfer on one curl multi handle, which enforces the limits itself and
+    multiplexes HTTP/2 streams over shared connections.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_connections_per_host: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        max_lifetime: Optional[float] = None,
+        http2: Optional[bool] = None,
+        multiplex: bool = True,
+        max_concurrent_streams: Optional[int] = None,
+        tcp_keepalive: Optional[float] = None,
+    ):
+        """
+        Initialize the settings. None leaves a setting at the libcurl default.
+
+        Args:
+            max_connections: Maximum number of open connections, in total.
+            max_connections_per_host: Maximum number of connections per host.
+            idle_timeout: Seconds an idle connection is kept for reuse (libcurl
+                default 118).
+            max_lifetime: Seconds after which a connection is not reused, however busy.
+            http2: True negotiates HTTP/2 over TLS, False forces HTTP/1.1. None
+                keeps the impersonated browser's choice.
+            multiplex: Run concurrent requests to a host as HTTP/2 streams on one
+                connection. With http2=True, requests also wait for a connection
+                being set up rather than opening another one.
+            max_concurrent_streams: Maximum number of streams per HTTP/2 connection.
+            tcp_keepalive: Send TCP keep-alive probes after this many idle seconds.
+        """
+        for name, value in (
+            ("max_connections", max_connections),
+            ("max_connections_per_host", max_connections_per_host),
+            ("max_concurrent_streams", max_concurrent_streams),
+        ):
+            if value is not None and value < 1:
+                raise ValueError(f"{name} must be at least 1")
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.http2 = http2
+        self.multiplex = multiplex
+        self.max_concurrent_streams = max_concurrent_streams
+        self.tcp_keepalive = tcp_keepalive
+
+    def curl_options(self) -> Dict[CurlOpt, Any]:
+        """
+        Get the per-handle libcurl options.
+
+        Returns:
+            Dict[CurlOpt, Any]: Options to set on every transfer.
+        """
+        options: Dict[CurlOpt, Any] = {}
+        if self.max_connections is not None:
+            options[CurlOpt.MAXCONNECTS] = self.max_connections
+        if self.idle_timeout is not None:
+            options[CurlOpt.MAXAGE_CONN] = int(self.idle_timeout)
+        if self.max_lifetime is not None:
+            options[CurlOpt.MAXLIFETIME_CONN] = int(self.max_lifetime)
+        if self.http2 is not None:
+            # Set as an option rather than http_version so impersonation does not override it
+            options[CurlOpt.HTTP_VERSION] = CurlHttpVersion.V2TLS if self.http2 else CurlHttpVersion.V1_1
+        if self.multiplex and self.http2:
+            # Only worth it when HTTP/2 is expected: an HTTP/1.1 connection cannot
+            # be shared, so waiting for it would serialise requests
+            options[CurlOpt.PIPEWAIT] = 1
+        if self.tcp_keepalive is not None:
+            options[CurlOpt.TCP_KEEPALIVE] = 1
+            options[CurlOpt.TCP_KEEPIDLE] = int(self.tcp_keepalive)
+            options[CurlOpt.TCP_KEEPINTVL] = int(self.tcp_keepalive)
+        return options
+
+    def multi_options(self) -> Dict[CurlMOpt, int]:
+        """
+        Get the libcurl multi handle options.
+
+        Returns:
+            Dict[CurlMOpt, int]: Options for the multi handle of an async engine.
+        """
+        options = {CurlMOpt.PIPELINING: CURLPIPE_MULTIPLEX if self.multiplex else CURLPIPE_NOTHING}
+        if self.max_connections is not None:
+            options[CurlMOpt.MAX_TOTAL_CONNECTIONS] = self.max_connections
+            options[CurlMOpt.MAXCONNECTS] = self.max_connections
+        if self.max_connections_per_host is not None:
+            options[CurlMOpt.MAX_HOST_CONNECTIONS] = self.max_connections_per_host
+        if self.max_concurrent_streams is not None:
+            options[CurlMOpt.MAX_CONCURRENT_STREAMS] = self.max_concurrent_streams
+        return options
+
+    def __repr__(self) -> str:
+        settings = ", ".join(f"{name}={value!r}" for name, value in vars(self).items() if value is not None)
+        return f"PoolConfig({settings})"
+
+
+class ConnectionStats:
+    """Per-host counts of requests served on new and reused connections, and of TLS handshakes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Counter] = {}
+
+    def record(self, host: str, response: Any) -> None:
+        """
+        Count a response.
+
+        Args:
+            host: Host the request went to.
+            response: curl_cffi response carrying transfer information.
+        """
+        infos = getattr(response, "infos", None)
+        if not infos or CurlInfo.NUM_CONNECTS not in infos:
+            return
+        connects = infos[CurlInfo.NUM_CONNECTS]
+        version = HTTP_VERSION_NAMES.get(getattr(response, "http_version", 0), "other")
+        with self._lock:
+            counts = self._hosts.get(host)
+            if counts is None:
+                counts = self._hosts[host] = Counter()
+            counts["requests"] += 1
+            counts["new_connections"] += connects
+            counts["reused"] += connects == 0
+            if connects and infos.get(CurlInfo.APPCONNECT_TIME):
+                counts["tls_handshakes"] += 1
+            counts[f"http/{version}"] += 1
+
+    def snapshot(self, host: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the counts.
+
+        Args:
+            host: Host to report on. None sums all hosts.
+
+        Returns:
+            Dict[str, Any]: Requests, new connections opened, requests served
+                on a reused connection, the reuse ratio, full TLS handshakes and
+                requests by HTTP version.
+        """
+        with self._lock:
+            if host is not None:
+                counts = Counter(self._hosts.get(host, {}))
+            else:
+                counts = sum(self._hosts.values(), Counter())
+        total = counts["requests"]
+        return {
+            "requests": total,
+            "new_connections": counts["new_connections"],
+            "reused": counts["reused"],
+            "reuse_ratio": counts["reused"] / total if total else 0.0,
+            "tls_handshakes": counts["tls_handshakes"],
+            "http_versions": {
+                name[len("http/"):]: count for name, count in sorted(counts.items()) if name.startswith("http/")
+            },
+        }
+
+    def hosts(self) -> List[str]:
+        """
+        Get the hosts with recorded requests.
+
+        Returns:
+            List[str]: Hosts.
+        """
+        with self._lock:
+            return list(self._hosts)
+
+    def reset(self) -> None:
+        """Forget all counts."""
+        with self._lock:
+            self._hosts.clear()
 
 
 class CurlEngine:
     """
     curl_cffi engine implementation.
     Uses curl_cffi for high-performance requests with TLS fingerprinting.
+
+    By default the engine wraps a single curl_cffi session and must not be
+    shared between threads. With thread_safe=True every request checks out an
+    idle session (and therefore a curl handle with its connection, TLS session
+    and DNS caches) and returns it afterwards, so a thread pool reuses warm
+    handles and only opens as many as it runs requests at once. All sessions
+    share one cookie jar and one set of default headers.
+
+    With a DNSCache, host lookups are shared by every handle and engine using
+    the cache rather than repeated per handle.
     """
 
     def __init__(
@@ -22,6 +273,10 @@ class CurlEngine:
         proxy: Optional[str] = None,
         timeout: int = 30,
         fingerprint: Optional[str] = None,
+        thread_safe: bool = False,
+        max_connections_per_host: Optional[int] = None,
+        pool: Optional[PoolConfig] = None,
+        dns_cache: Union[bool, DNSCache, None] = None,
     ):
         """
         Initialize the curl_cffi engine.
@@ -30,11 +285,39 @@ class CurlEngine:
             proxy: Proxy to use.
             timeout: Request timeout in seconds.
             fingerprint: Browser fingerprint to use.
+            thread_safe: Use a pool of sessions with a shared cookie jar and headers.
+            max_connections_per_host: Maximum number of concurrent requests (and
+                therefore connections) per host. None means unlimited. Overrides
+                the pool setting of the same name.
+            pool: Connection pool settings. Defaults to libcurl's.
+            dns_cache: DNS cache to resolve hosts with. True uses the process-wide
+                cache, None or False leaves lookups to each curl handle.
         """
         self.proxy = proxy
         self.timeout = timeout
         self.fingerprint = fingerprint
+        self.thread_safe = thread_safe
+        self.pool = pool if pool is not None else PoolConfig()
+        if max_connections_per_host is None:
+            max_connections_per_host = self.pool.max_connections_per_host
+        self.max_connections_per_host = max_connections_per_host
+        self.connection_stats = ConnectionStats()
+        self.dns_cache = shared_dns_cache() if dns_cache is True else dns_cache or None
         self.fingerprint_manager = FingerprintManager()
+        self._lock = threading.RLock()
+        self._curl_options = self.pool.curl_options()
+        # Idle sessions of a thread-safe engine, most recently used last
+        self._idle_sessions: List[Any] = []
+        self._pooled_sessions: List[Any] = []
+        self._session_headers: Dict[int, int] = {}
+        self._session_counts: Counter = Counter()
+        self._used_sessions: Set[int] = set()
+        self._headers_version = 0
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._pool_slots = (
+            threading.BoundedSemaphore(self.pool.max_connections) if self.pool.max_connections else None
+        )
+        self._domain_headers: Dict[str, Dict[str, str]] = {}
         self.session = self._create_session()
 
     def _create_session(self) -> requests.Session:
@@ -48,11 +331,48 @@ class CurlEngine:
         tls_fingerprint = self.fingerprint_manager.get_tls_fingerprint(self.fingerprint)
         
         # Create session
-        session = requests.Session(
-            timeout=self.timeout,
-            impersonate="chrome110",  # Default to Chrome 110 impersonation
-        )
+        session = requests.Session(**self._session_kwargs())
+        self._configure_session(session)
         
+        return session
+
+    def _create_pooled_session(self) -> requests.Session:
+        """
+        Create a session for the pool of a thread-safe engine.
+
+        Returns:
+            requests.Session: curl_cffi session sharing the primary session's cookie jar.
+        """
+        # Pooled sessions move between threads, so they must keep one curl handle
+        # rather than curl_cffi's default of a fresh one per thread
+        session = requests.Session(use_thread_local_curl=False, **self._session_kwargs())
+        self._configure_session(session)
+        # Share the cookie jar (internally locked) with the primary session
+        session.cookies = self.session.cookies.jar
+        return session
+
+    def _session_kwargs(self) -> Dict[str, Any]:
+        """
+        Get keyword arguments used to construct a curl_cffi session.
+
+        Returns:
+            Dict[str, Any]: Session constructor arguments.
+        """
+        return {
+            "timeout": self.timeout,
+            "impersonate": "chrome110",  # Default to Chrome 110 impersonation
+            # Have libcurl report phase timings on every response
+            "curl_infos": list(TIMING_INFOS),
+            "curl_options": dict(self._curl_options),
+        }
+
+    def _configure_session(self, session: Any) -> None:
+        """
+        Apply proxy and default headers to a freshly created session.
+
+        Args:
+            session: curl_cffi session (sync or async).
+        """
         # Set proxy if specified
         if self.proxy:
             session.proxies = {"http": self.proxy, "https": self.proxy}
@@ -71,28 +391,187 @@ class CurlEngine:
             "Sec-Fetch-Site": "none",
             "Sec-Fetch-User": "?1",
         })
-        
-        return session
 
-    def set_cookies(self, cookies: Dict[str, str]) -> None:
+    def set_cookies(self, cookies: Dict[str, str], domain: Optional[str] = None) -> None:
         """
         Set cookies for the session.
 
         Args:
             cookies: Cookies to set.
+            domain: Host the cookies belong to. Domain-scoped cookies replace the
+                host's previous cookies and are only sent to that host. If None,
+                cookies are sent to every host.
         """
         # Convert cookies to curl_cffi format
-        for name, value in cookies.items():
-            self.session.cookies.set(name, value)
+        with self._lock:
+            for name, value in cookies.items():
+                self.session.cookies.set(name, value, domain=domain or "")
+            if domain:
+                # Drop the host's stale cookies only after the new ones are in
+                # place, so concurrent requests never go out without a session
+                jar = self.session.cookies.jar
+                stale = [c for c in jar if c.domain == domain and c.name not in cookies]
+                for cookie in stale:
+                    jar.clear(cookie.domain, cookie.path, cookie.name)
 
-    def set_headers(self, headers: Dict[str, str]) -> None:
+    def set_headers(self, headers: Dict[str, str], domain: Optional[str] = None) -> None:
         """
         Set headers for the session.
 
         Args:
             headers: Headers to set.
+            domain: Host the headers belong to. Domain-scoped headers replace the
+                host's previous headers and are only merged into requests to that
+                host. If None, headers are added to every request.
+        """
+        with self._lock:
+            if domain:
+                self._domain_headers[domain] = dict(headers)
+                return
+            self.session.headers.update(headers)
+            self._headers_version += 1
+
+    def get_cookies(self) -> Dict[str, str]:
+        """
+        Get cookies from the session.
+
+        Returns:
+            Dict[str, str]: Cookies as a dictionary.
+        """
+        with self._lock:
+            return {name: value for name, value in self.session.cookies.items()}
+
+    def get_headers(self, domain: Optional[str] = None) -> Dict[str, str]:
+        """
+        Get headers from the session.
+
+        Args:
+            domain: Host to include domain-scoped headers for.
+
+        Returns:
+            Dict[str, str]: Headers as a dictionary.
+        """
+        with self._lock:
+            headers = {
+                name: value for name, value in self.session.headers.items() if value is not None
+            }
+            if domain:
+                headers.update(self._domain_headers.get(domain, {}))
+            return headers
+
+    @contextmanager
+    def _checkout_session(self) -> Iterator[Any]:
+        """
+        Hold a session for the duration of a request.
+
+        A thread-safe engine hands out its most recently used idle session, whose
+        connections are the likeliest to still be open, and creates one only
+        when every session is busy.
+        """
+        if not self.thread_safe:
+            self._count_session(self.session)
+            yield self.session
+            return
+
+        with self._lock:
+            session = self._idle_sessions.pop() if self._idle_sessions else None
+        if session is None:
+            session = self._create_pooled_session()
+            with self._lock:
+                self._pooled_sessions.append(session)
+        self._count_session(session)
+
+        key = id(session)
+        if self._session_headers.get(key) != self._headers_version:
+            with self._lock:
+                session.headers.clear()
+                session.headers.update(self.session.headers)
+                self._session_headers[key] = self._headers_version
+
+        try:
+            yield session
+        finally:
+            with self._lock:
+                self._idle_sessions.append(session)
+
+    def _count_session(self, session: Any) -> None:
+        """
+        Count a session checkout as a new or a reused curl handle.
+
+        Args:
+            session: Session about to make a request.
+        """
+        key = id(session)
+        with self._lock:
+            self._session_counts["reused" if key in self._used_sessions else "created"] += 1
+            self._used_sessions.add(key)
+
+    def _pin_resolve(self, session: Any, entry: Optional[str]) -> None:
+        """
+        Set the CURLOPT_RESOLVE entry for the session's next transfer.
+
+        Args:
+            session: Session about to make a request.
+            entry: Entry from the DNS cache, or None to resolve normally.
         """
-        self.session.headers.update(headers)
+        if entry is None:
+            session.curl_options = self._curl_options
+        else:
+            session.curl_options = {**self._curl_options, CurlOpt.RESOLVE: [entry]}
+
+    def _uses_dns_cache(self, kwargs: Dict[str, Any]) -> bool:
+        """
+        Check whether a request resolves its host through the DNS cache.
+
+        Args:
+            kwargs: Request arguments.
+
+        Returns:
+            bool: True if the engine has a DNS cache and the request goes out directly.
+        """
+        # Behind a proxy the proxy resolves the host, so pinning it is pointless
+        return self.dns_cache is not None and not (self.proxy or kwargs.get("proxy") or kwargs.get("proxies"))
+
+    def _merge_headers(self, url: str, headers: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        """
+        Merge the domain-scoped session headers for a URL with per-request headers.
+
+        Args:
+            url: URL being requested.
+            headers: Per-request headers, which take precedence.
+
+        Returns:
+            Optional[Dict[str, str]]: Headers to send on top of the session defaults.
+        """
+        domain_headers = self._domain_headers.get(urlparse(url).hostname or "")
+        if not domain_headers:
+            return headers
+        if not headers:
+            return domain_headers
+        return {**domain_headers, **headers}
+
+    @contextmanager
+    def _host_slot(self, url: str) -> Iterator[None]:
+        """
+        Hold one of the per-host connection slots, and one of the pool's, for
+        the duration of a request. Streamed requests keep them until the
+        response is closed or read to the end.
+
+        Args:
+            url: URL being requested.
+        """
+        slot: Any = nullcontext()
+        if self.max_connections_per_host:
+            host = urlparse(url).netloc
+            slot = self._host_slots.get(host)
+            if slot is None:
+                with self._lock:
+                    slot = self._host_slots.setdefault(
+                        host, threading.BoundedSemaphore(self.max_connections_per_host)
+                    )
+        # Wait for the host first, so a busy host never holds pool slots others could use
+        with slot, self._pool_slots or nullcontext():
+            yield
 
     def request(
         self,
@@ -123,38 +602,233 @@ class CurlEngine:
             RequestError: If request fails.
         """
         try:
-            # Prepare request arguments
-            request_kwargs = {
-                "params": params,
-                "timeout": kwargs.get("timeout", self.timeout),
-            }
-            
-            # Add data or JSON if specified
-            if data is not None:
-                request_kwargs["data"] = data
-            if json is not None:
-                request_kwargs["json"] = json
-            
-            # Add headers if specified
-            if headers is not None:
-                request_kwargs["headers"] = headers
-            
-            # Add additional arguments
-            for key, value in kwargs.items():
-                if key not in request_kwargs:
-                    request_kwargs[key] = value
-            
+            headers = self._merge_headers(url, headers)
+            request_kwargs = self._build_request_kwargs(params, data, json, headers, **kwargs)
+            dns_cache = self.dns_cache if self._uses_dns_cache(kwargs) else None
+            entry = dns_cache.resolve_option(url) if dns_cache else None
+
             # Make request
-            response = self.session.request(method, url, **request_kwargs)
-            
+            with ExitStack() as slots:
+                slots.enter_context(self._host_slot(url))
+                with self._checkout_session() as session:
+                    if self.dns_cache is not None:
+                        self._pin_resolve(session, entry)
+                    response = session.request(method, url, **request_kwargs)
+                if kwargs.get("stream"):
+                    release_on_close(response, slots.pop_all().close)
+
+            self.connection_stats.record(urlparse(url).hostname or "", response)
             return response
         except Exception as e:
-            raise RequestError(f"Request failed: {e}")
+            raise RequestError(f"Request failed: {e}") from e
+
+    def _build_request_kwargs(
+        self,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Any] = None,
+        json: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """
+        Build keyword arguments for a curl_cffi request.
+
+        Args:
+            params: Query parameters.
+            data: Request data.
+            json: JSON data.
+            headers: Request headers.
+            **kwargs: Additional arguments.
+
+        Returns:
+            Dict[str, Any]: Request arguments.
+        """
+        # Prepare request arguments
+        request_kwargs = {
+            "params": params,
+            "timeout": kwargs.get("timeout", self.timeout),
+        }
+        
+        # Add data or JSON if specified
+        if data is not None:
+            request_kwargs["data"] = data
+        if json is not None:
+            request_kwargs["json"] = json
+        
+        # Add headers if specified
+        if headers is not None:
+            request_kwargs["headers"] = headers
+        
+        # Add additional arguments
+        for key, value in kwargs.items():
+            if key not in request_kwargs:
+                request_kwargs[key] = value
+        
+        return request_kwargs
+
+    def shared_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get hit counts of the caches shared between requests.
+
+        Returns:
+            Dict[str, Any]: DNS cache counters (None without a DNS cache), curl
+                handles created and reused, requests served on reused
+                connections, new connections and full TLS handshakes.
+        """
+        connections = self.connection_stats.snapshot()
+        with self._lock:
+            handles = {
+                "created": self._session_counts["created"],
+                "reused": self._session_counts["reused"],
+                "idle": len(self._idle_sessions),
+            }
+        return {
+            "dns": self.dns_cache.stats() if self.dns_cache is not None else None,
+            "handles": handles,
+            "connections": {
+                "new": connections["new_connections"],
+                "reused": connections["reused"],
+            },
+            "tls_handshakes": connections["tls_handshakes"],
+        }
 
     def close(self) -> None:
+        """Close the engine and release resources."""
+        with self._lock:
+            sessions = [self.session, *self._pooled_sessions]
+            self._pooled_sessions.clear()
+            self._idle_sessions.clear()
+            self._session_headers.clear()
+            self._used_sessions.clear()
+        for session in sessions:
+            if session:
+                try:
+                    session.close()
+                except:
+                    pass 
+
+
+class AsyncCurlEngine(CurlEngine):
+    """
+    Asynchronous curl_cffi engine implementation.
+    Uses curl_cffi's AsyncSession so many requests can be in flight on one event loop.
+    """
+
+    session: requests.AsyncSession  # type: ignore[assignment]
+
+    def __init__(
+        self,
+        proxy: Optional[str] = None,
+        timeout: int = 30,
+        fingerprint: Optional[str] = None,
+        max_clients: int = 10,
+        pool: Optional[PoolConfig] = None,
+        dns_cache: Union[bool, DNSCache, None] = None,
+    ):
+        """
+        Initialize the asynchronous curl_cffi engine.
+
+        Args:
+            proxy: Proxy to use.
+            timeout: Request timeout in seconds.
+            fingerprint: Browser fingerprint to use.
+            max_clients: Maximum number of concurrent transfers on the session.
+            pool: Connection pool settings, applied to the session's curl multi
+                handle. Defaults to libcurl's.
+            dns_cache: DNS cache to resolve hosts with. True uses the process-wide
+                cache. The multi handle already shares its DNS cache between
+                transfers, so this mainly helps when several engines run at once.
+        """
+        self.max_clients = max_clients
+        # AsyncCurl instances (one multi handle each) that got the pool settings
+        self._configured_multis: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        super().__init__(
+            proxy=proxy, timeout=timeout, fingerprint=fingerprint, pool=pool, dns_cache=dns_cache
+        )
+
+    def _create_session(self) -> requests.AsyncSession:  # type: ignore[override]
+        """
+        Create a new curl_cffi async session.
+
+        Returns:
+            requests.AsyncSession: curl_cffi async session.
+        """
+        session = requests.AsyncSession(max_clients=self.max_clients, **self._session_kwargs())
+        self._configure_session(session)
+        return session
+
+    def _configure_multi(self) -> None:
+        """
+        Apply the pool settings to the session's multi handle, which needs a running loop.
+
+        The session creates its AsyncCurl lazily and may create another one for
+        a different event loop, so each instance is configured once. Without
+        curl_cffi's private multi handle API the options are skipped and
+        libcurl's defaults apply.
+        """
+        acurl = self.session.acurl
+        if acurl in self._configured_multis:
+            return
+        self._configured_multis.add(acurl)
+        curlm = getattr(acurl, "_curlm", None)
+        if lib is None or curlm is None:
+            return
+        for option, value in self.pool.multi_options().items():
+            # curl_multi_setopt takes these as a long passed by value. AsyncCurl.setopt
+            # passes a pointer to one instead, which libcurl reads as a huge limit.
+            lib.curl_multi_setopt(curlm, option, ffi.cast("void *", value))
+
+    async def request(  # type: ignore[override]
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Any] = None,
+        json: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Make a request without blocking the event loop.
+
+        Args:
+            method: HTTP method.
+            url: URL to request.
+            params: Query parameters.
+            data: Request data.
+            json: JSON data.
+            headers: Request headers.
+            **kwargs: Additional arguments.
+
+        Returns:
+            Any: Response object.
+
+        Raises:
+            RequestError: If request fails.
+        """
+        try:
+            headers = self._merge_headers(url, headers)
+            request_kwargs = self._build_request_kwargs(params, data, json, headers, **kwargs)
+            self._configure_multi()
+            dns_cache = self.dns_cache if self._uses_dns_cache(kwargs) else None
+            if dns_cache:
+                # Another request may swap the entry before the transfer starts;
+                # entries name their host, so this one then falls back to the
+                # multi handle's own DNS cache
+                self._pin_resolve(self.session, await dns_cache.aresolve_option(url))
+            self._count_session(self.session)
+            response = await self.session.request(
+                cast(requests.HttpMethod, method), url, **request_kwargs
+            )
+            self.connection_stats.record(urlparse(url).hostname or "", response)
+            return response
+        except Exception as e:
+            raise RequestError(f"Request failed: {e}") from e
+
+    async def close(self) -> None:  # type: ignore[override]
         """Close the engine and release resources."""
         if self.session:
             try:
-                self.session.close()
+                await self.session.close()
             except:
-                pass 
\ No newline at end of file
+                pass
@@ -0,0 +1,318 @@
+"""
+Warm browser pool for CF-Ares.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from cf_ares.engines.base import BaseEngine
+from cf_ares.engines.registry import get_engine_class
+from cf_ares.exceptions import BrowserError
+
+
+class _PooledEngine:
+    """Bookkeeping for one engine owned by a BrowserPool."""
+
+    __slots__ = ("engine", "created", "uses", "generation")
+
+    def __init__(self, engine: BaseEngine, generation: int = 0):
+        self.engine = engine
+        self.created = time.monotonic()
+        self.uses = 0
+        self.generation = generation
+
+
+class BrowserPool:
+    """
+    Bounded pool of pre-launched browser engines.
+    Lets several clients or threads solve challenges for different domains
+    concurrently without paying a cold browser start on the critical path.
+    """
+
+    def __init__(
+        self,
+        engine: str = "undetected",
+        size: int = 2,
+        engine_kwargs: Optional[Dict[str, Any]] = None,
+        max_uses: Optional[int] = 50,
+        max_age: Optional[float] = 1800,
+        prelaunch: bool = True,
+    ):
+        """
+        Initialize the browser pool.
+
+        Args:
+            engine: Registered browser engine name, e.g. "undetected" or "seleniumbase".
+            size: Maximum number of browser instances.
+            engine_kwargs: Keyword arguments passed to the engine constructor.
+            max_uses: Recycle an instance after this many checkouts. None disables.
+            max_age: Recycle an instance after this many seconds. None disables.
+            prelaunch: Launch all instances in parallel when the pool is created.
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+
+        self.engine_name = engine
+        self.size = size
+        self.engine_kwargs = engine_kwargs or {}
+        self.max_uses = max_uses
+        self.max_age = max_age
+
+        self._cond = threading.Condition()
+        self._idle: List[_PooledEngine] = []
+        self._busy: Dict[int, _PooledEngine] = {}
+        self._created = 0
+        self._closed = False
+        self._generation = 0
+        self.recycled = 0
+
+        if prelaunch:
+            self.start()
+
+    def _launch(self) -> _PooledEngine:
+        """
+        Create and start a new engine.
+
+        Returns:
+            _PooledEngine: Started engine with bookkeeping.
+        """
+        with self._cond:
+            engine_kwargs = dict(self.engine_kwargs)
+            generation = self._generation
+        engine = get_engine_class(self.engine_name)(**engine_kwargs)
+        try:
+            engine.start()
+        except Exception:
+            engine.close()
+            raise
+        return _PooledEngine(engine, generation)
+
+    def inherit(self, defaults: Dict[str, Any]) -> None:
+        """
+        Fill in engine options the pool was not given, e.g. a client's proxy.
+
+        Options passed in engine_kwargs always win, and the first client to
+        provide a missing option sets it for every user of the pool. Instances
+        launched without the new options are recycled on their next checkout.
+
+        Args:
+            defaults: Engine keyword arguments to use where engine_kwargs has none.
+        """
+        with self._cond:
+            missing = {key: value for key, value in defaults.items() if key not in self.engine_kwargs}
+            if not missing:
+                return
+            self.engine_kwargs.update(missing)
+            self._generation += 1
+
+    def _is_expired(self, item: _PooledEngine) -> bool:
+        """
+        Check whether an engine should be recycled.
+
+        Args:
+            item: Pooled engine.
+
+        Returns:
+            bool: True if the engine exceeded its use or age budget.
+        """
+        if item.generation != self._generation:
+            return True
+        if self.max_uses is not None and item.uses >= self.max_uses:
+            return True
+        if self.max_age is not None and time.monotonic() - item.created >= self.max_age:
+            return True
+        return False
+
+    def start(self) -> None:
+        """Launch browser instances in parallel until the pool is full."""
+        with self._cond:
+            missing = self.size - self._created
+            self._created += missing
+        if missing <= 0:
+            return
+
+        with ThreadPoolExecutor(max_workers=missing) as executor:
+            futures = [executor.submit(self._launch) for _ in range(missing)]
+
+        errors = []
+        with self._cond:
+            for future in futures:
+                try:
+                    self._idle.append(future.result())
+                except Exception as e:
+                    self._created -= 1
+                    errors.append(e)
+            self._cond.notify_all()
+
+        if errors:
+            raise BrowserError(f"Failed to launch {len(errors)} pooled browser(s): {errors[0]}")
+
+    def checkout(self, timeout: Optional[float] = None) -> BaseEngine:
+        """
+        Take a healthy engine out of the pool, waiting if all are in use.
+
+        Args:
+            timeout: Maximum seconds to wait. None waits indefinitely.
+
+        Returns:
+            BaseEngine: Engine reserved for the caller.
+
+        Raises:
+            BrowserError: If the pool is closed or no engine became available in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise BrowserError("Browser pool is closed")
+                if self._idle:
+                    item: Optional[_PooledEngine] = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    item = None
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise BrowserError("Timed out waiting for a pooled browser")
+                self._cond.wait(remaining)
+
+        try:
+            if item is None:
+                item = self._launch()
+            elif self._is_expired(item) or not item.engine.is_healthy():
+                item = self._replace(item)
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+        item.uses += 1
+        with self._cond:
+            self._busy[id(item.engine)] = item
+        return item.engine
+
+    def checkin(self, engine: BaseEngine, discard: bool = False) -> None:
+        """
+        Return an engine to the pool.
+
+        Args:
+            engine: Engine obtained from checkout().
+            discard: Close the engine instead of reusing it, e.g. after a failure.
+        """
+        with self._cond:
+            item = self._busy.pop(id(engine), None)
+        if item is None:
+            raise ValueError("Engine does not belong to this pool")
+
+        if self._closed:
+            engine.close()
+            return
+
+        if discard or self._is_expired(item):
+            # Replace in the background so the next checkout finds a warm browser
+            threading.Thread(target=self._refill, args=(item,), daemon=True).start()
+            return
+
+        with self._cond:
+            self._idle.append(item)
+            self._cond.notify()
+
+    def _replace(self, item: _PooledEngine) -> _PooledEngine:
+        """
+        Close an engine and launch a fresh one in its place.
+
+        Args:
+            item: Engine to recycle.
+
+        Returns:
+            _PooledEngine: Replacement engine.
+        """
+        item.engine.close()
+        self.recycled += 1
+        return self._launch()
+
+    def _refill(self, item: _PooledEngine) -> None:
+        """
+        Recycle an engine and put its replacement back into the pool.
+
+        Args:
+            item: Engine to recycle.
+        """
+        try:
+            replacement = self._replace(item)
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            if self._closed:
+                replacement.engine.close()
+                return
+            self._idle.append(replacement)
+            self._cond.notify()
+
+    @contextmanager
+    def engine(self, timeout: Optional[float] = None) -> Iterator[BaseEngine]:
+        """
+        Check out an engine for the duration of a with block.
+
+        The engine is discarded instead of reused if the block raises a
+        BrowserError or leaves the browser unhealthy. Other errors, such as a
+        challenge that could not be solved, keep the warm browser in the pool.
+
+        Args:
+            timeout: Maximum seconds to wait for an engine.
+
+        Yields:
+            BaseEngine: Engine reserved for the caller.
+        """
+        engine = self.checkout(timeout)
+        try:
+            yield engine
+        except Exception as e:
+            self.checkin(engine, discard=isinstance(e, BrowserError) or not engine.is_healthy())
+            raise
+        else:
+            self.checkin(engine)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Get pool occupancy.
+
+        Returns:
+            Dict[str, int]: Size, created, idle, busy and recycled counts.
+        """
+        with self._cond:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": len(self._idle),
+                "busy": len(self._busy),
+                "recycled": self.recycled,
+            }
+
+    def close(self) -> None:
+        """Close all idle engines. Busy engines are closed when checked in."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for item in idle:
+            try:
+                item.engine.close()
+            except Exception:
+                pass
+
+    def __enter__(self) -> "BrowserPool":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
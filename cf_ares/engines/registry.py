@@ -0,0 +1,65 @@
+"""
+Browser engine registry for CF-Ares.
+
+Engine modules pull in heavy browser stacks (selenium, seleniumbase,
+undetected-chromedriver), so they are only imported the first time an engine
+is resolved by name.
+"""
+
+import importlib
+from typing import Dict, Type, Union
+
+from cf_ares.engines.base import BaseEngine
+
+# Engine name -> "module:attribute" of the implementing class
+_ENGINES: Dict[str, Union[str, Type[BaseEngine]]] = {
+    "seleniumbase": "cf_ares.engines.selenium:SeleniumBaseEngine",
+    "undetected": "cf_ares.engines.undetected:UndetectedEngine",
+}
+
+
+def register_engine(name: str, engine: Union[str, Type[BaseEngine]]) -> None:
+    """
+    Register a browser engine.
+
+    Args:
+        name: Name used to select the engine, e.g. in AresClient(browser_engine=...).
+        engine: Engine class, or a "module:attribute" path resolved on first use.
+    """
+    _ENGINES[name] = engine
+
+
+def get_engine_class(name: str) -> Type[BaseEngine]:
+    """
+    Resolve a browser engine class by name, importing its module if needed.
+
+    Args:
+        name: Registered engine name.
+
+    Returns:
+        Type[BaseEngine]: Engine class.
+
+    Raises:
+        ValueError: If no engine is registered under the name.
+    """
+    try:
+        engine = _ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown browser engine: {name!r}") from None
+
+    if isinstance(engine, str):
+        module_name, _, attr = engine.partition(":")
+        engine = getattr(importlib.import_module(module_name), attr)
+        _ENGINES[name] = engine
+
+    return engine
+
+
+def available_engines() -> list:
+    """
+    List registered engine names.
+
+    Returns:
+        list: Engine names.
+    """
+    return sorted(_ENGINES)
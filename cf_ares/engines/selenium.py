@@ -2,12 +2,16 @@
 SeleniumBase engine implementation for CF-Ares.
 """
 
-import time
 from typing import Any, Dict, List, Optional
 
 from seleniumbase import Driver
 
-from cf_ares.engines.base import BaseEngine
+from cf_ares.engines.base import BaseEngine, BrowserPage, split_cookie_records
+from cf_ares.engines.challenge import (
+    DEFAULT_POLL_FREQUENCY,
+    delete_cookies,
+    wait_for_challenge,
+)
 from cf_ares.exceptions import BrowserError, CloudflareError
 from cf_ares.utils.fingerprint import FingerprintManager
 
@@ -18,6 +22,9 @@ class SeleniumBaseEngine(BaseEngine):
     Uses SeleniumBase to handle Cloudflare challenges.
     """
 
+    # Seconds between challenge completion probes
+    poll_frequency = DEFAULT_POLL_FREQUENCY
+
     def __init__(
         self,
         headless: bool = True,
@@ -37,7 +44,36 @@ class SeleniumBaseEngine(BaseEngine):
         super().__init__(headless, proxy, timeout, fingerprint)
         self.driver: Optional[Driver] = None
         self.fingerprint_manager = FingerprintManager()
-        self._initialize_driver()
+
+    def start(self) -> None:
+        """Launch the browser if it is not already running."""
+        if not self.driver:
+            self._initialize_driver()
+
+    @property
+    def is_running(self) -> bool:
+        """
+        Whether the engine currently holds a live browser process.
+
+        Returns:
+            bool: True if a browser is running.
+        """
+        return self.driver is not None
+
+    def is_healthy(self) -> bool:
+        """
+        Check that the browser is running and responds to WebDriver commands.
+
+        Returns:
+            bool: True if the browser can be used.
+        """
+        if not self.driver:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
 
     def _initialize_driver(self) -> None:
         """Initialize the SeleniumBase driver."""
@@ -122,8 +158,7 @@ class SeleniumBaseEngine(BaseEngine):
         Raises:
             BrowserError: If browser automation fails.
         """
-        if not self.driver:
-            self._initialize_driver()
+        self.start()
 
         try:
             self.driver.get(url)
@@ -135,6 +170,9 @@ class SeleniumBaseEngine(BaseEngine):
         """
         Wait for Cloudflare challenge to complete.
 
+        Returns as soon as the page has settled. Per-phase latency is stored in
+        last_wait_timings.
+
         Returns:
             bool: True if challenge was completed successfully.
 
@@ -144,68 +182,47 @@ class SeleniumBaseEngine(BaseEngine):
         if not self.driver:
             raise BrowserError("Driver not initialized")
 
-        # Common Cloudflare challenge selectors and patterns
-        cf_selectors = [
-            "#cf-challenge-running",
-            "#cf-please-wait",
-            "#cf-content",
-            "div.cf-browser-verification",
-            "#challenge-form",
-            "#challenge-running",
-            "#challenge-error-title",
-        ]
-
-        # Wait for initial challenge page to load
-        time.sleep(2)
-
-        # Check if we're on a Cloudflare challenge page
-        is_cloudflare = False
-        for selector in cf_selectors:
-            try:
-                if self.driver.find_elements("css selector", selector):
-                    is_cloudflare = True
-                    break
-            except:
-                pass
+        self.last_wait_timings = {}
+        timings = wait_for_challenge(self.driver, self.timeout, poll_frequency=self.poll_frequency)
+        self.last_wait_timings = timings
+        return True
 
-        if not is_cloudflare:
-            # No Cloudflare challenge detected
-            return True
+    def clear_cookies(self, url: str) -> None:
+        """
+        Delete the browser's cookies for a URL.
 
-        # Wait for the challenge to be solved
-        max_wait = self.timeout
-        start_time = time.time()
-        
-        while time.time() - start_time < max_wait:
-            # Check if we're still on a challenge page
-            still_on_challenge = False
-            for selector in cf_selectors:
-                try:
-                    if self.driver.find_elements("css selector", selector):
-                        still_on_challenge = True
-                        break
-                except:
-                    pass
-            
-            if not still_on_challenge:
-                # Challenge completed
-                # Wait a bit more to ensure page is fully loaded
-                time.sleep(2)
-                return True
-            
-            # Check for error messages
-            try:
-                error_elem = self.driver.find_elements("css selector", "#challenge-error-title")
-                if error_elem:
-                    raise CloudflareError(f"Cloudflare challenge failed: {error_elem[0].text}")
-            except:
-                pass
-            
-            # Wait before checking again
-            time.sleep(1)
-        
-        # Timeout reached
-        raise CloudflareError("Cloudflare challenge timed out")
+        Args:
+            url: URL whose cookies to delete.
+
+        Raises:
+            BrowserError: If browser automation fails.
+        """
+        if not self.driver:
+            return
+
+        try:
+            delete_cookies(self.driver, url)
+        except Exception as e:
+            raise BrowserError(f"Failed to delete cookies: {e}")
+
+    def get_cookie_records(self) -> List[Dict[str, Any]]:
+        """
+        Get the cookies of the current session with their attributes.
+
+        Returns:
+            List[Dict[str, Any]]: WebDriver cookie dicts, read in one round-trip.
+
+        Raises:
+            BrowserError: If browser automation fails.
+        """
+        if not self.driver:
+            raise BrowserError("Driver not initialized")
+
+        try:
+            cookies: List[Dict[str, Any]] = self.driver.get_cookies()
+        except Exception as e:
+            raise BrowserError(f"Failed to get cookies: {e}")
+        return cookies
 
     def get_cookies(self) -> Dict[str, str]:
         """
@@ -214,17 +231,61 @@ class SeleniumBaseEngine(BaseEngine):
         Returns:
             Dict[str, str]: Cookies as a dictionary.
 
+        Raises:
+            BrowserError: If browser automation fails.
+        """
+        return split_cookie_records(self.get_cookie_records())[0]
+
+    def get_cookie_expiry(self) -> Dict[str, float]:
+        """
+        Get the expiry time of the cookies in the current session.
+
+        Returns:
+            Dict[str, float]: Unix expiry time by cookie name. Session cookies are left out.
+
+        Raises:
+            BrowserError: If browser automation fails.
+        """
+        return split_cookie_records(self.get_cookie_records())[1]
+
+    def get_cookie_domains(self) -> Dict[str, str]:
+        """
+        Get the Domain attribute of the cookies in the current session.
+
+        Returns:
+            Dict[str, str]: Cookie domain by cookie name, with a leading dot for
+                cookies that are also sent to subdomains.
+
+        Raises:
+            BrowserError: If browser automation fails.
+        """
+        return split_cookie_records(self.get_cookie_records())[2]
+
+    def get_page(self) -> Optional[BrowserPage]:
+        """
+        Get the page the browser currently displays.
+
+        Returns:
+            Optional[BrowserPage]: Page snapshot, or None if no page is loaded.
+
         Raises:
             BrowserError: If browser automation fails.
         """
         if not self.driver:
-            raise BrowserError("Driver not initialized")
+            return None
 
         try:
-            cookies_list = self.driver.get_cookies()
-            return {cookie["name"]: cookie["value"] for cookie in cookies_list}
+            complete = self.driver.execute_script("return document.readyState") == "complete"
+            return BrowserPage(
+                url=self.driver.current_url,
+                content=self.driver.page_source.encode("utf-8"),
+                cookies=self.get_cookies(),
+                complete=complete,
+            )
+        except BrowserError:
+            raise
         except Exception as e:
-            raise BrowserError(f"Failed to get cookies: {e}")
+            raise BrowserError(f"Failed to read page: {e}")
 
     def get_headers(self) -> Dict[str, str]:
         """
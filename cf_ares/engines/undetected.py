@@ -2,18 +2,26 @@
 Undetected ChromeDriver engine implementation for CF-Ares.
 """
 
-import time
 import os
-from typing import Any, Dict, List, Optional
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import undetected_chromedriver as uc
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
 from selenium.webdriver.edge.service import Service as EdgeService
 from selenium.webdriver.edge.options import Options as EdgeOptions
 
-from cf_ares.engines.base import BaseEngine
+from cf_ares.engines.base import BaseEngine, BrowserPage, split_cookie_records
+from cf_ares.engines.challenge import (
+    DEFAULT_POLL_FREQUENCY,
+    DEFAULT_READY_COOKIE,
+    cookie_state,
+    delete_cookies,
+    wait_for_challenge,
+    wait_for_cookie,
+)
 from cf_ares.exceptions import BrowserError, CloudflareError
 from cf_ares.utils.fingerprint import FingerprintManager
 
@@ -24,6 +32,9 @@ class UndetectedEngine(BaseEngine):
     Uses undetected-chromedriver to handle advanced Cloudflare challenges.
     """
 
+    # Seconds between challenge completion probes
+    poll_frequency = DEFAULT_POLL_FREQUENCY
+
     # Default Chrome binary paths
     CHROME_PATHS = [
         # Environment variable
@@ -59,6 +70,8 @@ class UndetectedEngine(BaseEngine):
         fingerprint: Optional[str] = None,
         chrome_path: Optional[str] = None,
         use_edge: bool = False,
+        completion: str = "dom",
+        ready_cookies: Optional[Dict[str, str]] = None,
     ):
         """
         Initialize the Undetected ChromeDriver engine.
@@ -70,13 +83,58 @@ class UndetectedEngine(BaseEngine):
             fingerprint: Browser fingerprint to use.
             chrome_path: Custom path to Chrome binary. If not provided, will search in default locations.
             use_edge: Whether to use Edge WebDriver instead of Chrome.
+            completion: How to detect a solved challenge. "dom" waits for the
+                challenge page to disappear and the destination page to load;
+                "cookie" watches DevTools Network events and returns as soon as
+                the ready cookie is issued for the target domain.
+            ready_cookies: Per-domain name of the cookie that marks a solved
+                challenge in "cookie" mode. Subdomains inherit their parent's
+                entry. Defaults to "cf_clearance".
         """
+        if completion not in ("dom", "cookie"):
+            raise ValueError(f"Unknown completion strategy: {completion!r}")
+
         super().__init__(headless, proxy, timeout, fingerprint)
         self.driver = None
         self.fingerprint_manager = FingerprintManager()
         self.chrome_path = chrome_path
         self.use_edge = use_edge
-        self._initialize_driver()
+        self.completion = completion
+        self.ready_cookies = ready_cookies or {}
+        self._target_url: Optional[str] = None
+        self._cookie_event = threading.Event()
+        # Ready cookie of the target URL before navigating, see wait_for_cookie()
+        self._previous_cookie: Optional[Tuple[str, float]] = None
+
+    def start(self) -> None:
+        """Launch the browser if it is not already running."""
+        if not self.driver:
+            self._initialize_driver()
+
+    @property
+    def is_running(self) -> bool:
+        """
+        Whether the engine currently holds a live browser process.
+
+        Returns:
+            bool: True if a browser is running.
+        """
+        return self.driver is not None
+
+    def is_healthy(self) -> bool:
+        """
+        Check that the browser is running and responds to WebDriver commands.
+
+        Returns:
+            bool: True if the browser can be used.
+        """
+        if not self.driver:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
 
     def _initialize_driver(self) -> None:
         """Initialize the WebDriver."""
@@ -154,13 +212,23 @@ class UndetectedEngine(BaseEngine):
                     # If no Chrome binary found, let undetected-chromedriver handle it
                     chrome_path = None
                     
+                # In cookie mode get() must not block on the page load
+                if self.completion == "cookie":
+                    options.page_load_strategy = "none"
+
                 # Create driver
-                self.driver = uc.Chrome(
+                driver = uc.Chrome(
                     options=options,
                     headless=self.headless,
                     use_subprocess=True,
                     browser_executable_path=chrome_path,
+                    enable_cdp_events=self.completion == "cookie",
                 )
+                if self.completion == "cookie":
+                    driver.add_cdp_listener(
+                        "Network.responseReceivedExtraInfo", self._on_response_extra_info
+                    )
+                self.driver = driver
             
             # Set timeout
             self.driver.set_page_load_timeout(self.timeout)
@@ -221,10 +289,13 @@ class UndetectedEngine(BaseEngine):
         Raises:
             BrowserError: If browser automation fails.
         """
-        if not self.driver:
-            self._initialize_driver()
+        self.start()
 
         try:
+            self._target_url = url
+            self._cookie_event.clear()
+            if self.completion == "cookie":
+                self._previous_cookie = cookie_state(self.driver, url, self.get_ready_cookie(url))
             self.driver.get(url)
             return self.driver
         except Exception as e:
@@ -234,6 +305,9 @@ class UndetectedEngine(BaseEngine):
         """
         Wait for Cloudflare challenge to complete.
 
+        Returns as soon as the page has settled. Per-phase latency is stored in
+        last_wait_timings.
+
         Returns:
             bool: True if challenge was completed successfully.
 
@@ -243,68 +317,92 @@ class UndetectedEngine(BaseEngine):
         if not self.driver:
             raise BrowserError("Driver not initialized")
 
-        # Common Cloudflare challenge selectors and patterns
-        cf_selectors = [
-            "#cf-challenge-running",
-            "#cf-please-wait",
-            "#cf-content",
-            "div.cf-browser-verification",
-            "#challenge-form",
-            "#challenge-running",
-            "#challenge-error-title",
-        ]
-
-        # Wait for initial challenge page to load
-        time.sleep(2)
-
-        # Check if we're on a Cloudflare challenge page
-        is_cloudflare = False
-        for selector in cf_selectors:
-            try:
-                if self.driver.find_elements(By.CSS_SELECTOR, selector):
-                    is_cloudflare = True
-                    break
-            except:
-                pass
+        self.last_wait_timings = {}
+        if self.completion == "cookie" and self._target_url:
+            timings = wait_for_cookie(
+                self.driver,
+                self._target_url,
+                self.get_ready_cookie(self._target_url),
+                self.timeout,
+                poll_frequency=self.poll_frequency,
+                cookie_event=self._cookie_event,
+                previous=self._previous_cookie,
+            )
+        else:
+            timings = wait_for_challenge(self.driver, self.timeout, poll_frequency=self.poll_frequency)
+        self.last_wait_timings = timings
+        return True
+
+    def get_ready_cookie(self, url: str) -> str:
+        """
+        Get the name of the cookie that marks a solved challenge for a URL.
 
-        if not is_cloudflare:
-            # No Cloudflare challenge detected
-            return True
+        Args:
+            url: Target URL.
 
-        # Wait for the challenge to be solved
-        max_wait = self.timeout
-        start_time = time.time()
-        
-        while time.time() - start_time < max_wait:
-            # Check if we're still on a challenge page
-            still_on_challenge = False
-            for selector in cf_selectors:
-                try:
-                    if self.driver.find_elements(By.CSS_SELECTOR, selector):
-                        still_on_challenge = True
-                        break
-                except:
-                    pass
-            
-            if not still_on_challenge:
-                # Challenge completed
-                # Wait a bit more to ensure page is fully loaded
-                time.sleep(2)
-                return True
-            
-            # Check for error messages
-            try:
-                error_elem = self.driver.find_elements(By.CSS_SELECTOR, "#challenge-error-title")
-                if error_elem:
-                    raise CloudflareError(f"Cloudflare challenge failed: {error_elem[0].text}")
-            except:
-                pass
-            
-            # Wait before checking again
-            time.sleep(1)
-        
-        # Timeout reached
-        raise CloudflareError("Cloudflare challenge timed out")
+        Returns:
+            str: Cookie name.
+        """
+        host = urlparse(url).hostname or ""
+        labels = host.split(".")
+        for i in range(len(labels)):
+            name = self.ready_cookies.get(".".join(labels[i:]))
+            if name:
+                return name
+        return DEFAULT_READY_COOKIE
+
+    def _on_response_extra_info(self, message: Dict[str, Any]) -> None:
+        """
+        DevTools listener that wakes wait_for_cloudflare when the ready cookie is set.
+
+        Args:
+            message: Network.responseReceivedExtraInfo event.
+        """
+        if not self._target_url:
+            return
+        headers = message.get("params", {}).get("headers", {})
+        set_cookie = headers.get("set-cookie") or headers.get("Set-Cookie") or ""
+        name = self.get_ready_cookie(self._target_url)
+        for line in set_cookie.split("\n"):
+            if line.split("=", 1)[0].strip() == name:
+                self._cookie_event.set()
+                return
+
+    def clear_cookies(self, url: str) -> None:
+        """
+        Delete the browser's cookies for a URL.
+
+        Args:
+            url: URL whose cookies to delete.
+
+        Raises:
+            BrowserError: If browser automation fails.
+        """
+        if not self.driver:
+            return
+
+        try:
+            delete_cookies(self.driver, url)
+        except Exception as e:
+            raise BrowserError(f"Failed to delete cookies: {e}")
+
+    def get_cookie_records(self) -> List[Dict[str, Any]]:
+        """
+        Get the cookies of the current session with their attributes.
+
+        Returns:
+            List[Dict[str, Any]]: WebDriver cookie dicts, read in one round-trip.
+
+        Raises:
+            BrowserError: If browser automation fails.
+        """
+        if not self.driver:
+            raise BrowserError("Driver not initialized")
+
+        try:
+            return self.driver.get_cookies()
+        except Exception as e:
+            raise BrowserError(f"Failed to get cookies: {e}")
 
     def get_cookies(self) -> Dict[str, str]:
         """
@@ -313,17 +411,65 @@ class UndetectedEngine(BaseEngine):
         Returns:
             Dict[str, str]: Cookies as a dictionary.
 
+        Raises:
+            BrowserError: If browser automation fails.
+        """
+        return split_cookie_records(self.get_cookie_records())[0]
+
+    def get_cookie_expiry(self) -> Dict[str, float]:
+        """
+        Get the expiry time of the cookies in the current session.
+
+        Returns:
+            Dict[str, float]: Unix expiry time by cookie name. Session cookies are left out.
+
+        Raises:
+            BrowserError: If browser automation fails.
+        """
+        return split_cookie_records(self.get_cookie_records())[1]
+
+    def get_cookie_domains(self) -> Dict[str, str]:
+        """
+        Get the Domain attribute of the cookies in the current session.
+
+        Returns:
+            Dict[str, str]: Cookie domain by cookie name, with a leading dot for
+                cookies that are also sent to subdomains.
+
+        Raises:
+            BrowserError: If browser automation fails.
+        """
+        return split_cookie_records(self.get_cookie_records())[2]
+
+    def get_page(self) -> Optional[BrowserPage]:
+        """
+        Get the page the browser currently displays.
+
+        Returns:
+            Optional[BrowserPage]: Page snapshot, or None if no page is loaded.
+
         Raises:
             BrowserError: If browser automation fails.
         """
         if not self.driver:
-            raise BrowserError("Driver not initialized")
+            return None
 
         try:
-            cookies_list = self.driver.get_cookies()
-            return {cookie["name"]: cookie["value"] for cookie in cookies_list}
+            # Cookie completion returns before the destination page has loaded
+            complete = (
+                self.completion != "cookie"
+                and self.driver.execute_script("return document.readyState") == "complete"
+            )
+            return BrowserPage(
+                url=self.driver.current_url,
+                content=self.driver.page_source.encode("utf-8"),
+                cookies=self.get_cookies(),
+                complete=complete,
+            )
+        except BrowserError:
+            raise
         except Exception as e:
-            raise BrowserError(f"Failed to get cookies: {e}")
+            raise BrowserError(f"Failed to read page: {e}")
 
     def get_headers(self) -> Dict[str, str]:
         """
@@ -2,6 +2,11 @@
 Custom exceptions for CF-Ares.
 """
 
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from cf_ares.utils.telemetry import SolveReport
+
 
 class AresError(Exception):
     """Base exception for all CF-Ares errors."""
@@ -28,6 +33,11 @@ class RequestError(AresError):
     pass
 
 
+class StreamConsumedError(AresError):
+    """Exception raised when the body of a streamed response is read twice."""
+    pass
+
+
 class ProxyError(AresError):
     """Exception raised when proxy configuration fails."""
     pass
@@ -35,7 +45,9 @@ class ProxyError(AresError):
 
 class CloudflareChallengeFailed(Exception):
     """当 Cloudflare 挑战失败时抛出的异常"""
-    pass
+
+    # 失败挑战的 SolveReport，由 AresClient.solve_challenge 设置
+    solve_report: Optional["SolveReport"] = None
 
 
 class CloudflareSessionExpired(Exception):
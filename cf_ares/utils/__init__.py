@@ -3,6 +3,41 @@ Utility modules for CF-Ares.
 """
 
 from cf_ares.utils.session import SessionManager
+from cf_ares.utils.cache import ResponseCache
+from cf_ares.utils.dns import DNSCache, shared_dns_cache
 from cf_ares.utils.fingerprint import FingerprintManager
+from cf_ares.utils.metrics import MetricsRegistry, RequestTimings, to_prometheus
+from cf_ares.utils.ratelimit import AsyncRateLimiter, RateLimit, RateLimiter
+from cf_ares.utils.retry import RetryBudget, RetryPolicy
+from cf_ares.utils.singleflight import AsyncSingleFlight, SingleFlight
+from cf_ares.utils.store import (
+    MemorySessionStore,
+    RedisSessionStore,
+    SessionStore,
+    SQLiteSessionStore,
+)
+from cf_ares.utils.telemetry import SolveReport, SolveStats
 
-__all__ = ["SessionManager", "FingerprintManager"] 
\ No newline at end of file
+__all__ = [
+    "SessionManager",
+    "FingerprintManager",
+    "SingleFlight",
+    "AsyncSingleFlight",
+    "SessionStore",
+    "MemorySessionStore",
+    "SQLiteSessionStore",
+    "RedisSessionStore",
+    "RetryPolicy",
+    "RetryBudget",
+    "RateLimit",
+    "RateLimiter",
+    "AsyncRateLimiter",
+    "ResponseCache",
+    "MetricsRegistry",
+    "RequestTimings",
+    "to_prometheus",
+    "SolveReport",
+    "SolveStats",
+    "DNSCache",
+    "shared_dns_cache",
+] 
\ No newline at end of file
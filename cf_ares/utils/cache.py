@@ -0,0 +1,698 @@
+"""
+HTTP response cache for CF-Ares.
+
+A private cache following RFC 9111: GET responses are stored according to
+Cache-Control, Expires and heuristic freshness, served while fresh, and
+revalidated with If-None-Match / If-Modified-Since once stale, so unchanged
+documents come back as a body-less 304. Entries live in a bounded in-memory
+LRU tier and optionally in a directory on disk.
+
+Cache keys cover the URL, the domain session (its cookies and headers) and
+the caller's Authorization and Cookie headers, so responses fetched with one
+identity are never served to another. Keys are hashed before use, so no
+credentials are written to disk.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple, cast
+from urllib.parse import urlencode
+
+from cf_ares.utils.detection import _header, is_challenge
+from cf_ares.utils.lru import StripedLRU
+
+DEFAULT_CACHE_SIZE = 1000
+DEFAULT_MAX_ENTRY_BYTES = 1024 * 1024
+
+# Statuses that may be cached with heuristic freshness (RFC 9110 15.1)
+HEURISTIC_STATUS_CODES = frozenset({200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501})
+
+# Statuses that answer the caller's own conditional or range headers and are
+# not a complete representation of the resource
+INCOMPLETE_STATUS_CODES = frozenset({206, 304})
+
+# Upper bound for heuristic freshness (10% of the time since Last-Modified)
+MAX_HEURISTIC_LIFETIME = 86400.0
+
+# Methods that invalidate cached responses for their URL (RFC 9111 4.4)
+UNSAFE_METHODS = frozenset({"POST", "PUT", "DELETE", "PATCH"})
+
+# Headers describing the transfer rather than the stored representation
+_UNSTORED_HEADERS = frozenset({
+    "content-encoding", "content-length", "transfer-encoding", "connection",
+    "keep-alive", "set-cookie",
+})
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    """
+    Parse a Cache-Control header.
+
+    Args:
+        value: Header value.
+
+    Returns:
+        Dict[str, Optional[str]]: Lower-cased directives and their arguments.
+    """
+    directives: Dict[str, Optional[str]] = {}
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip().strip('"') or None
+    return directives
+
+
+def _seconds(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a delta-seconds directive argument.
+
+    Args:
+        value: Argument.
+
+    Returns:
+        Optional[float]: Seconds, or None if missing or invalid.
+    """
+    return float(value) if value is not None and value.isdigit() else None
+
+
+def _http_date(value: str) -> Optional[float]:
+    """
+    Parse an HTTP-date.
+
+    Args:
+        value: Header value.
+
+    Returns:
+        Optional[float]: Unix time, or None if invalid.
+    """
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class CachedResponse:
+    """Response served from the cache, compatible with AresResponse."""
+
+    from_cache = True
+
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes, url: str):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.cookies: Dict[str, str] = {}
+
+    def __repr__(self) -> str:
+        return f"<CachedResponse [{self.status_code}]>"
+
+
+class CacheEntry:
+    """A stored response and the freshness information derived from it."""
+
+    __slots__ = (
+        "status_code", "headers", "content", "url", "stored_at", "age",
+        "lifetime", "no_cache", "vary",
+    )
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: Dict[str, str],
+        content: bytes,
+        url: str,
+        stored_at: float,
+        age: float,
+        lifetime: float,
+        no_cache: bool,
+        vary: Dict[str, str],
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.stored_at = stored_at
+        self.age = age
+        self.lifetime = lifetime
+        self.no_cache = no_cache
+        self.vary = vary
+
+    @property
+    def etag(self) -> str:
+        return _header(self.headers, "etag")
+
+    @property
+    def last_modified(self) -> str:
+        return _header(self.headers, "last-modified")
+
+    @property
+    def validatable(self) -> bool:
+        """Whether the entry can be revalidated with a conditional request."""
+        return bool(self.etag or self.last_modified)
+
+    def current_age(self, now: Optional[float] = None) -> float:
+        """
+        Get the age of the stored response (RFC 9111 4.2.3).
+
+        Args:
+            now: Current time. Defaults to time.time().
+
+        Returns:
+            float: Age in seconds.
+        """
+        return self.age + max((time.time() if now is None else now) - self.stored_at, 0.0)
+
+    def is_fresh(self, now: Optional[float] = None, max_age: Optional[float] = None) -> bool:
+        """
+        Check whether the entry may be served without revalidation.
+
+        Args:
+            now: Current time. Defaults to time.time().
+            max_age: The request's max-age directive, if any.
+
+        Returns:
+            bool: True if fresh.
+        """
+        if self.no_cache:
+            return False
+        age = self.current_age(now)
+        lifetime = self.lifetime if max_age is None else min(self.lifetime, max_age)
+        return age < lifetime
+
+    def response(self) -> CachedResponse:
+        """
+        Build a response object from the entry.
+
+        Returns:
+            CachedResponse: Response.
+        """
+        headers = dict(self.headers)
+        headers["Age"] = str(int(self.current_age()))
+        return CachedResponse(self.status_code, headers, self.content, self.url)
+
+    def to_meta(self) -> Dict[str, Any]:
+        """
+        Get the entry's metadata for the disk tier.
+
+        Returns:
+            Dict[str, Any]: Everything except the body.
+        """
+        return {name: getattr(self, name) for name in self.__slots__ if name != "content"}
+
+
+class CacheLookup:
+    """State carried from ResponseCache.before() to ResponseCache.after()."""
+
+    __slots__ = ("key", "entry", "request_kwargs", "response")
+
+    def __init__(
+        self,
+        key: Optional[str],
+        entry: Optional[CacheEntry],
+        request_kwargs: Dict[str, Any],
+        response: Optional[CachedResponse] = None,
+    ):
+        # None if the request bypasses the cache
+        self.key = key
+        # Stale entry being revalidated
+        self.entry = entry
+        # Arguments to send, with validators added when revalidating
+        self.request_kwargs = request_kwargs
+        # Fresh cached response; nothing needs to be sent
+        self.response = response
+
+
+class ResponseCache:
+    """
+    Two-tier private HTTP cache.
+    Clients call before() with each request and after() with the response
+    that was fetched, unless before() already produced a fresh response.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = DEFAULT_CACHE_SIZE,
+        path: Optional[str] = None,
+        max_disk_bytes: Optional[int] = None,
+        max_entry_bytes: int = DEFAULT_MAX_ENTRY_BYTES,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of responses kept in memory.
+            path: Directory for the disk tier. None keeps the cache in memory.
+            max_disk_bytes: Size bound for the disk tier; the least recently
+                used files are removed first. None means unbounded.
+            max_entry_bytes: Largest body kept in memory. Larger bodies are only
+                cached on disk.
+        """
+        self.path = path
+        self.max_disk_bytes = max_disk_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._memory: StripedLRU[CacheEntry] = StripedLRU(max_entries)
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._disk_bytes = sum(size for _, _, size in self._disk_files())
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict[str, int]: hits (served fresh), revalidations (served after a
+                304), misses (fetched in full) and entries in memory.
+        """
+        return {
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "entries": len(self._memory),
+        }
+
+    def _count(self, counter: str) -> None:
+        """
+        Increment a counter.
+
+        Args:
+            counter: Attribute name.
+        """
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @staticmethod
+    def key(
+        url: str,
+        params: Optional[Any] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        session: Optional[Mapping[str, Any]] = None,
+    ) -> str:
+        """
+        Compute the cache key of a request.
+
+        Args:
+            url: Request URL.
+            params: Query parameters.
+            headers: Headers given by the caller.
+            session: Domain session record the request is sent with.
+
+        Returns:
+            str: Hex digest identifying URL and identity.
+        """
+        if params:
+            url += ("&" if "?" in url else "?") + urlencode(params, doseq=True)
+        identity = {
+            "url": url,
+            "authorization": _header(headers, "authorization"),
+            "cookie": _header(headers, "cookie"),
+            "session": [dict(session["cookies"]), dict(session["headers"])] if session else None,
+        }
+        return hashlib.sha256(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def before(
+        self,
+        method: str,
+        url: str,
+        request_kwargs: Dict[str, Any],
+        session: Optional[Mapping[str, Any]] = None,
+    ) -> CacheLookup:
+        """
+        Look a request up before sending it.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+            request_kwargs: Arguments for CurlEngine.request.
+            session: Domain session record the request is sent with.
+
+        Returns:
+            CacheLookup: A fresh response to return, or what to send.
+        """
+        method = method.upper()
+        headers = request_kwargs.get("headers")
+        key = self.key(url, request_kwargs.get("params"), headers, session)
+        if method in UNSAFE_METHODS:
+            return CacheLookup(key, None, request_kwargs)
+        directives = parse_cache_control(_header(headers, "cache-control"))
+        if (
+            method != "GET"
+            or "no-store" in directives
+            or request_kwargs.get("data") is not None
+            or request_kwargs.get("json") is not None
+            or request_kwargs.get("stream")
+        ):
+            return CacheLookup(None, None, request_kwargs)
+
+        entry = self._get(key)
+        if entry is not None and not self._vary_matches(entry, headers):
+            entry = None
+        if entry is None:
+            self._count("misses")
+            return CacheLookup(key, None, request_kwargs)
+
+        max_age = 0.0 if "no-cache" in directives else _seconds(directives.get("max-age"))
+        if entry.is_fresh(max_age=max_age):
+            self._count("hits")
+            return CacheLookup(key, entry, request_kwargs, entry.response())
+
+        if not entry.validatable:
+            self._count("misses")
+            return CacheLookup(key, None, request_kwargs)
+
+        conditional = dict(headers or {})
+        if entry.etag:
+            conditional["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            conditional["If-Modified-Since"] = entry.last_modified
+        return CacheLookup(key, entry, dict(request_kwargs, headers=conditional))
+
+    def after(self, method: str, lookup: CacheLookup, response: Any) -> Any:
+        """
+        Store or revalidate with a fetched response.
+
+        Args:
+            method: HTTP method.
+            lookup: Result of before().
+            response: Response that was fetched.
+
+        Returns:
+            Any: The response to return; the cached one if the server
+                answered 304.
+        """
+        if lookup.key is None:
+            return response
+        status = getattr(response, "status_code", None)
+        if method.upper() in UNSAFE_METHODS:
+            if status is not None and status < 400:
+                self.invalidate(lookup.key)
+            return response
+
+        entry = lookup.entry
+        if entry is not None and status == 304:
+            self._count("revalidations")
+            headers = dict(entry.headers)
+            headers.update(self._stored_headers(response))
+            refreshed = self._entry(entry.status_code, headers, entry.content, entry.url, entry.vary)
+            if refreshed is not None:
+                self._put(lookup.key, refreshed)
+                return refreshed.response()
+            self.invalidate(lookup.key)
+            return entry.response()
+
+        if entry is not None:
+            # The validators did not match; count the full transfer as a miss
+            self._count("misses")
+        self.store(lookup.key, lookup.request_kwargs.get("headers"), response)
+        return response
+
+    def store(self, key: str, request_headers: Optional[Mapping[str, str]], response: Any) -> bool:
+        """
+        Store a response if it is cacheable.
+
+        Only final, complete responses are stored: a 304 or 206 answering the
+        caller's own conditional or range headers is not.
+
+        Args:
+            key: Cache key.
+            request_headers: Headers given by the caller.
+            response: Fetched response.
+
+        Returns:
+            bool: True if the response was stored.
+        """
+        headers = getattr(response, "headers", None) or {}
+        status = getattr(response, "status_code", None)
+        if status is None or status < 200 or status in INCOMPLETE_STATUS_CODES:
+            return False
+        if "no-store" in parse_cache_control(_header(request_headers, "cache-control")):
+            return False
+        vary_header = _header(headers, "vary")
+        if "*" in vary_header or is_challenge(response):
+            return False
+        vary = {
+            name.strip().lower(): _header(request_headers, name.strip().lower())
+            for name in vary_header.split(",") if name.strip()
+        }
+        entry = self._entry(
+            status,
+            self._stored_headers(response),
+            getattr(response, "content", b"") or b"",
+            str(getattr(response, "url", "")),
+            vary,
+        )
+        if entry is None:
+            self.invalidate(key)
+            return False
+        self._put(key, entry)
+        return True
+
+    def invalidate(self, key: str) -> None:
+        """
+        Drop an entry from both tiers.
+
+        Args:
+            key: Cache key.
+        """
+        self._memory.delete(key)
+        if self.path:
+            file_path = self._file(key)
+            try:
+                size = os.path.getsize(file_path)
+                os.unlink(file_path)
+            except OSError:
+                return
+            with self._lock:
+                self._disk_bytes -= size
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        self._memory.clear()
+        if self.path:
+            for file_path, _, _ in self._disk_files():
+                try:
+                    os.unlink(file_path)
+                except OSError:
+                    pass
+        with self._lock:
+            self._disk_bytes = 0
+            self.hits = self.misses = self.revalidations = 0
+
+    @staticmethod
+    def _stored_headers(response: Any) -> Dict[str, str]:
+        """
+        Get the response headers worth storing.
+
+        Args:
+            response: Fetched response.
+
+        Returns:
+            Dict[str, str]: Headers without transfer-specific ones.
+        """
+        headers = getattr(response, "headers", None) or {}
+        return {k: v for k, v in headers.items() if k.lower() not in _UNSTORED_HEADERS}
+
+    @staticmethod
+    def _entry(
+        status: Optional[int],
+        headers: Dict[str, str],
+        content: bytes,
+        url: str,
+        vary: Dict[str, str],
+    ) -> Optional[CacheEntry]:
+        """
+        Compute the freshness of a response and build its entry.
+
+        Args:
+            status: HTTP status code.
+            headers: Stored response headers.
+            content: Response body.
+            url: Response URL.
+            vary: Request header values named by Vary.
+
+        Returns:
+            Optional[CacheEntry]: Entry, or None if the response may not be stored.
+        """
+        directives = parse_cache_control(_header(headers, "cache-control"))
+        if "no-store" in directives or status is None:
+            return None
+
+        now = time.time()
+        lifetime: Optional[float] = _seconds(directives.get("max-age"))
+        if lifetime is None and _header(headers, "expires"):
+            expires = _http_date(_header(headers, "expires"))
+            date = _http_date(_header(headers, "date")) or now
+            lifetime = max(expires - date, 0.0) if expires is not None else 0.0
+        if lifetime is None:
+            if status not in HEURISTIC_STATUS_CODES:
+                return None
+            last_modified = _http_date(_header(headers, "last-modified"))
+            date = _http_date(_header(headers, "date")) or now
+            lifetime = 0.0
+            if last_modified is not None and "no-cache" not in directives:
+                lifetime = min(max(date - last_modified, 0.0) * 0.1, MAX_HEURISTIC_LIFETIME)
+
+        entry = CacheEntry(
+            status, headers, content, url,
+            stored_at=now,
+            age=_seconds(_header(headers, "age")) or 0.0,
+            lifetime=lifetime,
+            no_cache="no-cache" in directives,
+            vary=vary,
+        )
+        if not entry.is_fresh(now) and not entry.validatable:
+            return None
+        return entry
+
+    @staticmethod
+    def _vary_matches(entry: CacheEntry, headers: Optional[Mapping[str, str]]) -> bool:
+        """
+        Check the request against the headers the stored response varies on.
+
+        Args:
+            entry: Stored entry.
+            headers: Headers given by the caller.
+
+        Returns:
+            bool: True if the entry may serve the request.
+        """
+        return all(_header(headers, name) == value for name, value in entry.vary.items())
+
+    def _get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Get an entry from memory, falling back to disk.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Optional[CacheEntry]: Entry, or None if neither tier has it.
+        """
+        entry = self._memory.get(key)
+        if entry is not None or not self.path:
+            return entry
+        entry = self._read(key)
+        if entry is not None and len(entry.content) <= self.max_entry_bytes:
+            self._memory.set(key, entry)
+        return entry
+
+    def _put(self, key: str, entry: CacheEntry) -> None:
+        """
+        Store an entry in both tiers.
+
+        Args:
+            key: Cache key.
+            entry: Entry.
+        """
+        if len(entry.content) <= self.max_entry_bytes:
+            self._memory.set(key, entry)
+        else:
+            self._memory.delete(key)
+        if self.path:
+            self._write(key, entry)
+
+    def _file(self, key: str) -> str:
+        """
+        Get the disk tier file of a key.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            str: File path.
+        """
+        # Only the disk tier calls this, which exists when path is set
+        return os.path.join(cast(str, self.path), key)
+
+    def _disk_files(self) -> List[Tuple[str, float, int]]:
+        """
+        List the disk tier files.
+
+        Returns:
+            List[Tuple[str, float, int]]: Path, modification time and size of each file.
+        """
+        files = []
+        with os.scandir(self.path) as it:
+            for item in it:
+                if item.is_file() and not item.name.startswith("."):
+                    stat = item.stat()
+                    files.append((item.path, stat.st_mtime, stat.st_size))
+        return files
+
+    def _read(self, key: str) -> Optional[CacheEntry]:
+        """
+        Read an entry from disk.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Optional[CacheEntry]: Entry, or None if missing or unreadable.
+        """
+        file_path = self._file(key)
+        try:
+            with open(file_path, "rb") as f:
+                meta = json.loads(f.readline())
+                content = f.read()
+            # Touch the file so pruning removes the least recently used first
+            os.utime(file_path)
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(content=content, **meta)
+
+    def _write(self, key: str, entry: CacheEntry) -> None:
+        """
+        Atomically write an entry to disk and prune the tier if it is too large.
+
+        Args:
+            key: Cache key.
+            entry: Entry.
+        """
+        file_path = self._file(key)
+        data = json.dumps(entry.to_meta()).encode("utf-8") + b"\n" + entry.content
+        try:
+            previous = os.path.getsize(file_path)
+        except OSError:
+            previous = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix=".cf-ares-cache-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self._disk_bytes += len(data) - previous
+            over = self.max_disk_bytes is not None and self._disk_bytes > self.max_disk_bytes
+        if over:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Remove the least recently used files until the disk tier is within 90% of its bound."""
+        if self.max_disk_bytes is None:
+            return
+        files = sorted(self._disk_files(), key=lambda item: item[1])
+        total = sum(size for _, _, size in files)
+        target = self.max_disk_bytes * 0.9
+        for file_path, _, size in files:
+            if total <= target:
+                break
+            try:
+                os.unlink(file_path)
+            except OSError:
+                continue
+            total -= size
+        with self._lock:
+            self._disk_bytes = total
@@ -0,0 +1,151 @@
+"""
+Cheap Cloudflare challenge detection for HTTP responses.
+
+Classification relies on status code and headers first and only looks at a
+bounded prefix of the body, so it never copies or lowercases a whole
+response.
+"""
+
+from typing import Any, Mapping, Optional
+
+# Status codes Cloudflare serves interstitials and blocks with
+CHALLENGE_STATUS_CODES = frozenset({403, 429, 503})
+
+# Markers found near the top of Cloudflare challenge pages
+CHALLENGE_MARKERS = (
+    b"cf-challenge",
+    b"cf_chl_",
+    b"challenge-platform",
+    b"cf-browser-verification",
+    b"<title>just a moment",
+    b"<title>attention required",
+)
+
+# Cloudflare also injects challenge-platform scripts into regular pages, so a
+# rendered document is only judged by markers of the interstitial itself
+DOCUMENT_MARKERS = tuple(marker for marker in CHALLENGE_MARKERS if marker != b"challenge-platform")
+
+DEFAULT_SCAN_BYTES = 4096
+
+
+def _header(headers: Optional[Mapping[str, Any]], name: str) -> str:
+    """
+    Look up a header case-insensitively.
+
+    Args:
+        headers: Response headers.
+        name: Lower-case header name.
+
+    Returns:
+        str: Header value, or an empty string.
+    """
+    if not headers:
+        return ""
+    value = headers.get(name)
+    if value is None:
+        for key, candidate in headers.items():
+            if key.lower() == name:
+                value = candidate
+                break
+    return str(value or "")
+
+
+def is_challenge_response(
+    status_code: Optional[int],
+    headers: Optional[Mapping[str, Any]] = None,
+    body: Optional[bytes] = None,
+    scan_bytes: int = DEFAULT_SCAN_BYTES,
+) -> bool:
+    """
+    Decide whether a response is a Cloudflare challenge instead of real content.
+
+    Args:
+        status_code: HTTP status code.
+        headers: Response headers.
+        body: Response body. If None, only the cf-mitigated header counts:
+            a Cloudflare-served 403, 429 or 503 may just as well be the
+            origin's own error or a rate limit.
+        scan_bytes: Maximum number of body bytes to scan for challenge markers.
+
+    Returns:
+        bool: True if the response is a challenge page.
+    """
+    if _header(headers, "cf-mitigated").lower() == "challenge":
+        return True
+
+    if body is None or status_code not in CHALLENGE_STATUS_CODES:
+        return False
+
+    if "cloudflare" not in _header(headers, "server").lower():
+        return False
+
+    prefix = body[:scan_bytes].lower()
+    return any(marker in prefix for marker in CHALLENGE_MARKERS)
+
+
+def needs_body(status_code: Optional[int], headers: Optional[Mapping[str, Any]] = None) -> bool:
+    """
+    Decide whether status and headers alone leave a response unclassified.
+
+    Cloudflare marks its interstitials with cf-mitigated, but an unmarked
+    403, 429 or 503 it served may still be an older challenge page, or just
+    the origin's own error; only the body tells them apart.
+
+    Args:
+        status_code: HTTP status code.
+        headers: Response headers.
+
+    Returns:
+        bool: True if the body must be scanned to classify the response.
+    """
+    return (
+        status_code in CHALLENGE_STATUS_CODES
+        and "cloudflare" in _header(headers, "server").lower()
+        and _header(headers, "cf-mitigated").lower() != "challenge"
+    )
+
+
+def is_challenge(response: Any, scan_bytes: int = DEFAULT_SCAN_BYTES) -> bool:
+    """
+    Classify a response object (curl_cffi, AresResponse or similar).
+
+    Args:
+        response: Object with status_code, headers and optionally content.
+        scan_bytes: Maximum number of body bytes to scan.
+
+    Returns:
+        bool: True if the response is a challenge page.
+    """
+    if getattr(response, "queue", None) is not None or getattr(response, "stream", False) is True:
+        # Streamed responses (curl_cffi or AresResponse) have not read their body yet
+        body = None
+    else:
+        body = getattr(response, "content", None)
+    if isinstance(body, str):
+        body = body[:scan_bytes].encode("utf-8", errors="replace")
+    return is_challenge_response(
+        getattr(response, "status_code", None),
+        getattr(response, "headers", None),
+        body,
+        scan_bytes,
+    )
+
+
+def is_challenge_document(body: Optional[bytes], scan_bytes: int = DEFAULT_SCAN_BYTES) -> bool:
+    """
+    Decide whether a rendered page is still the Cloudflare interstitial.
+
+    Browser snapshots carry no status code or headers, so only the page
+    source can tell.
+
+    Args:
+        body: Page source.
+        scan_bytes: Maximum number of bytes to scan for challenge markers.
+
+    Returns:
+        bool: True if the page is a challenge page.
+    """
+    if not body:
+        return False
+    prefix = body[:scan_bytes].lower()
+    return any(marker in prefix for marker in DOCUMENT_MARKERS)
@@ -0,0 +1,255 @@
+"""
+Shared DNS cache for CF-Ares curl engines.
+
+libcurl keeps a DNS cache per handle (or per multi handle), so every new
+handle, thread-local session or client resolves each host again. DNSCache
+resolves once per TTL for everyone sharing it and pins the result on each
+transfer with CURLOPT_RESOLVE. shared_dns_cache() returns the process-wide
+instance.
+"""
+
+import asyncio
+import ipaddress
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from cf_ares.utils.lru import StripedLRU
+from cf_ares.utils.singleflight import SingleFlight
+
+DEFAULT_TTL = 60.0
+DEFAULT_MAX_ENTRIES = 10000
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+Resolver = Callable[[str, int], List[str]]
+
+
+def system_resolver(host: str, port: int) -> List[str]:
+    """
+    Resolve a host with the system resolver.
+
+    Args:
+        host: Host name.
+        port: Port.
+
+    Returns:
+        List[str]: Addresses in the order getaddrinfo returned them, without duplicates.
+    """
+    infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return list(dict.fromkeys(str(info[4][0]) for info in infos))
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+class DNSCache:
+    """
+    Thread-safe DNS cache feeding CURLOPT_RESOLVE.
+    Concurrent lookups of the same host share a single resolution.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+        resolver: Optional[Resolver] = None,
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            ttl: Seconds a resolution is reused for.
+            max_entries: Maximum number of host:port entries kept.
+            resolver: Callable returning the addresses of a host and port.
+                Defaults to the system resolver.
+        """
+        self.ttl = ttl
+        self.resolver = resolver or system_resolver
+        self._entries: StripedLRU[List[str]] = StripedLRU(max_entries)
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {"hits": 0, "misses": 0, "failures": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    @staticmethod
+    def target(url: str) -> Optional[Tuple[str, int]]:
+        """
+        Get the host and port a URL connects to.
+
+        Args:
+            url: URL.
+
+        Returns:
+            Optional[Tuple[str, int]]: Lower-cased host and port, or None if
+                the URL needs no lookup (an IP address or unknown scheme).
+        """
+        parsed = urlparse(url)
+        host = parsed.hostname
+        if not host or _is_ip(host) or parsed.scheme not in DEFAULT_PORTS:
+            return None
+        try:
+            port = parsed.port or DEFAULT_PORTS[parsed.scheme]
+        except ValueError:
+            return None
+        return host, port
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        """
+        Get the addresses of a host, resolving it if the cached entry expired.
+
+        Args:
+            host: Lower-cased host name.
+            port: Port.
+
+        Returns:
+            List[str]: Addresses.
+
+        Raises:
+            OSError: If the host cannot be resolved.
+        """
+        key = f"{host}:{port}"
+        addresses = self._entries.get(key)
+        if addresses is not None:
+            self._count("hits")
+            return addresses
+
+        def lookup() -> List[str]:
+            cached = self._entries.get(key)
+            if cached is not None:
+                return cached
+            self._count("misses")
+            try:
+                found = self.resolver(host, port)
+            except OSError:
+                self._count("failures")
+                raise
+            if not found:
+                self._count("failures")
+                raise socket.gaierror(f"No addresses for {host}")
+            self._entries.set(key, found, time.time() + self.ttl)
+            return found
+
+        resolved: List[str] = self._flight.do(key, lookup)
+        return resolved
+
+    async def aresolve(self, host: str, port: int) -> List[str]:
+        """
+        Get the addresses of a host without blocking the event loop.
+
+        Args:
+            host: Lower-cased host name.
+            port: Port.
+
+        Returns:
+            List[str]: Addresses.
+
+        Raises:
+            OSError: If the host cannot be resolved.
+        """
+        addresses = self._entries.get(f"{host}:{port}")
+        if addresses is not None:
+            self._count("hits")
+            return addresses
+        return await asyncio.get_running_loop().run_in_executor(None, self.resolve, host, port)
+
+    @staticmethod
+    def _option(host: str, port: int, addresses: Optional[List[str]]) -> str:
+        """
+        Format a CURLOPT_RESOLVE entry.
+
+        Args:
+            host: Host name.
+            port: Port.
+            addresses: Addresses to pin, or None to drop a pinned entry.
+
+        Returns:
+            str: Entry.
+        """
+        if addresses is None:
+            return f"-{host}:{port}"
+        formatted = ",".join(f"[{address}]" if ":" in address else address for address in addresses)
+        return f"{host}:{port}:{formatted}"
+
+    def resolve_option(self, url: str) -> Optional[str]:
+        """
+        Get the CURLOPT_RESOLVE entry for a URL.
+
+        Args:
+            url: URL about to be requested.
+
+        Returns:
+            Optional[str]: "host:port:addresses", "-host:port" if the lookup
+                failed (so libcurl resolves and reports the error itself), or
+                None if the URL needs no lookup.
+        """
+        target = self.target(url)
+        if target is None:
+            return None
+        try:
+            return self._option(*target, self.resolve(*target))
+        except OSError:
+            return self._option(*target, None)
+
+    async def aresolve_option(self, url: str) -> Optional[str]:
+        """
+        Get the CURLOPT_RESOLVE entry for a URL without blocking the event loop.
+
+        Args:
+            url: URL about to be requested.
+
+        Returns:
+            Optional[str]: Entry, see resolve_option().
+        """
+        target = self.target(url)
+        if target is None:
+            return None
+        try:
+            return self._option(*target, await self.aresolve(*target))
+        except OSError:
+            return self._option(*target, None)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict[str, int]: Hits, misses (lookups), failed lookups and cached entries.
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        counts["entries"] = len(self._entries)
+        return counts
+
+    def clear(self) -> None:
+        """Forget all resolutions."""
+        self._entries.clear()
+
+
+_shared: Optional[DNSCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_dns_cache() -> DNSCache:
+    """
+    Get the process-wide DNS cache.
+
+    Returns:
+        DNSCache: Cache shared by every engine that uses it.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = DNSCache()
+    return _shared
@@ -0,0 +1,203 @@
+"""
+Host normalisation and cookie-scope indexing for CF-Ares.
+
+Sessions are keyed by the scope of their clearance cookie: "example.com" for
+a host-only cookie, ".example.com" for a cookie sent to example.com and all of
+its subdomains. A reverse-label trie maps a host to the sessions covering it
+in time proportional to the number of labels in the host, independent of how
+many domains are stored.
+"""
+
+import ipaddress
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+
+def normalize_host(url: str) -> str:
+    """
+    Get the normalised host of a URL.
+
+    The host is lower-cased and stripped of any port and trailing dot.
+    Cookies are not scoped by port, so "example.com", "example.com:443" and
+    "example.com:8443" all map to "example.com".
+
+    Args:
+        url: URL or bare host.
+
+    Returns:
+        str: Normalised host.
+    """
+    parsed = urlparse(url if "//" in url else f"//{url}")
+    host = parsed.hostname or parsed.netloc.lower()
+    return host.rstrip(".")
+
+
+def _is_ip(host: str) -> bool:
+    """
+    Check whether a host is an IP address.
+
+    Args:
+        host: Normalised host.
+
+    Returns:
+        bool: True for IPv4 and IPv6 addresses.
+    """
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+def cookie_scope(host: str, cookie_domain: Optional[str]) -> str:
+    """
+    Get the session scope implied by a cookie's Domain attribute.
+
+    Args:
+        host: Host the cookie was obtained on.
+        cookie_domain: Cookie domain as reported by the browser, with a leading
+            dot for domain cookies. None or empty for unknown.
+
+    Returns:
+        str: ".domain" if the cookie covers subdomains of a domain the host
+            belongs to, otherwise the host itself.
+    """
+    if not cookie_domain or not cookie_domain.startswith(".") or _is_ip(host):
+        return host
+    domain = cookie_domain.lstrip(".").lower()
+    if host == domain or host.endswith("." + domain):
+        return "." + domain
+    return host
+
+
+def candidate_scopes(host: str) -> List[str]:
+    """
+    List every scope whose session could apply to a host, most specific first.
+
+    Args:
+        host: Normalised host.
+
+    Returns:
+        List[str]: The host itself followed by ".host" and ".parent" scopes,
+            down to the two-label domain.
+    """
+    if _is_ip(host):
+        return [host]
+    labels = host.split(".")
+    return [host] + ["." + ".".join(labels[i:]) for i in range(max(len(labels) - 1, 1))]
+
+
+class _Node:
+    """Trie node for one domain label."""
+
+    __slots__ = ("children", "exact", "wildcard")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_Node"] = {}
+        # Scope of a host-only session ending at this node
+        self.exact: Optional[str] = None
+        # Scope of a session covering this domain and its subdomains
+        self.wildcard: Optional[str] = None
+
+
+class DomainIndex:
+    """
+    Reverse-label trie of session scopes.
+    "api.example.com" is stored under com -> example -> api, so every scope
+    covering a host lies on the path walked for that host. Writers are
+    serialised; lookups take no lock.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._root = _Node()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _labels(scope: str) -> List[str]:
+        """
+        Split a scope into trie labels, top-level label first.
+
+        Args:
+            scope: Host or ".domain" scope.
+
+        Returns:
+            List[str]: Reversed labels.
+        """
+        host = scope.lstrip(".")
+        return [host] if _is_ip(host) else host.split(".")[::-1]
+
+    def add(self, scope: str) -> None:
+        """
+        Add a scope.
+
+        Args:
+            scope: Host or ".domain" scope.
+        """
+        with self._lock:
+            node = self._root
+            for label in self._labels(scope):
+                node = node.children.setdefault(label, _Node())
+            if scope.startswith("."):
+                node.wildcard = scope
+            else:
+                node.exact = scope
+
+    def remove(self, scope: str) -> None:
+        """
+        Remove a scope, pruning nodes that no longer lead anywhere.
+
+        Args:
+            scope: Host or ".domain" scope.
+        """
+        with self._lock:
+            path = [self._root]
+            for label in self._labels(scope):
+                node = path[-1].children.get(label)
+                if node is None:
+                    return
+                path.append(node)
+            node = path[-1]
+            if scope.startswith("."):
+                node.wildcard = None
+            else:
+                node.exact = None
+            labels = self._labels(scope)
+            for depth in range(len(labels), 0, -1):
+                node = path[depth]
+                if node.children or node.exact or node.wildcard:
+                    break
+                del path[depth - 1].children[labels[depth - 1]]
+
+    def lookup(self, host: str) -> List[str]:
+        """
+        Find the scopes covering a host.
+
+        Args:
+            host: Normalised host.
+
+        Returns:
+            List[str]: Matching scopes, most specific first.
+        """
+        matches = []
+        labels = self._labels(host)
+        # Lock-free: single dict lookups and attribute reads are atomic, and a
+        # concurrent add/remove at worst makes this miss or return a scope
+        # whose record is already gone, which callers tolerate.
+        node = self._root
+        for depth, label in enumerate(labels, 1):
+            child = node.children.get(label)
+            if child is None:
+                break
+            node = child
+            if node.wildcard:
+                matches.append(node.wildcard)
+            if depth == len(labels) and node.exact:
+                matches.append(node.exact)
+        return matches[::-1]
+
+    def clear(self) -> None:
+        """Remove all scopes."""
+        with self._lock:
+            self._root = _Node()
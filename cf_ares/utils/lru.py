@@ -0,0 +1,246 @@
+"""
+Bounded, expiring, lock-striped LRU map for CF-Ares.
+
+Keys are spread over independent stripes, each with its own lock, LRU order
+and expiry heap, so concurrent readers and writers of different keys rarely
+contend. Expired entries are purged from the heap in O(log n) each; the least
+recently used entries are evicted once a stripe is full.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+V = TypeVar("V")
+
+DEFAULT_STRIPES = 16
+
+
+class _Stripe:
+    """One shard of a StripedLRU."""
+
+    __slots__ = ("lock", "entries", "heap", "capacity")
+
+    def __init__(self, capacity: Optional[int]):
+        self.lock = threading.Lock()
+        # key -> (value, expiry as time.time() or None), least recently used first
+        self.entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        # (expiry, sequence, key); entries whose expiry changed are skipped lazily
+        self.heap: List[Tuple[float, int, str]] = []
+        self.capacity = capacity
+
+
+class StripedLRU(Generic[V]):
+    """
+    Thread-safe map with a capacity bound, LRU eviction and per-entry expiry.
+    The capacity is split evenly across stripes, so eviction follows LRU
+    order within a stripe rather than globally.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        stripes: int = DEFAULT_STRIPES,
+        on_remove: Optional[Callable[[str], None]] = None,
+    ):
+        """
+        Initialize the map.
+
+        Args:
+            max_entries: Maximum number of entries. None means unbounded.
+            stripes: Number of independently locked shards.
+            on_remove: Called with the key of every entry that is evicted or
+                expires, outside of any lock. Not called for delete() or clear().
+        """
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        stripes = max(1, min(stripes, max_entries or stripes))
+        capacity = None if max_entries is None else -(-max_entries // stripes)
+        self.max_entries = max_entries
+        self._stripes = [_Stripe(capacity) for _ in range(stripes)]
+        self._sequence = itertools.count()
+        self._on_remove = on_remove
+
+    def _stripe(self, key: str) -> _Stripe:
+        """
+        Get the stripe a key belongs to.
+
+        Args:
+            key: Entry key.
+
+        Returns:
+            _Stripe: Owning stripe.
+        """
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    @staticmethod
+    def _purge(stripe: _Stripe, now: float, removed: List[str]) -> None:
+        """
+        Drop expired entries from a stripe. Must be called with its lock held.
+
+        Args:
+            stripe: Stripe to purge.
+            now: Current time.
+            removed: Receives the keys of purged entries.
+        """
+        heap = stripe.heap
+        while heap and heap[0][0] <= now:
+            expires, _, key = heapq.heappop(heap)
+            entry = stripe.entries.get(key)
+            if entry is not None and entry[1] == expires:
+                del stripe.entries[key]
+                removed.append(key)
+
+    def _removed(self, keys: List[str]) -> None:
+        """
+        Report evicted or expired keys.
+
+        Args:
+            keys: Removed keys.
+        """
+        if self._on_remove is not None:
+            for key in keys:
+                self._on_remove(key)
+
+    def get(self, key: str) -> Optional[V]:
+        """
+        Get an unexpired entry and mark it as recently used.
+
+        Args:
+            key: Entry key.
+
+        Returns:
+            Optional[V]: Value, or None if missing or expired.
+        """
+        stripe = self._stripe(key)
+        removed: List[str] = []
+        with stripe.lock:
+            entry = stripe.entries.get(key)
+            if entry is not None:
+                if entry[1] is not None and entry[1] <= time.time():
+                    del stripe.entries[key]
+                    removed.append(key)
+                    entry = None
+                else:
+                    stripe.entries.move_to_end(key)
+        self._removed(removed)
+        return entry[0] if entry is not None else None
+
+    def set(self, key: str, value: V, expires: Optional[float] = None) -> None:
+        """
+        Insert or replace an entry, evicting the least recently used if full.
+
+        Args:
+            key: Entry key.
+            value: Value.
+            expires: Unix time at which the entry expires. None never expires.
+        """
+        stripe = self._stripe(key)
+        removed: List[str] = []
+        with stripe.lock:
+            stripe.entries[key] = (value, expires)
+            stripe.entries.move_to_end(key)
+            if expires is not None:
+                heapq.heappush(stripe.heap, (expires, next(self._sequence), key))
+            self._purge(stripe, time.time(), removed)
+            if stripe.capacity is not None:
+                while len(stripe.entries) > stripe.capacity:
+                    removed.append(stripe.entries.popitem(last=False)[0])
+            if len(stripe.heap) > 2 * len(stripe.entries) + 64:
+                # Too many stale heap entries from replaced keys; rebuild
+                stripe.heap = [
+                    (exp, next(self._sequence), k)
+                    for k, (_, exp) in stripe.entries.items() if exp is not None
+                ]
+                heapq.heapify(stripe.heap)
+        self._removed(removed)
+
+    def delete(self, key: str) -> Optional[V]:
+        """
+        Remove an entry.
+
+        Args:
+            key: Entry key.
+
+        Returns:
+            Optional[V]: Removed value, or None if there was none.
+        """
+        stripe = self._stripe(key)
+        with stripe.lock:
+            entry = stripe.entries.pop(key, None)
+        return entry[0] if entry is not None else None
+
+    def purge(self) -> int:
+        """
+        Drop all expired entries.
+
+        Returns:
+            int: Number of entries dropped.
+        """
+        removed: List[str] = []
+        now = time.time()
+        for stripe in self._stripes:
+            with stripe.lock:
+                self._purge(stripe, now, removed)
+        self._removed(removed)
+        return len(removed)
+
+    def items(self) -> Dict[str, V]:
+        """
+        Get a snapshot of all unexpired entries.
+
+        Returns:
+            Dict[str, V]: Values by key.
+        """
+        self.purge()
+        result: Dict[str, V] = {}
+        for stripe in self._stripes:
+            with stripe.lock:
+                result.update((key, value) for key, (value, _) in stripe.entries.items())
+        return result
+
+    def keys(self) -> List[str]:
+        """
+        List the keys of all unexpired entries.
+
+        Returns:
+            List[str]: Keys.
+        """
+        return list(self.items())
+
+    def clear(self) -> List[str]:
+        """
+        Remove all entries.
+
+        Returns:
+            List[str]: Keys that were removed.
+        """
+        keys: List[str] = []
+        for stripe in self._stripes:
+            with stripe.lock:
+                keys.extend(stripe.entries)
+                stripe.entries.clear()
+                stripe.heap.clear()
+        return keys
+
+    def __len__(self) -> int:
+        return sum(len(stripe.entries) for stripe in self._stripes)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
@@ -0,0 +1,406 @@
+"""
+Request metrics for CF-Ares.
+
+libcurl measures every transfer: name lookup, connect, TLS handshake, time
+to first byte and total time, plus bytes sent and received. RequestTimings
+exposes these for one response; MetricsRegistry aggregates them per host and
+method into histograms and counters, and to_prometheus() renders a registry
+in the Prometheus text exposition format.
+"""
+
+import bisect
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from curl_cffi import CurlInfo
+from curl_cffi.const import CurlECode
+
+from cf_ares.utils.retry import curl_error_code
+
+# Transfer information requested from libcurl for every request
+TIMING_INFOS = (
+    CurlInfo.NAMELOOKUP_TIME,
+    CurlInfo.CONNECT_TIME,
+    CurlInfo.APPCONNECT_TIME,
+    CurlInfo.PRETRANSFER_TIME,
+    CurlInfo.STARTTRANSFER_TIME,
+    CurlInfo.TOTAL_TIME,
+    CurlInfo.NUM_CONNECTS,
+)
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Hosts beyond this many are aggregated under OTHER_HOST to bound label cardinality
+DEFAULT_MAX_HOSTS = 1000
+OTHER_HOST = "other"
+
+PHASES = ("dns", "connect", "tls", "server", "transfer", "total")
+
+
+class RequestTimings:
+    """
+    Timing and size of one transfer as measured by libcurl.
+    Times are seconds since the start of the request, as libcurl reports
+    them; phases() turns them into per-phase durations.
+    """
+
+    __slots__ = (
+        "namelookup", "connect", "appconnect", "pretransfer", "starttransfer",
+        "total", "bytes_sent", "bytes_received", "new_connections",
+    )
+
+    def __init__(
+        self,
+        namelookup: float = 0.0,
+        connect: float = 0.0,
+        appconnect: float = 0.0,
+        pretransfer: float = 0.0,
+        starttransfer: float = 0.0,
+        total: float = 0.0,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+        new_connections: int = 0,
+    ):
+        self.namelookup = namelookup
+        self.connect = connect
+        self.appconnect = appconnect
+        self.pretransfer = pretransfer
+        self.starttransfer = starttransfer
+        self.total = total
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.new_connections = new_connections
+
+    @classmethod
+    def from_response(cls, response: Any) -> Optional["RequestTimings"]:
+        """
+        Read the timings of a curl_cffi response.
+
+        Args:
+            response: curl_cffi response.
+
+        Returns:
+            Optional[RequestTimings]: Timings, or None if the response carries
+                no transfer information (e.g. it came from the cache).
+        """
+        infos = getattr(response, "infos", None)
+        if not infos:
+            return None
+        return cls(
+            namelookup=infos.get(CurlInfo.NAMELOOKUP_TIME, 0.0),
+            connect=infos.get(CurlInfo.CONNECT_TIME, 0.0),
+            appconnect=infos.get(CurlInfo.APPCONNECT_TIME, 0.0),
+            pretransfer=infos.get(CurlInfo.PRETRANSFER_TIME, 0.0),
+            starttransfer=infos.get(CurlInfo.STARTTRANSFER_TIME, 0.0),
+            total=infos.get(CurlInfo.TOTAL_TIME, 0.0),
+            bytes_sent=getattr(response, "request_size", 0) or 0,
+            bytes_received=getattr(response, "response_size", 0) or 0,
+            new_connections=infos.get(CurlInfo.NUM_CONNECTS, 0),
+        )
+
+    def phases(self) -> Dict[str, float]:
+        """
+        Split the request into consecutive phases.
+
+        A reused connection has no dns, connect or tls phase.
+
+        Returns:
+            Dict[str, float]: Seconds spent in dns, connect, tls, server (from
+                sending the request to the first response byte), transfer and
+                total.
+        """
+        connected = self.appconnect or self.connect
+        return {
+            "dns": self.namelookup,
+            "connect": max(self.connect - self.namelookup, 0.0),
+            "tls": max(self.appconnect - self.connect, 0.0) if self.appconnect else 0.0,
+            "server": max(self.starttransfer - max(self.pretransfer, connected), 0.0),
+            "transfer": max(self.total - self.starttransfer, 0.0),
+            "total": self.total,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the raw timings as a dictionary.
+
+        Returns:
+            Dict[str, Any]: Timings by name.
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"<RequestTimings total={self.total:.3f}s ttfb={self.starttransfer:.3f}s>"
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets, as exported to Prometheus."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # One count per bucket plus the +Inf bucket, not cumulative
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Record a value.
+
+        Args:
+            value: Observed value.
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """
+        Get the cumulative bucket counts.
+
+        Returns:
+            List[Tuple[str, int]]: (upper bound as label, count) pairs ending with "+Inf".
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile as the upper bound of the bucket containing it.
+
+        Args:
+            q: Quantile between 0 and 1.
+
+        Returns:
+            Optional[float]: Estimated value, or None if nothing was observed.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+def error_class(error: BaseException) -> str:
+    """
+    Classify an exception for error counters.
+
+    Args:
+        error: Raised exception.
+
+    Returns:
+        str: curl error name (e.g. "OPERATION_TIMEDOUT") for curl errors,
+            otherwise the exception class name.
+    """
+    code = curl_error_code(error)
+    if code is not None:
+        try:
+            return CurlECode(code).name
+        except ValueError:
+            return f"CURLE_{code}"
+    return type(error).__name__
+
+
+class MetricsRegistry:
+    """
+    Thread-safe aggregation of request metrics for one client.
+
+    Keeps, per host and method, a latency histogram for every phase, response
+    counts by status, error counts by class and bytes sent and received.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, max_hosts: int = DEFAULT_MAX_HOSTS):
+        """
+        Initialize an empty registry.
+
+        Args:
+            buckets: Histogram bucket upper bounds in seconds.
+            max_hosts: Number of distinct hosts tracked; further hosts are
+                aggregated under "other".
+        """
+        self.buckets = tuple(buckets)
+        self.max_hosts = max_hosts
+        self._lock = threading.Lock()
+        self._hosts: set = set()
+        # (host, method, phase) -> histogram
+        self.durations: Dict[Tuple[str, str, str], Histogram] = {}
+        # (host, method, status) -> count
+        self.responses: Dict[Tuple[str, str, str], int] = {}
+        # (host, method, error class) -> count
+        self.errors: Dict[Tuple[str, str, str], int] = {}
+        # host -> bytes
+        self.bytes_sent: Dict[str, int] = {}
+        self.bytes_received: Dict[str, int] = {}
+        # host -> connections opened
+        self.connections: Dict[str, int] = {}
+
+    def _host(self, host: str) -> str:
+        """
+        Get the label for a host. Must be called with the lock held.
+
+        Args:
+            host: Normalised host.
+
+        Returns:
+            str: The host, or "other" once max_hosts hosts are tracked.
+        """
+        if host in self._hosts:
+            return host
+        if len(self._hosts) >= self.max_hosts:
+            return OTHER_HOST
+        self._hosts.add(host)
+        return host
+
+    def observe(self, host: str, method: str, response: Any) -> Optional[RequestTimings]:
+        """
+        Record a response.
+
+        Args:
+            host: Normalised host.
+            method: HTTP method.
+            response: curl_cffi response.
+
+        Returns:
+            Optional[RequestTimings]: The response's timings, if available.
+        """
+        timings = RequestTimings.from_response(response)
+        method = method.upper()
+        status = str(getattr(response, "status_code", None) or "unknown")
+        with self._lock:
+            host = self._host(host)
+            key = (host, method, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+            if timings is None:
+                return None
+            for phase, seconds in timings.phases().items():
+                histogram = self.durations.get((host, method, phase))
+                if histogram is None:
+                    histogram = self.durations[(host, method, phase)] = Histogram(self.buckets)
+                histogram.observe(seconds)
+            self.bytes_sent[host] = self.bytes_sent.get(host, 0) + timings.bytes_sent
+            self.bytes_received[host] = self.bytes_received.get(host, 0) + timings.bytes_received
+            self.connections[host] = self.connections.get(host, 0) + timings.new_connections
+        return timings
+
+    def error(self, host: str, method: str, error: BaseException) -> None:
+        """
+        Record a failed request.
+
+        Args:
+            host: Normalised host.
+            method: HTTP method.
+            error: Raised exception.
+        """
+        name = error_class(error)
+        with self._lock:
+            key = (self._host(host), method.upper(), name)
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def histogram(self, host: str, method: str, phase: str = "total") -> Optional[Histogram]:
+        """
+        Get the latency histogram of a phase.
+
+        Args:
+            host: Normalised host.
+            method: HTTP method.
+            phase: One of dns, connect, tls, server, transfer, total.
+
+        Returns:
+            Optional[Histogram]: Histogram, or None if nothing was recorded.
+        """
+        return self.durations.get((host, method.upper(), phase))
+
+    def reset(self) -> None:
+        """Drop all recorded metrics."""
+        with self._lock:
+            self._hosts.clear()
+            self.durations.clear()
+            self.responses.clear()
+            self.errors.clear()
+            self.bytes_sent.clear()
+            self.bytes_received.clear()
+            self.connections.clear()
+
+
+def _labels(**labels: str) -> str:
+    """
+    Format Prometheus labels.
+
+    Args:
+        **labels: Label values.
+
+    Returns:
+        str: '{name="value",...}' with values escaped.
+    """
+    pairs = (
+        name + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+def to_prometheus(registry: MetricsRegistry, prefix: str = "cf_ares") -> str:
+    """
+    Render a registry in the Prometheus text exposition format.
+
+    Args:
+        registry: Registry to export.
+        prefix: Metric name prefix.
+
+    Returns:
+        str: Exposition text, ending with a newline.
+    """
+    lines: List[str] = []
+    with registry._lock:
+        durations = sorted(
+            (key, list(h.cumulative()), h.sum, h.count) for key, h in registry.durations.items()
+        )
+        responses = sorted(registry.responses.items())
+        errors = sorted(registry.errors.items())
+        counters = [
+            ("bytes_sent_total", "Request bytes sent, headers included.", sorted(registry.bytes_sent.items())),
+            ("bytes_received_total", "Response bytes received, headers included.", sorted(registry.bytes_received.items())),
+            ("connections_total", "Connections opened.", sorted(registry.connections.items())),
+        ]
+
+    name = f"{prefix}_request_duration_seconds"
+    lines.append(f"# HELP {name} Request latency by phase as measured by libcurl.")
+    lines.append(f"# TYPE {name} histogram")
+    for (host, method, phase), buckets, total, count in durations:
+        for bound, cumulative in buckets:
+            labels = _labels(host=host, method=method, phase=phase, le=bound)
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = _labels(host=host, method=method, phase=phase)
+        lines.append(f"{name}_sum{labels} {total}")
+        lines.append(f"{name}_count{labels} {count}")
+
+    name = f"{prefix}_responses_total"
+    lines.append(f"# HELP {name} Responses by status code.")
+    lines.append(f"# TYPE {name} counter")
+    for (host, method, status), count in responses:
+        lines.append(f"{name}{_labels(host=host, method=method, status=status)} {count}")
+
+    name = f"{prefix}_request_errors_total"
+    lines.append(f"# HELP {name} Failed requests by error class.")
+    lines.append(f"# TYPE {name} counter")
+    for (host, method, error), count in errors:
+        lines.append(f"{name}{_labels(host=host, method=method, error=error)} {count}")
+
+    for suffix, help_text, values in counters:
+        name = f"{prefix}_{suffix}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for host, value in values:
+            lines.append(f"{name}{_labels(host=host)} {value}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,171 @@
+"""
+Per-domain challenge profile for CF-Ares.
+
+Remembers which hosts served a Cloudflare challenge and which answered plain
+requests directly, optionally persisted to a small JSON file, so probe-first
+clients can skip the browser for known-clean hosts and skip the probe for
+hosts known to challenge.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+from cf_ares.utils.lru import StripedLRU
+
+# Outcomes
+CLEAN = "clean"
+CHALLENGED = "challenged"
+
+DEFAULT_PROFILE_TTL = 86400.0
+DEFAULT_PROFILE_SIZE = 10000
+DEFAULT_FLUSH_DELAY = 5.0
+
+
+class DomainProfile:
+    """
+    Bounded map of host -> last observed outcome ("clean" or "challenged").
+    Outcomes expire after ttl seconds so hosts that change their Cloudflare
+    configuration are re-probed. Changes are written to the profile file by a
+    background timer at most once per flush_delay seconds, and on close().
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = DEFAULT_PROFILE_TTL,
+        max_entries: Optional[int] = DEFAULT_PROFILE_SIZE,
+        flush_delay: float = DEFAULT_FLUSH_DELAY,
+    ):
+        """
+        Initialize the profile, loading it from path if it exists.
+
+        Args:
+            path: JSON file to persist the profile to. None keeps it in memory.
+            ttl: Seconds an observed outcome is trusted.
+            max_entries: Maximum number of hosts remembered.
+            flush_delay: Seconds changes are batched before the file is rewritten.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.flush_delay = flush_delay
+        self._outcomes: StripedLRU[tuple] = StripedLRU(max_entries)
+        self._save_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._dirty = False
+        if path and os.path.exists(path):
+            self.load()
+
+    def get(self, host: str) -> Optional[str]:
+        """
+        Get the trusted outcome for a host.
+
+        Args:
+            host: Normalised host.
+
+        Returns:
+            Optional[str]: "clean", "challenged" or None if unknown.
+        """
+        entry = self._outcomes.get(host)
+        return entry[0] if entry is not None else None
+
+    def record(self, host: str, outcome: str) -> None:
+        """
+        Record the outcome of a request to a host.
+
+        Only a changed outcome marks the profile dirty, so steady traffic does
+        not cause disk writes, and the write itself happens off the caller's
+        thread.
+
+        Args:
+            host: Normalised host.
+            outcome: "clean" or "challenged".
+        """
+        if outcome not in (CLEAN, CHALLENGED):
+            raise ValueError(f"Unknown outcome: {outcome!r}")
+        previous = self.get(host)
+        now = time.time()
+        if previous == outcome:
+            return
+        self._outcomes.set(host, (outcome, now), expires=now + self.ttl)
+        self._mark_dirty()
+
+    def forget(self, host: str) -> None:
+        """
+        Drop what is known about a host.
+
+        Args:
+            host: Normalised host.
+        """
+        if self._outcomes.delete(host) is not None:
+            self._mark_dirty()
+
+    def _mark_dirty(self) -> None:
+        """Schedule a background flush unless one is already pending."""
+        if not self.path:
+            return
+        with self._flush_lock:
+            self._dirty = True
+            if self._flush_timer is not None:
+                return
+            self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Write the profile file if it has unsaved changes."""
+        with self._flush_lock:
+            self._flush_timer = None
+            dirty, self._dirty = self._dirty, False
+        if dirty:
+            self.save()
+
+    def close(self) -> None:
+        """Cancel the pending background write and flush unsaved changes."""
+        with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+        self.flush()
+
+    def load(self) -> None:
+        """Load outcomes from the profile file, skipping expired or malformed ones."""
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                hosts = json.load(f).get("hosts", {})
+            entries = list(hosts.items())
+        except (OSError, ValueError, AttributeError):
+            return
+        now = time.time()
+        for host, entry in entries:
+            try:
+                outcome, observed = entry
+                observed = float(observed)
+            except (TypeError, ValueError):
+                continue
+            if outcome in (CLEAN, CHALLENGED) and observed + self.ttl > now:
+                self._outcomes.set(host, (outcome, observed), expires=observed + self.ttl)
+
+    def save(self) -> None:
+        """Atomically write the profile file."""
+        if not self.path:
+            return
+        data: Dict[str, Dict[str, list]] = {
+            "hosts": {host: list(entry) for host, entry in self._outcomes.items().items()}
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with self._save_lock:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".cf-ares-profile-")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
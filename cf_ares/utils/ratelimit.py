@@ -0,0 +1,301 @@
+"""
+Per-host rate limiting for CF-Ares.
+
+Every host gets a request schedule (a GCRA token bucket: a sustained rate
+with a burst allowance) and a cap on in-flight requests. Schedules live in a
+SessionStore, so processes sharing a SQLite or Redis store share one budget
+per host. Rates back off multiplicatively when the server answers 429 or 503
+and recover additively on success.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from cf_ares.utils.detection import _header, is_challenge
+from cf_ares.utils.domain import candidate_scopes
+from cf_ares.utils.retry import REFUSED_STATUS_CODES, parse_retry_after
+from cf_ares.utils.store import MemorySessionStore, SessionStore
+
+
+class RateLimit:
+    """Limits applied to one host or domain."""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: int = 1,
+        concurrency: Optional[int] = None,
+    ):
+        """
+        Initialize the limits.
+
+        Args:
+            rate: Sustained requests per second. None means unlimited.
+            burst: Number of requests that may be sent back to back.
+            concurrency: Maximum number of requests in flight. None means unlimited.
+        """
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        if concurrency is not None and concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+
+    def __repr__(self) -> str:
+        return f"RateLimit(rate={self.rate}, burst={self.burst}, concurrency={self.concurrency})"
+
+
+class RateLimiter:
+    """
+    Per-host request rate and concurrency limiter for synchronous clients.
+
+    Limits are looked up like sessions: a key "api.example.com" applies to
+    that host only and is tracked for it alone, while ".example.com" applies
+    to example.com and all of its subdomains, which then share one budget.
+    Hosts without a matching key use the default limit, tracked per host.
+    """
+
+    def __init__(
+        self,
+        default: Optional[RateLimit] = None,
+        hosts: Optional[Dict[str, RateLimit]] = None,
+        store: Optional[SessionStore] = None,
+        min_factor: float = 1 / 16,
+        recovery: float = 0.05,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            default: Limit for hosts without their own entry. None leaves them unlimited.
+            hosts: Limits by host ("api.example.com") or domain (".example.com").
+            store: Store holding the request schedules. Pass the session store
+                shared with other processes to share each host's rate with them.
+                Defaults to a per-process store. Concurrency caps and adaptive
+                slowdown are always per process.
+            min_factor: Lowest fraction of the configured rate that 429/503
+                responses can slow a host down to.
+            recovery: Fraction of the configured rate regained after each
+                successful response.
+        """
+        self.default = default
+        self.hosts = {key.lower(): limit for key, limit in (hosts or {}).items()}
+        self.store = store if store is not None else MemorySessionStore()
+        self.min_factor = min_factor
+        self.recovery = recovery
+        self._lock = threading.Lock()
+        # Budget key -> fraction of the configured rate currently allowed
+        self._factors: Dict[str, float] = {}
+        self._slots: Dict[str, Any] = {}
+
+    def resolve(self, host: str) -> Tuple[Optional[str], Optional[RateLimit]]:
+        """
+        Find the limit applying to a host.
+
+        Args:
+            host: Normalised host.
+
+        Returns:
+            Tuple[Optional[str], Optional[RateLimit]]: Key its budget is tracked
+                under and the limit, or (None, None) if the host is unlimited.
+        """
+        if self.hosts:
+            for scope in candidate_scopes(host):
+                limit = self.hosts.get(scope)
+                if limit is not None:
+                    return scope, limit
+        if self.default is not None:
+            return host, self.default
+        return None, None
+
+    def factor(self, key: str) -> float:
+        """
+        Get the fraction of the configured rate currently allowed for a budget.
+
+        Args:
+            key: Budget key returned by resolve().
+
+        Returns:
+            float: Factor between min_factor and 1.
+        """
+        return self._factors.get(key, 1.0)
+
+    def _delay(self, key: str, limit: RateLimit) -> float:
+        """
+        Reserve the next request slot of a budget.
+
+        Args:
+            key: Budget key.
+            limit: Limit of the budget.
+
+        Returns:
+            float: Seconds to wait before sending.
+        """
+        if limit.rate is None:
+            return 0.0
+        interval = 1.0 / (limit.rate * self.factor(key))
+        return self.store.reserve(f"ratelimit:{key}", interval, limit.burst)
+
+    def _slot(self, key: str, concurrency: int) -> threading.BoundedSemaphore:
+        """
+        Get the in-flight semaphore of a budget.
+
+        Args:
+            key: Budget key.
+            concurrency: Concurrency cap of the budget.
+
+        Returns:
+            threading.BoundedSemaphore: Semaphore.
+        """
+        slot: Optional[threading.BoundedSemaphore] = self._slots.get(key)
+        if slot is None:
+            with self._lock:
+                slot = self._slots.setdefault(key, threading.BoundedSemaphore(concurrency))
+        return slot
+
+    @contextmanager
+    def limit(self, host: str) -> Iterator[None]:
+        """
+        Hold a request slot for a host, blocking until one is free.
+
+        Args:
+            host: Normalised host.
+        """
+        key, limit = self.resolve(host)
+        if key is None or limit is None:
+            yield
+            return
+        if limit.concurrency is None:
+            time.sleep(self._delay(key, limit))
+            yield
+            return
+        with self._slot(key, limit.concurrency):
+            time.sleep(self._delay(key, limit))
+            yield
+
+    def feedback(self, host: str, response: Any) -> None:
+        """
+        Adapt a host's rate to a response.
+
+        429 and 503 halve the rate and push the host's schedule back by the
+        response's Retry-After; other responses let it recover. Cloudflare
+        challenges are not a sign of overload and are ignored.
+
+        Args:
+            host: Normalised host.
+            response: Response with status_code and headers.
+        """
+        key, limit = self.resolve(host)
+        if key is None or limit is None or limit.rate is None:
+            return
+        status = getattr(response, "status_code", None)
+        if status in REFUSED_STATUS_CODES and is_challenge(response):
+            return
+        with self._lock:
+            factor = self._factors.get(key, 1.0)
+            if status in REFUSED_STATUS_CODES:
+                factor = max(factor / 2, self.min_factor)
+            elif factor < 1.0:
+                factor = min(factor + self.recovery, 1.0)
+            else:
+                return
+            if factor < 1.0:
+                self._factors[key] = factor
+            else:
+                self._factors.pop(key, None)
+        if status in REFUSED_STATUS_CODES:
+            retry_after = parse_retry_after(_header(getattr(response, "headers", None), "retry-after"))
+            if retry_after:
+                # A slot as long as the requested pause holds everyone sharing the schedule
+                self.store.reserve(f"ratelimit:{key}", retry_after, 1)
+
+
+class AsyncRateLimiter(RateLimiter):
+    """
+    Per-host request rate and concurrency limiter for asyncio clients.
+    Waits with asyncio.sleep and caps concurrency with asyncio semaphores, so
+    throttled requests never block the event loop. Schedules in a shared
+    store are reserved in the default executor.
+    """
+
+    def _offloaded(self) -> bool:
+        """
+        Check whether store calls must leave the event loop.
+
+        Returns:
+            bool: True for stores that reserve over SQLite or the network.
+        """
+        return not isinstance(self.store, MemorySessionStore)
+
+    async def _adelay(self, key: str, limit: RateLimit) -> float:
+        """
+        Reserve the next request slot of a budget without blocking the event loop.
+
+        Args:
+            key: Budget key.
+            limit: Limit of the budget.
+
+        Returns:
+            float: Seconds to wait before sending.
+        """
+        if limit.rate is None or not self._offloaded():
+            return self._delay(key, limit)
+        return await asyncio.get_running_loop().run_in_executor(None, self._delay, key, limit)
+
+    async def afeedback(self, host: str, response: Any) -> None:
+        """
+        Adapt a host's rate to a response without blocking the event loop.
+
+        See feedback(). A refusal with Retry-After updates the shared schedule,
+        which happens in the default executor.
+
+        Args:
+            host: Normalised host.
+            response: Response with status_code and headers.
+        """
+        if getattr(response, "status_code", None) in REFUSED_STATUS_CODES and self._offloaded():
+            await asyncio.get_running_loop().run_in_executor(None, self.feedback, host, response)
+        else:
+            self.feedback(host, response)
+
+    def _slot(self, key: str, concurrency: int) -> asyncio.Semaphore:  # type: ignore[override]
+        """
+        Get the in-flight semaphore of a budget.
+
+        Args:
+            key: Budget key.
+            concurrency: Concurrency cap of the budget.
+
+        Returns:
+            asyncio.Semaphore: Semaphore.
+        """
+        slot: Optional[asyncio.Semaphore] = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = asyncio.Semaphore(concurrency)
+        return slot
+
+    @asynccontextmanager
+    async def limit(self, host: str) -> AsyncIterator[None]:  # type: ignore[override]
+        """
+        Hold a request slot for a host, waiting until one is free.
+
+        Args:
+            host: Normalised host.
+        """
+        key, limit = self.resolve(host)
+        if key is None or limit is None:
+            yield
+            return
+        if limit.concurrency is None:
+            await asyncio.sleep(await self._adelay(key, limit))
+            yield
+            return
+        async with self._slot(key, limit.concurrency):
+            await asyncio.sleep(await self._adelay(key, limit))
+            yield
@@ -0,0 +1,273 @@
+"""
+Background session refresh for CF-Ares.
+
+Re-solves a domain's challenge shortly before its session expires, so
+foreground requests keep using the old session and never block on a solve.
+"""
+
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Dict, Optional, Set
+from urllib.parse import urlparse
+
+from cf_ares.utils.detection import is_challenge_response
+
+if TYPE_CHECKING:
+    from cf_ares.client import AresClient
+    from cf_ares.engines.curl import CurlEngine
+
+# Minimum seconds between background solves of one domain, also used to back
+# off after a failed solve
+RETRY_DELAY = 30.0
+
+# Seconds a refresher holds the store lease on a domain once it starts
+# re-solving it; covers the solve and keeps other workers from repeating it
+LEASE_TTL = 300.0
+
+
+class SessionRefresher:
+    """
+    Daemon thread that keeps tracked sessions of an AresClient fresh.
+    Solves go through the client's single-flight group, so a foreground
+    request that finds the session expired joins the background solve instead
+    of starting another one.
+
+    The client tracks the sessions it solved itself, not those it picked up
+    from a shared store. Before re-solving, the refresher takes a lease on the
+    domain in the session store, so when several workers track the same
+    domain only one of them solves it and the others receive the new session
+    through the store. A session nobody requested since it was last solved is
+    left to expire instead of being refreshed.
+    """
+
+    def __init__(
+        self,
+        client: "AresClient",
+        refresh_ahead: float = 120.0,
+        probe_interval: Optional[float] = None,
+    ):
+        """
+        Initialize the refresher.
+
+        Args:
+            client: Client whose sessions to refresh.
+            refresh_ahead: Seconds before a session expires at which to re-solve.
+            probe_interval: Seconds between liveness probes of each tracked
+                session. A probe sends a HEAD request with the session and
+                re-solves at once if Cloudflare challenges it (answers with
+                cf-mitigated: challenge). None disables probing.
+        """
+        self.client = client
+        self.refresh_ahead = refresh_ahead
+        self.probe_interval = probe_interval
+        self.refreshes = 0
+        self.failures = 0
+
+        self._lock = threading.Lock()
+        # Session key -> URL to re-solve
+        self._tracked: Dict[str, str] = {}
+        self._retry_at: Dict[str, float] = {}
+        self._probed_at: Dict[str, float] = {}
+        # Tracked keys used by a foreground request since they were last solved
+        self._used: Set[str] = set()
+        # Identifies this refresher's leases in a shared store
+        self._owner = uuid.uuid4().hex
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._probe_engine: Optional["CurlEngine"] = None
+
+    def start(self) -> None:
+        """Start the background thread."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="cf-ares-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread, waiting for a running solve to finish."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._probe_engine is not None:
+            self._probe_engine.close()
+            self._probe_engine = None
+
+    def track(self, url: str) -> None:
+        """
+        Keep the session for a URL's domain fresh.
+
+        Args:
+            url: URL to re-solve when the session nears expiry.
+        """
+        key = self.client._session_manager.session_key(url)
+        with self._lock:
+            self._tracked[key] = url
+            self._retry_at.pop(key, None)
+            self._used.add(key)
+        self._wakeup.set()
+
+    def touch(self, url: str) -> None:
+        """
+        Record a foreground request, so its session is worth refreshing.
+
+        Args:
+            url: URL being requested.
+        """
+        key = self.client._session_manager.session_key(url)
+        if key in self._tracked and key not in self._used:
+            with self._lock:
+                if key in self._tracked:
+                    self._used.add(key)
+
+    def untrack(self, url: str) -> None:
+        """
+        Stop refreshing the session for a URL's domain.
+
+        Args:
+            url: URL whose domain to stop tracking.
+        """
+        key = self.client._session_manager.session_key(url)
+        with self._lock:
+            self._tracked.pop(key, None)
+            self._retry_at.pop(key, None)
+            self._probed_at.pop(key, None)
+            self._used.discard(key)
+
+    def _run(self) -> None:
+        """Refresh loop: sleep until the next session is due, then refresh it."""
+        while not self._stopped.is_set():
+            delay = self._tick()
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+
+    def _tick(self) -> float:
+        """
+        Refresh or probe every tracked session that is due.
+
+        Returns:
+            float: Seconds until the next session is due.
+        """
+        manager = self.client._session_manager
+        with self._lock:
+            tracked = list(self._tracked.items())
+
+        next_due = 60.0
+        for key, url in tracked:
+            if self._stopped.is_set():
+                break
+            now = time.time()
+            expiry = manager.get_expiry(url)
+            if expiry is None:
+                # Expired without a refresh; the next request solves it again
+                self.untrack(url)
+                continue
+
+            due = max(expiry - self.refresh_ahead, self._retry_at.get(key, 0.0))
+            if due <= now or (self._probe_due(key, now) and not self._probe(url, key)):
+                if key in self._used:
+                    self._refresh(url, key)
+                else:
+                    # Idle since the last solve; the next request solves it again
+                    self.untrack(url)
+                continue
+            next_due = min(next_due, due - now)
+            if self.probe_interval is not None:
+                next_due = min(next_due, self._probed_at[key] + self.probe_interval - now)
+
+        return max(next_due, 0.0)
+
+    def _probe_due(self, key: str, now: float) -> bool:
+        """
+        Check whether a session should be probed now.
+
+        Args:
+            key: Session key.
+            now: Current time.
+
+        Returns:
+            bool: True if probing is enabled and the last probe is old enough.
+        """
+        if self.probe_interval is None:
+            return False
+        last = self._probed_at.setdefault(key, now)
+        return now - last >= self.probe_interval
+
+    def _probe(self, url: str, key: str) -> bool:
+        """
+        Check that Cloudflare still accepts a session.
+
+        The probe runs on its own curl handle so it never shares one with a
+        foreground request. Only a response marked cf-mitigated: challenge
+        counts: a 403 or 503 the origin answers HEAD with, even through
+        Cloudflare, says nothing about the session.
+
+        Args:
+            url: URL to probe.
+            key: Session key.
+
+        Returns:
+            bool: False if the session was challenged, True otherwise.
+        """
+        from cf_ares.engines.curl import CurlEngine
+
+        self._probed_at[key] = time.time()
+        record = self.client._session_manager.get(url)
+        if record is None:
+            return False
+
+        if self._probe_engine is None:
+            self._probe_engine = CurlEngine(
+                proxy=self.client.proxy,
+                timeout=self.client.timeout,
+                fingerprint=self.client.fingerprint,
+            )
+        host = urlparse(url).hostname
+        self._probe_engine.set_cookies(record["cookies"], domain=host)
+        self._probe_engine.set_headers(record["headers"], domain=host)
+        try:
+            response = self._probe_engine.request("HEAD", url)
+        except Exception:
+            # Network trouble is not evidence of a revoked session
+            return True
+        # Without a body, only cf-mitigated marks a challenge
+        return not is_challenge_response(response.status_code, response.headers)
+
+    def _refresh(self, url: str, key: str) -> None:
+        """
+        Re-solve a session in the background.
+
+        Args:
+            url: URL to solve.
+            key: Session key.
+        """
+        client = self.client
+        try:
+            if not client._session_manager.store.lease(f"refresh:{key}", self._owner, LEASE_TTL):
+                # Another worker is refreshing it; the new session arrives through the store
+                self._retry_at[key] = time.time() + RETRY_DELAY
+                return
+            # The browser still holds the current clearance and would not be
+            # challenged again, so the solve starts from a clean cookie jar
+            client._solve_flight.do(key, lambda: client._handle_cloudflare(url, fresh=True))
+        except Exception as e:
+            self.failures += 1
+            self._retry_at[key] = time.time() + RETRY_DELAY
+            if client.debug:
+                print(f"后台刷新会话失败 ({key}): {e}")
+            return
+
+        self.refreshes += 1
+        now = time.time()
+        with self._lock:
+            # Refreshed again only if a request uses it in the meantime
+            self._used.discard(key)
+        # Sessions that come back already inside refresh_ahead are not re-solved in a loop
+        self._retry_at[key] = now + RETRY_DELAY
+        self._probed_at[key] = now
+        if client.debug:
+            print(f"后台刷新会话完成: {key}")
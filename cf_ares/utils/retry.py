@@ -0,0 +1,406 @@
+"""
+Retry policy for CF-Ares.
+
+Failures are classified by curl error code and HTTP status rather than by
+message text. Retries back off exponentially with full jitter, honour
+Retry-After, and draw from a per-host budget so a struggling host sees a
+bounded fraction of extra traffic instead of a retry storm.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from cf_ares.exceptions import BrowserError, CloudflareChallengeFailed, CloudflareError
+from cf_ares.utils.detection import _header, is_challenge
+
+T = TypeVar("T")
+
+# curl errors raised before the request reached the server; safe for any method
+CONNECT_CURL_CODES = frozenset({
+    5,   # COULDNT_RESOLVE_PROXY
+    6,   # COULDNT_RESOLVE_HOST
+    7,   # COULDNT_CONNECT
+    35,  # SSL_CONNECT_ERROR
+})
+
+# curl errors raised mid-transfer; the server may have seen the request
+TRANSFER_CURL_CODES = frozenset({
+    16,  # HTTP2
+    18,  # PARTIAL_FILE
+    28,  # OPERATION_TIMEDOUT
+    52,  # GOT_NOTHING
+    55,  # SEND_ERROR
+    56,  # RECV_ERROR
+    92,  # HTTP2_STREAM
+})
+
+# Statuses with which the server refused the request without processing it
+REFUSED_STATUS_CODES = frozenset({429, 503})
+
+# Gateway statuses; the origin may have processed the request
+GATEWAY_STATUS_CODES = frozenset({502, 504})
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+
+# Browser solve failures worth another attempt
+SOLVE_ERRORS = (BrowserError, CloudflareError, CloudflareChallengeFailed)
+
+
+def curl_error_code(error: BaseException) -> Optional[int]:
+    """
+    Find the curl error code behind an exception.
+
+    Engine errors wrap curl_cffi exceptions, so the cause chain is searched.
+
+    Args:
+        error: Raised exception.
+
+    Returns:
+        Optional[int]: curl error code, or None if the error did not come from curl.
+    """
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        code = getattr(current, "code", None)
+        if isinstance(code, int) and code:
+            return int(code)
+        current = current.__cause__ or current.__context__
+    return None
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP-date.
+        now: Current time for HTTP-dates. Defaults to time.time().
+
+    Returns:
+        Optional[float]: Seconds to wait (never negative), or None if absent or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(when.timestamp() - (time.time() if now is None else now), 0.0)
+
+
+class RetryBudget:
+    """
+    Per-host retry allowance.
+    Every request deposits ratio tokens and every retry withdraws one, so
+    once a host's reserve is spent retries make up at most ratio of its
+    traffic. Buckets start full and are capped at max_tokens.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10.0, max_hosts: int = 10000):
+        """
+        Initialize the budget.
+
+        Args:
+            ratio: Retry tokens earned per request.
+            max_tokens: Reserve of retries a host starts with and can save up.
+            max_hosts: Maximum number of hosts tracked; the least recently
+                seen are forgotten first.
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.max_hosts = max_hosts
+        self._lock = threading.Lock()
+        self._tokens: "OrderedDict[str, float]" = OrderedDict()
+
+    def _balance(self, host: str) -> float:
+        """
+        Get a host's balance and mark it as recently seen. Must be called with the lock held.
+
+        Args:
+            host: Normalised host.
+
+        Returns:
+            float: Current tokens.
+        """
+        tokens = self._tokens.pop(host, self.max_tokens)
+        self._tokens[host] = tokens
+        while len(self._tokens) > self.max_hosts:
+            self._tokens.popitem(last=False)
+        return tokens
+
+    def deposit(self, host: str) -> None:
+        """
+        Record a request to a host.
+
+        Args:
+            host: Normalised host.
+        """
+        with self._lock:
+            self._tokens[host] = min(self._balance(host) + self.ratio, self.max_tokens)
+
+    def withdraw(self, host: str) -> bool:
+        """
+        Take a retry from a host's budget.
+
+        Args:
+            host: Normalised host.
+
+        Returns:
+            bool: True if the retry may go ahead.
+        """
+        with self._lock:
+            tokens = self._balance(host)
+            if tokens < 1.0:
+                return False
+            self._tokens[host] = tokens - 1.0
+            return True
+
+    def tokens(self, host: str) -> float:
+        """
+        Get the retries currently available for a host.
+
+        Args:
+            host: Normalised host.
+
+        Returns:
+            float: Remaining tokens.
+        """
+        with self._lock:
+            return self._tokens.get(host, self.max_tokens)
+
+
+class RetryPolicy:
+    """
+    Decides whether and when to retry a request or a challenge solve.
+
+    Connection failures are retried for every method. Timeouts, broken
+    transfers and 502/504 are only retried for idempotent methods, since the
+    server may already have acted on the request. 429 and 503 are retried
+    for every method after their Retry-After delay, unless they are a
+    Cloudflare challenge, which needs a solve rather than a retry.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_max: float = 30.0,
+        jitter: bool = True,
+        max_retry_after: float = 60.0,
+        budget: Optional[RetryBudget] = None,
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            max_retries: Maximum number of retries after the first attempt.
+            backoff_factor: Base delay in seconds; retry n waits up to
+                backoff_factor * 2 ** n.
+            backoff_max: Upper bound for the backoff delay.
+            jitter: Draw each delay uniformly from [0, backoff] ("full jitter")
+                so clients that failed together do not retry together.
+            max_retry_after: Longest Retry-After to wait for. Responses asking
+                for more are returned instead of retried.
+            budget: Per-host retry budget. Defaults to RetryBudget().
+        """
+        if max_retries < 0:
+            raise ValueError("max_retries must not be negative")
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.max_retry_after = max_retry_after
+        self.budget = budget if budget is not None else RetryBudget()
+
+    def retryable_error(self, error: BaseException, method: Optional[str] = None) -> bool:
+        """
+        Classify an exception.
+
+        Args:
+            error: Raised exception.
+            method: HTTP method, or None for a challenge solve.
+
+        Returns:
+            bool: True if the operation may succeed when repeated.
+        """
+        code = curl_error_code(error)
+        if code is not None:
+            if code in CONNECT_CURL_CODES:
+                return True
+            return code in TRANSFER_CURL_CODES and (method is None or method.upper() in IDEMPOTENT_METHODS)
+        return method is None and isinstance(error, SOLVE_ERRORS)
+
+    def retryable_response(self, response: Any, method: str) -> bool:
+        """
+        Classify a response.
+
+        Args:
+            response: Response with status_code and headers.
+            method: HTTP method.
+
+        Returns:
+            bool: True if the request should be sent again.
+        """
+        status = getattr(response, "status_code", None)
+        if status in GATEWAY_STATUS_CODES:
+            return method.upper() in IDEMPOTENT_METHODS
+        return status in REFUSED_STATUS_CODES and not is_challenge(response)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Get the delay before a retry.
+
+        Args:
+            attempt: Zero-based retry number.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        ceiling = min(self.backoff_max, self.backoff_factor * (2 ** attempt))
+        return random.uniform(0.0, ceiling) if self.jitter else ceiling
+
+    def _next_delay(
+        self,
+        host: str,
+        method: Optional[str],
+        attempt: int,
+        max_retries: int,
+        result: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> Optional[float]:
+        """
+        Decide whether to retry after an attempt.
+
+        Args:
+            host: Normalised host the budget is charged to.
+            method: HTTP method, or None for a challenge solve.
+            attempt: Zero-based number of the retry that would follow.
+            max_retries: Retry limit for this call.
+            result: Result of the attempt, if it returned.
+            error: Exception of the attempt, if it raised.
+
+        Returns:
+            Optional[float]: Seconds to wait before retrying, or None to stop.
+        """
+        if attempt >= max_retries:
+            return None
+        if error is not None:
+            if not self.retryable_error(error, method):
+                return None
+            delay = self.backoff(attempt)
+        else:
+            if method is None or not self.retryable_response(result, method):
+                return None
+            retry_after = parse_retry_after(_header(getattr(result, "headers", None), "retry-after"))
+            if retry_after is None:
+                delay = self.backoff(attempt)
+            elif retry_after <= self.max_retry_after:
+                delay = retry_after
+            else:
+                return None
+        if not self.budget.withdraw(host):
+            return None
+        return delay
+
+    def run(
+        self,
+        func: Callable[[], T],
+        host: str,
+        method: Optional[str] = None,
+        max_retries: Optional[int] = None,
+        on_retry: Optional[Callable[[int, float, Any], None]] = None,
+    ) -> T:
+        """
+        Call func, retrying retryable failures.
+
+        Args:
+            func: Operation to run. Its result is classified as a response when
+                method is given.
+            host: Normalised host the retries are charged to.
+            method: HTTP method, or None for a challenge solve.
+            max_retries: Override the policy's retry limit for this call.
+            on_retry: Called with the retry number, the delay and the failed
+                result or exception before each retry.
+
+        Returns:
+            T: Result of the last attempt.
+
+        Raises:
+            Exception: The last attempt's exception if it was not retried.
+        """
+        limit = self.max_retries if max_retries is None else max_retries
+        self.budget.deposit(host)
+        attempt = 0
+        while True:
+            try:
+                result = func()
+            except Exception as e:
+                delay = self._next_delay(host, method, attempt, limit, error=e)
+                if delay is None:
+                    raise
+                outcome: Any = e
+            else:
+                delay = self._next_delay(host, method, attempt, limit, result=result)
+                if delay is None:
+                    return result
+                outcome = result
+            attempt += 1
+            if on_retry is not None:
+                on_retry(attempt, delay, outcome)
+            time.sleep(delay)
+
+    async def arun(
+        self,
+        func: Callable[[], Awaitable[T]],
+        host: str,
+        method: Optional[str] = None,
+        max_retries: Optional[int] = None,
+        on_retry: Optional[Callable[[int, float, Any], None]] = None,
+    ) -> T:
+        """
+        Await func, retrying retryable failures without blocking the event loop.
+
+        Args:
+            func: Coroutine function to run.
+            host: Normalised host the retries are charged to.
+            method: HTTP method, or None for a challenge solve.
+            max_retries: Override the policy's retry limit for this call.
+            on_retry: Called before each retry, see run().
+
+        Returns:
+            T: Result of the last attempt.
+
+        Raises:
+            Exception: The last attempt's exception if it was not retried.
+        """
+        limit = self.max_retries if max_retries is None else max_retries
+        self.budget.deposit(host)
+        attempt = 0
+        while True:
+            try:
+                result = await func()
+            except Exception as e:
+                delay = self._next_delay(host, method, attempt, limit, error=e)
+                if delay is None:
+                    raise
+                outcome: Any = e
+            else:
+                delay = self._next_delay(host, method, attempt, limit, result=result)
+                if delay is None:
+                    return result
+                outcome = result
+            attempt += 1
+            if on_retry is not None:
+                on_retry(attempt, delay, outcome)
+            await asyncio.sleep(delay)
@@ -2,26 +2,329 @@
 Session management utilities for CF-Ares.
 """
 
+import asyncio
 import time
-from typing import Dict, Optional
-from urllib.parse import urlparse
+from typing import Any, Dict, Iterator, Mapping, Optional, Sequence
+
+from cf_ares.utils.domain import (
+    DomainIndex,
+    candidate_scopes,
+    cookie_scope,
+    normalize_host,
+)
+from cf_ares.utils.lru import StripedLRU
+from cf_ares.utils.store import MemorySessionStore, SessionStore
+
+# Cookies whose expiry bounds a Cloudflare session
+DEFAULT_EXPIRY_COOKIES = ("cf_clearance",)
+
+DEFAULT_MAX_SESSIONS = 10000
+
+
+class SessionRecord(Mapping[str, Any]):
+    """
+    Compact session record.
+    A read-only mapping (record["cookies"], record.get(...), dict(record)) so
+    it can be used wherever a session dict is expected.
+    """
+
+    __slots__ = ("cookies", "headers", "timestamp", "cookie_expiry", "cookie_domains")
+
+    def __init__(
+        self,
+        cookies: Dict[str, str],
+        headers: Dict[str, str],
+        timestamp: Optional[float] = None,
+        cookie_expiry: Optional[Dict[str, float]] = None,
+        cookie_domains: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Initialize the record.
+
+        Args:
+            cookies: Session cookies.
+            headers: Session headers.
+            timestamp: Time the session was obtained. Defaults to now.
+            cookie_expiry: Unix expiry time by cookie name.
+            cookie_domains: Cookie Domain attribute by cookie name.
+        """
+        self.cookies = cookies
+        self.headers = headers
+        self.timestamp = time.time() if timestamp is None else timestamp
+        # Empty metadata is stored as None to keep records small
+        self.cookie_expiry = dict(cookie_expiry) if cookie_expiry else None
+        self.cookie_domains = dict(cookie_domains) if cookie_domains else None
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "SessionRecord":
+        """
+        Build a record from its dict form, e.g. as read from a shared store.
+
+        Args:
+            data: Session dict.
+
+        Returns:
+            SessionRecord: Record.
+        """
+        if isinstance(data, cls):
+            return data
+        return cls(
+            data.get("cookies") or {},
+            data.get("headers") or {},
+            data.get("timestamp"),
+            data.get("cookie_expiry"),
+            data.get("cookie_domains"),
+        )
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self.__slots__:
+            raise KeyError(name)
+        value = getattr(self, name)
+        if value is None and name in ("cookie_expiry", "cookie_domains"):
+            return {}
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the dict form of the record.
+
+        Returns:
+            Dict[str, Any]: Session dict.
+        """
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return f"<SessionRecord cookies={list(self.cookies)} timestamp={self.timestamp:.0f}>"
 
 
 class SessionManager:
     """
     Manages session information for different domains.
     Handles cookies, headers, and session validity.
+
+    A session stays valid until the earliest expiry of its clearance cookies,
+    minus a safety margin. Sessions without cookie expiry information fall
+    back to a fixed TTL.
+
+    Sessions are keyed by the scope of their clearance cookie, so a session
+    solved on example.com with a ".example.com" cookie also serves
+    www.example.com and api.example.com. A reverse-label index finds the
+    session covering a host without scanning all domains.
+
+    Records live in a SessionStore, which may be shared with other processes.
+    Records read from the store are cached locally and kept up to date through
+    the store's change notifications, so the store is only consulted for
+    domains this manager has no valid session for.
+
+    The local cache holds at most max_sessions records: expired records are
+    purged through a per-stripe expiry heap and the least recently used ones
+    are evicted when it is full. It is lock-striped, so concurrent lookups and
+    updates for different domains do not contend.
     """
 
-    def __init__(self, session_ttl: int = 3600):
+    def __init__(
+        self,
+        session_ttl: int = 3600,
+        store: Optional[SessionStore] = None,
+        expiry_cookies: Optional[Sequence[str]] = DEFAULT_EXPIRY_COOKIES,
+        expiry_margin: float = 60.0,
+        max_sessions: Optional[int] = DEFAULT_MAX_SESSIONS,
+    ):
         """
         Initialize the session manager.
 
         Args:
-            session_ttl: Time-to-live for sessions in seconds.
+            session_ttl: Time-to-live in seconds for sessions without cookie expiry.
+            store: Backend holding the sessions. Defaults to an in-memory store.
+            expiry_cookies: Names of the cookies whose expiry bounds a session.
+                None uses every cookie that has an expiry.
+            expiry_margin: Seconds before the cookie expiry at which a session
+                is no longer considered valid.
+            max_sessions: Maximum number of sessions kept in memory, by this
+                manager and by the default in-memory store. None means unbounded.
         """
-        self.sessions: Dict[str, Dict] = {}
         self.session_ttl = session_ttl
+        self.expiry_cookies = expiry_cookies
+        self.expiry_margin = expiry_margin
+        self.max_sessions = max_sessions
+        self.store = store if store is not None else MemorySessionStore(max_entries=max_sessions)
+        self._index = DomainIndex()
+        # Scope -> record, for scopes known to this manager; expires when the
+        # session stops being valid
+        self._cache: StripedLRU[SessionRecord] = StripedLRU(
+            max_sessions, on_remove=self._index.remove
+        )
+        self._following = False
+        self.open()
+
+    @property
+    def sessions(self) -> Dict[str, Mapping[str, Any]]:
+        """
+        Get all stored sessions.
+
+        Returns:
+            Dict[str, Mapping[str, Any]]: Session records by scope. Scopes with a
+                leading dot cover the domain and all of its subdomains.
+        """
+        return self.store.items()
+
+    def _remember(self, scope: str, record: Mapping[str, Any]) -> SessionRecord:
+        """
+        Cache a record and index its scope.
+
+        Args:
+            scope: Session scope.
+            record: Session record or its dict form.
+
+        Returns:
+            SessionRecord: Cached record.
+        """
+        cached = SessionRecord.from_dict(record)
+        self._index.add(scope)
+        self._cache.set(scope, cached, expires=self._valid_until(cached))
+        return cached
+
+    def _forget(self, scope: str) -> None:
+        """
+        Drop a record from the cache and the index.
+
+        Args:
+            scope: Session scope.
+        """
+        if self._cache.delete(scope) is not None:
+            self._index.remove(scope)
+
+    def _on_change(self, scope: str, record: Optional[Mapping[str, Any]]) -> None:
+        """
+        Keep the local cache in sync with the store.
+
+        Args:
+            scope: Scope whose session changed.
+            record: New session record, or None if it was removed.
+        """
+        if record is None:
+            self._forget(scope)
+        else:
+            self._remember(scope, record)
+
+    def _valid_until(self, record: Mapping[str, Any]) -> float:
+        """
+        Get the time until which a record counts as valid.
+
+        Args:
+            record: Session record.
+
+        Returns:
+            float: Unix time at which the session stops being valid.
+        """
+        cookie_expiry = record.get("cookie_expiry") or {}
+        if self.expiry_cookies is None:
+            relevant = list(cookie_expiry.values())
+        else:
+            relevant = [cookie_expiry[name] for name in self.expiry_cookies if name in cookie_expiry]
+        if relevant:
+            return float(min(relevant)) - self.expiry_margin
+        return float(record["timestamp"]) + self.session_ttl
+
+    def _is_fresh(self, record: Mapping[str, Any]) -> bool:
+        """
+        Check whether a record is still valid.
+
+        Args:
+            record: Session record.
+
+        Returns:
+            bool: True if the record has not expired.
+        """
+        return time.time() < self._valid_until(record)
+
+    def cached(self, url: str) -> Optional[SessionRecord]:
+        """
+        Get the valid session record for a domain from the local cache only.
+
+        Args:
+            url: URL to get the session for.
+
+        Returns:
+            Optional[SessionRecord]: Record, or None if this manager has no
+                valid session cached for the domain.
+        """
+        for scope in self._index.lookup(self._get_domain(url)):
+            # Cached records expire when they stop being valid
+            record = self._cache.get(scope)
+            if record is not None:
+                return record
+        return None
+
+    def get(self, url: str) -> Optional[SessionRecord]:
+        """
+        Get the valid session record for a domain.
+
+        Args:
+            url: URL to get the session for.
+
+        Returns:
+            Optional[SessionRecord]: Record with cookies, headers and timestamp,
+                or None if no valid session exists.
+        """
+        record = self.cached(url)
+        if record is not None:
+            return record
+
+        # Another process may have solved this host or a parent domain already
+        host = self._get_domain(url)
+        for scope in candidate_scopes(host):
+            stored = self.store.get(scope)
+            if stored is not None and self._is_fresh(stored):
+                return self._remember(scope, stored)
+        return None
+
+    def _offloaded(self) -> bool:
+        """
+        Check whether store calls must leave the event loop.
+
+        Returns:
+            bool: True for stores that read and write over SQLite or the network.
+        """
+        return not isinstance(self.store, MemorySessionStore)
+
+    async def aget(self, url: str) -> Optional[SessionRecord]:
+        """
+        Get the valid session record for a domain without blocking the event loop.
+
+        The local cache is read in place; a miss that has to consult a shared
+        store runs in the default executor.
+
+        Args:
+            url: URL to get the session for.
+
+        Returns:
+            Optional[SessionRecord]: Record, or None if no valid session exists.
+        """
+        if not self._offloaded():
+            return self.get(url)
+        record = self.cached(url)
+        if record is not None:
+            return record
+        return await asyncio.get_running_loop().run_in_executor(None, self.get, url)
+
+    async def aclear(self, url: Optional[str] = None) -> None:
+        """
+        Clear session information without blocking the event loop.
+
+        Args:
+            url: URL to clear session for. If None, clear all sessions.
+        """
+        if self._offloaded():
+            await asyncio.get_running_loop().run_in_executor(None, self.clear, url)
+        else:
+            self.clear(url)
 
     def _get_domain(self, url: str) -> str:
         """
@@ -31,14 +334,30 @@ class SessionManager:
             url: URL to extract domain from.
 
         Returns:
-            str: Domain name.
+            str: Normalised host, without port.
         """
-        parsed = urlparse(url)
-        return parsed.netloc
+        return normalize_host(url)
+
+    def session_key(self, url: str) -> str:
+        """
+        Get the key a URL's session is stored under.
+
+        Args:
+            url: URL to get the key for.
+
+        Returns:
+            str: Session key.
+        """
+        return self._get_domain(url)
 
     def update(
-        self, url: str, cookies: Dict[str, str], headers: Dict[str, str]
-    ) -> None:
+        self,
+        url: str,
+        cookies: Dict[str, str],
+        headers: Dict[str, str],
+        cookie_expiry: Optional[Dict[str, float]] = None,
+        cookie_domains: Optional[Dict[str, str]] = None,
+    ) -> SessionRecord:
         """
         Update session information for a domain.
 
@@ -46,13 +365,61 @@ class SessionManager:
             url: URL associated with the session.
             cookies: Cookies to store.
             headers: Headers to store.
+            cookie_expiry: Unix expiry time by cookie name, if known.
+            cookie_domains: Cookie Domain attribute by cookie name, if known. A
+                clearance cookie set for ".example.com" makes the session
+                cover example.com and all of its subdomains.
+
+        Returns:
+            SessionRecord: The stored session record.
+        """
+        host = self._get_domain(url)
+        record = SessionRecord(cookies, headers, None, cookie_expiry, cookie_domains)
+        scope = self._scope(host, record)
+        if scope != host and self._cache.get(host) is not None:
+            # The host's own session is superseded by the wider one
+            self._forget(host)
+            self.store.delete(host)
+        self._remember(scope, record)
+        ttl = max(self._valid_until(record) - record["timestamp"], 0.0)
+        self.store.set(scope, record, ttl=ttl)
+        return record
+
+    def _scope(self, host: str, record: SessionRecord) -> str:
+        """
+        Get the scope a record covers.
+
+        A session only covers the hosts all of its clearance cookies are sent
+        to, so the narrowest clearance cookie scope wins.
+
+        Args:
+            host: Host the session was obtained on.
+            record: Session record.
+
+        Returns:
+            str: Session scope.
         """
-        domain = self._get_domain(url)
-        self.sessions[domain] = {
-            "cookies": cookies,
-            "headers": headers,
-            "timestamp": time.time(),
-        }
+        cookie_domains = record.get("cookie_domains") or {}
+        names = cookie_domains if self.expiry_cookies is None else [
+            name for name in self.expiry_cookies if name in cookie_domains
+        ]
+        scopes = [cookie_scope(host, cookie_domains[name]) for name in names]
+        if not scopes:
+            return host
+        return max(scopes, key=lambda scope: (not scope.startswith("."), len(scope)))
+
+    def get_expiry(self, url: str) -> Optional[float]:
+        """
+        Get the time at which a domain's session stops being valid.
+
+        Args:
+            url: URL to get the expiry for.
+
+        Returns:
+            Optional[float]: Unix time, or None if no valid session exists.
+        """
+        record = self.get(url)
+        return self._valid_until(record) if record else None
 
     def get_cookies(self, url: str) -> Optional[Dict[str, str]]:
         """
@@ -64,10 +431,8 @@ class SessionManager:
         Returns:
             Optional[Dict[str, str]]: Cookies or None if no session exists.
         """
-        domain = self._get_domain(url)
-        if domain in self.sessions:
-            return self.sessions[domain]["cookies"]
-        return None
+        record = self.get(url)
+        return record["cookies"] if record else None
 
     def get_headers(self, url: str) -> Optional[Dict[str, str]]:
         """
@@ -79,10 +444,8 @@ class SessionManager:
         Returns:
             Optional[Dict[str, str]]: Headers or None if no session exists.
         """
-        domain = self._get_domain(url)
-        if domain in self.sessions:
-            return self.sessions[domain]["headers"]
-        return None
+        record = self.get(url)
+        return record["headers"] if record else None
 
     def has_valid_session(self, url: str) -> bool:
         """
@@ -94,16 +457,7 @@ class SessionManager:
         Returns:
             bool: True if a valid session exists.
         """
-        domain = self._get_domain(url)
-        if domain not in self.sessions:
-            return False
-
-        # Check if session is expired
-        timestamp = self.sessions[domain]["timestamp"]
-        if time.time() - timestamp > self.session_ttl:
-            return False
-
-        return True
+        return self.get(url) is not None
 
     def clear(self, url: Optional[str] = None) -> None:
         """
@@ -113,8 +467,25 @@ class SessionManager:
             url: URL to clear session for. If None, clear all sessions.
         """
         if url:
-            domain = self._get_domain(url)
-            if domain in self.sessions:
-                del self.sessions[domain]
+            host = self._get_domain(url)
+            for scope in set(self._index.lookup(host)) | {host}:
+                self._forget(scope)
+                self.store.delete(scope)
         else:
-            self.sessions.clear() 
\ No newline at end of file
+            self._cache.clear()
+            self._index.clear()
+            self.store.clear()
+
+    def open(self) -> None:
+        """Start following store changes. Called by __init__, and again after close()."""
+        if not self._following:
+            self._following = True
+            self.store.subscribe(self._on_change)
+
+    def close(self) -> None:
+        """Stop following store changes. The store itself is left open."""
+        if self._following:
+            self._following = False
+            self.store.unsubscribe(self._on_change)
+            self._cache.clear()
+            self._index.clear() 
\ No newline at end of file
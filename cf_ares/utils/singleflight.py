@@ -0,0 +1,139 @@
+"""
+Single-flight call deduplication for CF-Ares.
+
+When several callers need the same expensive result at once (e.g. a challenge
+solve for one domain), only the first caller runs the work; the others wait
+for it and receive the same result or the same exception.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class _Call:
+    """An in-flight call shared by a leader and its followers."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Thread-based single-flight group.
+    Concurrent do() calls with the same key share one execution.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the group."""
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """
+        Run func once for all concurrent callers with the same key.
+
+        Args:
+            key: Deduplication key.
+            func: Callable to run.
+
+        Returns:
+            Any: Result of the shared call.
+
+        Raises:
+            Exception: Whatever the shared call raised, re-raised in every caller.
+        """
+        with self._lock:
+            existing = self._calls.get(key)
+            if existing is None:
+                call = self._calls[key] = _Call()
+
+        if existing is not None:
+            existing.done.wait()
+            if existing.error is not None:
+                raise existing.error
+            return existing.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self, key: str) -> bool:
+        """
+        Check whether a call for a key is currently running.
+
+        Args:
+            key: Deduplication key.
+
+        Returns:
+            bool: True if a call is in flight.
+        """
+        with self._lock:
+            return key in self._calls
+
+
+class AsyncSingleFlight:
+    """
+    asyncio single-flight group.
+    Concurrent do() calls with the same key await one shared task.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the group."""
+        self._calls: Dict[str, "asyncio.Future[Any]"] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await func once for all concurrent callers with the same key.
+
+        Args:
+            key: Deduplication key.
+            func: Coroutine function to run.
+
+        Returns:
+            Any: Result of the shared call.
+
+        Raises:
+            Exception: Whatever the shared call raised, re-raised in every caller.
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        # Shield so one cancelled waiter does not cancel the solve for the others
+        return await asyncio.shield(future)
+
+    def _forget(self, key: str, future: "asyncio.Future[Any]") -> None:
+        """
+        Remove a finished call, unless a newer call already took its key.
+
+        Args:
+            key: Deduplication key.
+            future: Finished call.
+        """
+        if self._calls.get(key) is future:
+            del self._calls[key]
+
+    def in_flight(self, key: str) -> bool:
+        """
+        Check whether a call for a key is currently running.
+
+        Args:
+            key: Deduplication key.
+
+        Returns:
+            bool: True if a call is in flight.
+        """
+        return key in self._calls
@@ -0,0 +1,890 @@
+"""
+Session storage backends for CF-Ares.
+
+A SessionStore holds solved sessions keyed by domain so that several clients,
+processes or hosts can share one challenge solve:
+
+- MemorySessionStore: per-process dict, the default.
+- SQLiteSessionStore: a SQLite database in WAL mode, shared by all processes
+  on one host.
+- RedisSessionStore: any server speaking the Redis protocol, shared by all
+  nodes.
+
+Every backend supports atomic per-domain upserts, per-record expiry and
+change notification through subscribe(). Stores also keep request schedules
+for rate limiting (see reserve()) and leases that let one worker take on a
+job such as a session refresh (see lease()), apart from the session records.
+"""
+
+import json
+import select
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from cf_ares.exceptions import SessionError
+from cf_ares.utils.lru import StripedLRU
+
+# Called with the session key and the new record, or None when it was removed
+SessionListener = Callable[[str, Optional[Mapping[str, Any]]], None]
+
+
+def _schedule(
+    tat: Optional[float], now: float, interval: float, burst: int
+) -> Tuple[float, float]:
+    """
+    Reserve the next slot of a GCRA (virtual scheduling) rate limit.
+
+    Args:
+        tat: Stored theoretical arrival time, or None if there is none.
+        now: Current time.
+        interval: Seconds between requests at the sustained rate.
+        burst: Number of requests that may go back to back.
+
+    Returns:
+        Tuple[float, float]: New theoretical arrival time and seconds to wait for the slot.
+    """
+    tat = now if tat is None or tat < now else tat
+    return tat + interval, max(tat - now - (burst - 1) * interval, 0.0)
+
+
+class SessionStore(ABC):
+    """
+    Abstract session store.
+    Records are mappings with cookies, headers and timestamp; shared backends
+    store them as JSON.
+    """
+
+    def __init__(self) -> None:
+        """Initialize listener bookkeeping."""
+        self._listeners: List[SessionListener] = []
+        self._listeners_lock = threading.Lock()
+        # Serializes starting and stopping the change watcher
+        self._watching_lock = threading.Lock()
+        self._watching = False
+        self._schedules: StripedLRU[float] = StripedLRU()
+        self._schedules_lock = threading.Lock()
+        self._leases: StripedLRU[str] = StripedLRU()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Mapping[str, Any]]:
+        """
+        Get an unexpired record.
+
+        Args:
+            key: Session key (domain).
+
+        Returns:
+            Optional[Mapping[str, Any]]: Record, or None if missing or expired.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key: str, record: Mapping[str, Any], ttl: Optional[float] = None) -> None:
+        """
+        Atomically insert or replace a record.
+
+        Args:
+            key: Session key (domain).
+            record: Session record.
+            ttl: Seconds until the record expires. None keeps it indefinitely.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Remove a record.
+
+        Args:
+            key: Session key (domain).
+        """
+        pass
+
+    @abstractmethod
+    def keys(self) -> List[str]:
+        """
+        List the keys of all unexpired records.
+
+        Returns:
+            List[str]: Session keys.
+        """
+        pass
+
+    def items(self) -> Dict[str, Mapping[str, Any]]:
+        """
+        Get all unexpired records.
+
+        Returns:
+            Dict[str, Mapping[str, Any]]: Records by key.
+        """
+        result = {}
+        for key in self.keys():
+            record = self.get(key)
+            if record is not None:
+                result[key] = record
+        return result
+
+    def clear(self) -> None:
+        """Remove all records."""
+        for key in self.keys():
+            self.delete(key)
+
+    def reserve(self, key: str, interval: float, burst: int = 1) -> float:
+        """
+        Atomically reserve a request slot on a shared schedule.
+
+        Slots are handed out interval seconds apart, allowing up to burst
+        requests back to back. Schedules are kept apart from session records.
+        The base implementation is per process; shared backends coordinate
+        every process using the store.
+
+        Args:
+            key: Schedule key.
+            interval: Seconds between requests at the sustained rate.
+            burst: Number of requests that may go back to back.
+
+        Returns:
+            float: Seconds the caller must wait before sending.
+        """
+        with self._schedules_lock:
+            tat, wait = _schedule(self._schedules.get(key), time.time(), interval, burst)
+            # Once the arrival time has passed the schedule is idle and can be dropped
+            self._schedules.set(key, tat, expires=tat)
+        return wait
+
+    def lease(self, key: str, owner: str, ttl: float) -> bool:
+        """
+        Atomically claim a lease unless another owner holds it.
+
+        Leases are kept apart from session records and schedules. Claiming a
+        lease the owner already holds succeeds without extending it. The base
+        implementation is per process; shared backends coordinate every
+        process using the store.
+
+        Args:
+            key: Lease key.
+            owner: Identifier of the claimant.
+            ttl: Seconds the lease lasts once claimed.
+
+        Returns:
+            bool: True if owner holds the lease.
+        """
+        with self._schedules_lock:
+            holder = self._leases.get(key)
+            if holder is None:
+                self._leases.set(key, owner, expires=time.time() + ttl)
+                return True
+        return holder == owner
+
+    def subscribe(self, listener: SessionListener) -> None:
+        """
+        Register a callback for record changes.
+
+        Shared backends deliver changes made by any process, including this
+        one, from a background thread that runs while there are listeners.
+
+        Args:
+            listener: Called with the key and the new record (None if removed).
+        """
+        with self._listeners_lock:
+            self._listeners.append(listener)
+        self._update_watching()
+
+    def unsubscribe(self, listener: SessionListener) -> None:
+        """
+        Remove a callback registered with subscribe().
+
+        Args:
+            listener: Callback to remove.
+        """
+        with self._listeners_lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+        self._update_watching()
+
+    def _update_watching(self, closing: bool = False) -> None:
+        """
+        Start the change watcher for the first listener and stop it after the last.
+
+        Args:
+            closing: Stop the watcher regardless of listeners, as the store is closing.
+        """
+        with self._watching_lock:
+            with self._listeners_lock:
+                wanted = bool(self._listeners) and not closing
+            if wanted and not self._watching:
+                self._start_watching()
+                self._watching = True
+            elif not wanted and self._watching:
+                self._stop_watching()
+                self._watching = False
+
+    def _notify(self, key: str, record: Optional[Mapping[str, Any]]) -> None:
+        """
+        Invoke all listeners for a change.
+
+        Args:
+            key: Session key.
+            record: New record, or None if removed.
+        """
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(key, record)
+            except Exception:
+                pass
+
+    def _start_watching(self) -> None:
+        """Start delivering changes made elsewhere. Called on the first subscribe()."""
+        pass
+
+    def _stop_watching(self) -> None:
+        """Stop delivering changes. Called when the last listener is removed or on close()."""
+        pass
+
+    def close(self) -> None:
+        """Release resources held by the store."""
+        pass
+
+    def __enter__(self) -> "SessionStore":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
+
+
+class MemorySessionStore(SessionStore):
+    """
+    In-process session store.
+    Records are kept as given, without serialisation, in a lock-striped LRU
+    map with an expiry heap. Listeners are called synchronously by the thread
+    that made the change, including for evicted and expired records.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            max_entries: Maximum number of records. The least recently used
+                record is evicted when full. None means unbounded.
+        """
+        super().__init__()
+        self._records: StripedLRU[Mapping[str, Any]] = StripedLRU(
+            max_entries, on_remove=lambda key: self._notify(key, None)
+        )
+
+    def get(self, key: str) -> Optional[Mapping[str, Any]]:
+        return self._records.get(key)
+
+    def set(self, key: str, record: Mapping[str, Any], ttl: Optional[float] = None) -> None:
+        expires = None if ttl is None else time.time() + ttl
+        self._records.set(key, record, expires)
+        self._notify(key, record)
+
+    def delete(self, key: str) -> None:
+        if self._records.delete(key) is not None:
+            self._notify(key, None)
+
+    def keys(self) -> List[str]:
+        return self._records.keys()
+
+    def items(self) -> Dict[str, Mapping[str, Any]]:
+        return self._records.items()
+
+    def clear(self) -> None:
+        for key in self._records.clear():
+            self._notify(key, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Session store backed by a SQLite database in WAL mode.
+    Shares sessions between all processes on one host. Every upsert gets a new
+    sequence number, which a watcher thread polls to deliver upserts made by
+    any process. Removals are only delivered to listeners in this process.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT NOT NULL UNIQUE,
+            data TEXT NOT NULL,
+            expires REAL
+        )
+    """
+
+    _SCHEDULE_SCHEMA = """
+        CREATE TABLE IF NOT EXISTS schedules (
+            key TEXT PRIMARY KEY,
+            tat REAL NOT NULL
+        )
+    """
+
+    _LEASE_SCHEMA = """
+        CREATE TABLE IF NOT EXISTS leases (
+            key TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires REAL NOT NULL
+        )
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.5, timeout: float = 5.0):
+        """
+        Initialize the store, creating the database if needed.
+
+        Args:
+            path: Database file path.
+            poll_interval: Seconds between checks for changes made by other processes.
+            timeout: Seconds to wait for a database lock held by another process.
+        """
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(self._SCHEMA)
+        self._conn.execute(self._SCHEDULE_SCHEMA)
+        self._conn.execute(self._LEASE_SCHEMA)
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """
+        Run a statement and fetch its rows.
+
+        Args:
+            sql: SQL statement.
+            params: Statement parameters.
+
+        Returns:
+            List[tuple]: Result rows.
+
+        Raises:
+            SessionError: If the database is unavailable.
+        """
+        try:
+            with self._lock:
+                return self._conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            raise SessionError(f"Session store error: {e}") from e
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        rows = self._execute(
+            "SELECT data FROM sessions WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, time.time()),
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    def set(self, key: str, record: Mapping[str, Any], ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires = None if ttl is None else now + ttl
+        # REPLACE assigns a fresh seq, which is how watchers notice the upsert
+        self._execute(
+            "INSERT OR REPLACE INTO sessions (key, data, expires) VALUES (?, ?, ?)",
+            (key, json.dumps(dict(record)), expires),
+        )
+        self._execute("DELETE FROM sessions WHERE expires <= ?", (now,))
+
+    def delete(self, key: str) -> None:
+        self._execute("DELETE FROM sessions WHERE key = ?", (key,))
+        self._notify(key, None)
+
+    def keys(self) -> List[str]:
+        rows = self._execute(
+            "SELECT key FROM sessions WHERE expires IS NULL OR expires > ?", (time.time(),)
+        )
+        return [row[0] for row in rows]
+
+    def items(self) -> Dict[str, Mapping[str, Any]]:
+        rows = self._execute(
+            "SELECT key, data FROM sessions WHERE expires IS NULL OR expires > ?", (time.time(),)
+        )
+        return {key: json.loads(data) for key, data in rows}
+
+    def clear(self) -> None:
+        keys = self.keys()
+        self._execute("DELETE FROM sessions")
+        for key in keys:
+            self._notify(key, None)
+
+    def reserve(self, key: str, interval: float, burst: int = 1) -> float:
+        try:
+            with self._lock:
+                # IMMEDIATE takes the write lock up front, so the read and the
+                # update cannot interleave with another process
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    now = time.time()
+                    row = self._conn.execute(
+                        "SELECT tat FROM schedules WHERE key = ?", (key,)
+                    ).fetchone()
+                    tat, wait = _schedule(row[0] if row else None, now, interval, burst)
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO schedules (key, tat) VALUES (?, ?)", (key, tat)
+                    )
+                    self._conn.execute("DELETE FROM schedules WHERE tat < ?", (now,))
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            raise SessionError(f"Session store error: {e}") from e
+        return wait
+
+    def lease(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        # One statement, so claiming an expired lease cannot race another process
+        self._execute(
+            "INSERT INTO leases (key, owner, expires) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires = excluded.expires "
+            "WHERE leases.expires <= ?",
+            (key, owner, now + ttl, now),
+        )
+        rows = self._execute("SELECT owner FROM leases WHERE key = ?", (key,))
+        return bool(rows) and rows[0][0] == owner
+
+    def _start_watching(self) -> None:
+        last_seq = self._execute("SELECT COALESCE(MAX(seq), 0) FROM sessions")[0][0]
+        self._watcher_stop = threading.Event()
+        self._watcher = threading.Thread(
+            target=self._watch,
+            args=(last_seq, self._watcher_stop),
+            name="cf-ares-sqlite-store",
+            daemon=True,
+        )
+        self._watcher.start()
+
+    def _stop_watching(self) -> None:
+        self._watcher_stop.set()
+        if self._watcher is not None and self._watcher is not threading.current_thread():
+            self._watcher.join()
+        self._watcher = None
+
+    def _watch(self, last_seq: int, stop: threading.Event) -> None:
+        """
+        Poll for upserts and notify listeners.
+
+        Args:
+            last_seq: Highest sequence number already seen.
+            stop: Set to end this watcher.
+        """
+        while not stop.wait(self.poll_interval):
+            try:
+                rows = self._execute(
+                    "SELECT seq, key, data FROM sessions WHERE seq > ? ORDER BY seq", (last_seq,)
+                )
+            except SessionError:
+                continue
+            for seq, key, data in rows:
+                last_seq = seq
+                self._notify(key, json.loads(data))
+
+    def close(self) -> None:
+        self._update_watching(closing=True)
+        with self._lock:
+            self._conn.close()
+
+
+class _RespConnection:
+    """Minimal blocking client connection speaking the Redis protocol (RESP2)."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        db: int = 0,
+        password: Optional[str] = None,
+        username: Optional[str] = None,
+        timeout: Optional[float] = 5.0,
+    ):
+        """
+        Connect and authenticate.
+
+        Args:
+            host: Server host.
+            port: Server port.
+            db: Database index to select.
+            password: Password for AUTH.
+            username: Username for ACL-based AUTH.
+            timeout: Socket timeout in seconds. None blocks indefinitely.
+        """
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.settimeout(timeout)
+        self._file = self._sock.makefile("rb")
+        if password:
+            self.execute(*(("AUTH", username, password) if username else ("AUTH", password)))
+        if db:
+            self.execute("SELECT", db)
+
+    @staticmethod
+    def _encode(args: tuple) -> bytes:
+        """
+        Encode a command as a RESP array of bulk strings.
+
+        Args:
+            args: Command name and arguments.
+
+        Returns:
+            bytes: Encoded command.
+        """
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def stale(self) -> bool:
+        """
+        Check whether an idle connection can no longer be used.
+
+        Nothing is pending on an idle connection, so anything readable means
+        the server closed it (or broke the protocol).
+
+        Returns:
+            bool: True if the connection should be discarded.
+        """
+        try:
+            readable, _, _ = select.select([self._sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
+
+    def send(self, *commands: tuple) -> None:
+        """
+        Send one or more commands in a single write.
+
+        Args:
+            *commands: Commands, each a tuple of name and arguments.
+        """
+        self._sock.sendall(b"".join(self._encode(command) for command in commands))
+
+    def read(self) -> Any:
+        """
+        Read one reply.
+
+        Returns:
+            Any: str for simple strings, int, bytes or None for bulk strings,
+                list for arrays.
+
+        Raises:
+            SessionError: If the server replied with an error.
+            ConnectionError: If the connection was closed.
+        """
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode("utf-8")
+        if kind == b"-":
+            raise SessionError(f"Session store error: {rest.decode('utf-8')}")
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            return self._file.read(length + 2)[:-2]
+        if kind == b"*":
+            length = int(rest)
+            if length < 0:
+                return None
+            return [self.read() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply: {line!r}")
+
+    def execute(self, *args: Any) -> Any:
+        """
+        Send a command and read its reply.
+
+        Args:
+            *args: Command name and arguments.
+
+        Returns:
+            Any: Reply.
+        """
+        self.send(args)
+        return self.read()
+
+    def close(self) -> None:
+        """Close the connection, unblocking any pending read."""
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._file.close()
+        self._sock.close()
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Session store on any server speaking the Redis protocol.
+    Shares sessions between all nodes. Records are stored as JSON strings with
+    a per-key expiry; every change is published on a channel so that
+    subscribed clients on every node are notified.
+
+    Commands run over a small pool of connections, so threads of one client
+    do not queue behind each other's round-trips.
+    """
+
+    # Atomic GCRA reservation, see _schedule(). Numbers are returned as strings
+    # because Lua numbers are truncated to integers in replies.
+    # Uses the server clock, so clients with skewed clocks share one schedule
+    _RESERVE_SCRIPT = """
+        if redis.replicate_commands then redis.replicate_commands() end
+        local clock = redis.call('TIME')
+        local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+        local interval = tonumber(ARGV[1])
+        local burst = tonumber(ARGV[2])
+        local tat = tonumber(redis.call('GET', KEYS[1])) or now
+        if tat < now then tat = now end
+        local new_tat = tat + interval
+        redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000) + 1)
+        return tostring(math.max(tat - now - (burst - 1) * interval, 0))
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "cf_ares:session:",
+        timeout: float = 5.0,
+        schedule_prefix: str = "cf_ares:schedule:",
+        lease_prefix: str = "cf_ares:lease:",
+        max_connections: int = 4,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            url: Server URL, "redis://[[user]:password@]host[:port][/db]".
+            prefix: Prefix for record keys. The change channel is prefix + "events".
+            timeout: Socket timeout in seconds.
+            schedule_prefix: Prefix for rate limit schedule keys. Must not start
+                with prefix.
+            lease_prefix: Prefix for lease keys. Must not start with prefix.
+            max_connections: Maximum number of command connections open at
+                once. The change listener has its own.
+        """
+        super().__init__()
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported session store URL: {url!r}")
+        self._address: Dict[str, Any] = {
+            "host": parsed.hostname or "localhost",
+            "port": parsed.port or 6379,
+            "db": int(parsed.path.lstrip("/") or 0),
+            "username": unquote(parsed.username) if parsed.username else None,
+            "password": unquote(parsed.password) if parsed.password else None,
+        }
+        self.prefix = prefix
+        self.channel = prefix + "events"
+        self.schedule_prefix = schedule_prefix
+        self.lease_prefix = lease_prefix
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._lock = threading.Lock()
+        self._idle: List[_RespConnection] = []
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._listener_conn: Optional[_RespConnection] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+
+    def _connect(self, timeout: Optional[float]) -> _RespConnection:
+        """
+        Open a new connection.
+
+        Args:
+            timeout: Socket timeout in seconds.
+
+        Returns:
+            _RespConnection: Connected client.
+        """
+        return _RespConnection(timeout=timeout, **self._address)
+
+    def _checkout(self) -> Tuple[_RespConnection, bool]:
+        """
+        Take an idle connection that is still open, or open a new one.
+
+        Returns:
+            Tuple[_RespConnection, bool]: Connection, and whether it was reused.
+
+        Raises:
+            OSError: If a new connection cannot be opened.
+        """
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._connect(self.timeout), False
+            if not conn.stale():
+                return conn, True
+            conn.close()
+
+    def _call(self, *commands: tuple) -> List[Any]:
+        """
+        Run commands as one pipelined round-trip on a pooled connection.
+
+        A reused connection the server dropped after the liveness check fails
+        while sending, before it could run anything, and the commands are
+        sent again on a new connection. Failures while reading the replies
+        (including timeouts) are never retried: the server may already have
+        run the commands, and reservations or publishes must not repeat.
+
+        Args:
+            *commands: Commands, each a tuple of name and arguments.
+
+        Returns:
+            List[Any]: One reply per command.
+
+        Raises:
+            SessionError: If the server is unreachable or returns an error.
+        """
+        with self._slots:
+            try:
+                conn, reused = self._checkout()
+                try:
+                    conn.send(*commands)
+                except OSError:
+                    conn.close()
+                    if not reused:
+                        raise
+                    conn = self._connect(self.timeout)
+                    conn.send(*commands)
+            except OSError as e:
+                raise SessionError(f"Session store unavailable: {e}") from e
+            try:
+                replies = [conn.read() for _ in commands]
+            except BaseException as e:
+                # Unread replies would be taken for the next caller's
+                conn.close()
+                if isinstance(e, OSError):
+                    raise SessionError(f"Session store unavailable: {e}") from e
+                raise
+            with self._lock:
+                self._idle.append(conn)
+            return replies
+
+    def _event(self, key: str, record: Optional[Mapping[str, Any]]) -> tuple:
+        """
+        Build the PUBLISH command announcing a change.
+
+        Args:
+            key: Session key.
+            record: New record, or None if removed.
+
+        Returns:
+            tuple: PUBLISH command.
+        """
+        record = dict(record) if record is not None else None
+        return ("PUBLISH", self.channel, json.dumps({"key": key, "record": record}))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        data = self._call(("GET", self.prefix + key))[0]
+        return json.loads(data) if data is not None else None
+
+    def set(self, key: str, record: Mapping[str, Any], ttl: Optional[float] = None) -> None:
+        command: tuple = ("SET", self.prefix + key, json.dumps(dict(record)))
+        if ttl is not None:
+            command += ("PX", max(1, int(ttl * 1000)))
+        self._call(command, self._event(key, record))
+
+    def delete(self, key: str) -> None:
+        self._call(("DEL", self.prefix + key), self._event(key, None))
+
+    def keys(self) -> List[str]:
+        keys: List[str] = []
+        cursor = b"0"
+        while True:
+            cursor, batch = self._call(("SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", 100))[0]
+            keys.extend(key.decode("utf-8")[len(self.prefix):] for key in batch)
+            if cursor == b"0":
+                return keys
+
+    def items(self) -> Dict[str, Mapping[str, Any]]:
+        keys = self.keys()
+        if not keys:
+            return {}
+        values = self._call(("MGET",) + tuple(self.prefix + key for key in keys))[0]
+        return {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def clear(self) -> None:
+        keys = self.keys()
+        if keys:
+            self._call(
+                ("DEL",) + tuple(self.prefix + key for key in keys),
+                *(self._event(key, None) for key in keys),
+            )
+
+    def reserve(self, key: str, interval: float, burst: int = 1) -> float:
+        wait = self._call((
+            "EVAL", self._RESERVE_SCRIPT, 1, self.schedule_prefix + key, repr(interval), burst,
+        ))[0]
+        return float(wait)
+
+    def lease(self, key: str, owner: str, ttl: float) -> bool:
+        name = self.lease_prefix + key
+        claimed = self._call(("SET", name, owner, "NX", "PX", max(1, int(ttl * 1000))))[0]
+        if claimed is not None:
+            return True
+        # Held already, possibly by this owner
+        return bool(self._call(("GET", name))[0] == owner.encode("utf-8"))
+
+    def _start_watching(self) -> None:
+        self._watcher_stop = threading.Event()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(self._watcher_stop,), name="cf-ares-redis-store", daemon=True
+        )
+        self._watcher.start()
+
+    def _stop_watching(self) -> None:
+        self._watcher_stop.set()
+        # Closing the connection unblocks the pending read
+        if self._listener_conn is not None:
+            self._listener_conn.close()
+        if self._watcher is not None and self._watcher is not threading.current_thread():
+            self._watcher.join()
+        self._watcher = None
+
+    def _watch(self, stop: threading.Event) -> None:
+        """
+        Listen on the change channel and notify listeners, reconnecting on errors.
+
+        Args:
+            stop: Set to end this watcher.
+        """
+        while not stop.is_set():
+            conn = None
+            try:
+                conn = self._listener_conn = self._connect(None)
+                if stop.is_set():
+                    # Stopped while connecting, after _stop_watching() looked for a connection
+                    conn.close()
+                    break
+                conn.execute("SUBSCRIBE", self.channel)
+                while True:
+                    message = conn.read()
+                    if message and message[0] == b"message":
+                        event = json.loads(message[2])
+                        self._notify(event["key"], event["record"])
+            except (OSError, ConnectionError, SessionError, ValueError):
+                if conn is not None:
+                    conn.close()
+                stop.wait(1.0)
+
+    def close(self) -> None:
+        self._update_watching(closing=True)
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
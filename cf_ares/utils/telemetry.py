@@ -0,0 +1,236 @@
+"""
+Challenge solve telemetry for CF-Ares.
+
+Every browser solve produces a SolveReport with the time spent in each
+phase, from waiting for a browser to verifying the new session. SolveStats
+keeps the most recent reports of each domain, so latency percentiles per
+phase can be read without an external metrics system.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence
+
+from cf_ares.utils.lru import StripedLRU
+from cf_ares.utils.metrics import DEFAULT_BUCKETS, Histogram
+
+# Solve phases in the order they run
+SOLVE_PHASES = (
+    "acquire",   # waiting for the client's browser or a pooled one
+    "launch",    # starting the browser process
+    "navigate",  # loading the URL
+    "detect",    # checking the page for a challenge
+    "wait",      # waiting for the challenge to clear and the page to settle
+    "extract",   # reading cookies, headers and the page
+    "verify",    # checking the new session (solve_challenge only)
+)
+
+SUCCESS = "success"
+FAILURE = "failure"
+
+DEFAULT_WINDOW = 100
+DEFAULT_MAX_DOMAINS = 1000
+
+
+class SolveReport:
+    """Timing breakdown and outcome of one challenge solve."""
+
+    __slots__ = ("url", "host", "started", "phases", "retries", "outcome", "error")
+
+    def __init__(self, url: str, host: str):
+        """
+        Start a report.
+
+        Args:
+            url: URL being solved.
+            host: Session key of the URL.
+        """
+        self.url = url
+        self.host = host
+        self.started = time.time()
+        # Phase -> seconds, in the order the phases ran
+        self.phases: Dict[str, float] = {}
+        self.retries = 0
+        self.outcome: Optional[str] = None
+        self.error: Optional[str] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        """
+        Add time to a phase. Repeated phases, e.g. across retries, accumulate.
+
+        Args:
+            name: Phase name, see SOLVE_PHASES.
+            seconds: Time spent.
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time a phase.
+
+        Args:
+            name: Phase name, see SOLVE_PHASES.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    @property
+    def total(self) -> float:
+        """Seconds spent in all phases."""
+        return sum(self.phases.values())
+
+    def finish(self, error: Optional[BaseException] = None) -> "SolveReport":
+        """
+        Record the outcome.
+
+        Args:
+            error: Exception the solve failed with, or None if it succeeded.
+
+        Returns:
+            SolveReport: This report.
+        """
+        self.outcome = FAILURE if error is not None else SUCCESS
+        self.error = f"{type(error).__name__}: {error}" if error is not None else None
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the report as a JSON-serialisable dictionary.
+
+        Returns:
+            Dict[str, Any]: Report fields plus the total time.
+        """
+        result = {name: getattr(self, name) for name in self.__slots__}
+        result["phases"] = dict(self.phases)
+        result["total"] = self.total
+        return result
+
+    def __repr__(self) -> str:
+        phases = ", ".join(f"{name}={seconds:.3f}s" for name, seconds in self.phases.items())
+        return f"<SolveReport {self.host} {self.outcome} retries={self.retries} {phases}>"
+
+
+class SolveStats:
+    """
+    Rolling per-domain window of solve reports.
+    Only the latest window reports of each domain are kept, and at most
+    max_domains domains, least recently solved dropped first.
+    """
+
+    def __init__(
+        self,
+        window: int = DEFAULT_WINDOW,
+        max_domains: Optional[int] = DEFAULT_MAX_DOMAINS,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        """
+        Initialize empty statistics.
+
+        Args:
+            window: Number of recent reports kept per domain.
+            max_domains: Maximum number of domains tracked.
+            buckets: Histogram bucket upper bounds in seconds.
+        """
+        self.window = window
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._reports: StripedLRU[Deque[SolveReport]] = StripedLRU(max_domains)
+
+    def record(self, report: SolveReport) -> None:
+        """
+        Add a finished report.
+
+        Args:
+            report: Report to add.
+        """
+        with self._lock:
+            reports = self._reports.get(report.host)
+            if reports is None:
+                reports = deque(maxlen=self.window)
+            reports.append(report)
+            self._reports.set(report.host, reports)
+
+    def reports(self, host: str) -> List[SolveReport]:
+        """
+        Get the recent reports of a domain.
+
+        Args:
+            host: Session key.
+
+        Returns:
+            List[SolveReport]: Reports, oldest first.
+        """
+        with self._lock:
+            return list(self._reports.get(host) or ())
+
+    def last(self, host: str) -> Optional[SolveReport]:
+        """
+        Get the latest report of a domain.
+
+        Args:
+            host: Session key.
+
+        Returns:
+            Optional[SolveReport]: Report, or None if the domain was not solved recently.
+        """
+        reports = self.reports(host)
+        return reports[-1] if reports else None
+
+    def histogram(self, host: str, phase: str = "total") -> Histogram:
+        """
+        Build a histogram of a phase over a domain's recent successful solves.
+
+        Args:
+            host: Session key.
+            phase: Phase name, or "total".
+
+        Returns:
+            Histogram: Histogram of the window.
+        """
+        histogram = Histogram(self.buckets)
+        for report in self.reports(host):
+            if report.outcome != SUCCESS:
+                continue
+            value = report.total if phase == "total" else report.phases.get(phase)
+            if value is not None:
+                histogram.observe(value)
+        return histogram
+
+    def summary(self, host: str) -> Dict[str, Any]:
+        """
+        Summarise a domain's recent solves.
+
+        Args:
+            host: Session key.
+
+        Returns:
+            Dict[str, Any]: Number of solves and failures, retries, and the
+                mean, p50 and p90 seconds of each phase of successful solves.
+        """
+        reports = self.reports(host)
+        succeeded = [report for report in reports if report.outcome == SUCCESS]
+        phases: Dict[str, Dict[str, float]] = {}
+        for phase in SOLVE_PHASES + ("total",):
+            values = sorted(
+                report.total if phase == "total" else report.phases[phase]
+                for report in succeeded
+                if phase == "total" or phase in report.phases
+            )
+            if values:
+                phases[phase] = {
+                    "mean": sum(values) / len(values),
+                    "p50": values[int(0.5 * (len(values) - 1))],
+                    "p90": values[int(0.9 * (len(values) - 1))],
+                }
+        return {
+            "solves": len(reports),
+            "failures": len(reports) - len(succeeded),
+            "retries": sum(report.retries for report in reports),
+            "phases": phases,
+        }
@@ -0,0 +1,121 @@
+"""
+Shared fixtures for CF-Ares tests.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import pytest
+
+from cf_ares.engines.base import BaseEngine, BrowserPage
+from cf_ares.engines.registry import _ENGINES, register_engine
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """Echo the request method, path, headers and cookies back as JSON."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        payload = json.dumps({
+            "method": self.command,
+            "path": self.path,
+            "headers": dict(self.headers),
+            "body": body.decode("utf-8", errors="replace"),
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = do_OPTIONS = do_HEAD = _respond
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def http_server():
+    """Run a local echo server and yield its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class FakeBrowserEngine(BaseEngine):
+    """In-process browser engine that "solves" instantly and counts launches."""
+
+    instances: List["FakeBrowserEngine"] = []
+    # Seconds an issued clearance lasts; None issues session cookies
+    cookie_lifetime: Optional[float] = None
+
+    def __init__(self, headless=True, proxy=None, timeout=30, fingerprint=None, **kwargs):
+        super().__init__(headless, proxy, timeout, fingerprint)
+        self.running = False
+        self.launches = 0
+        self.visits: List[str] = []
+        self.cleared: List[str] = []
+        self.clearance_expiry: Optional[float] = None
+        FakeBrowserEngine.instances.append(self)
+
+    def start(self) -> None:
+        if not self.running:
+            self.running = True
+            self.launches += 1
+
+    @property
+    def is_running(self) -> bool:
+        return self.running
+
+    def get(self, url):
+        self.start()
+        self.visits.append(url)
+        return None
+
+    def wait_for_cloudflare(self) -> bool:
+        # Like Cloudflare, only issue a clearance to a browser that has none
+        if self.cookie_lifetime is not None and self.clearance_expiry is None:
+            self.clearance_expiry = time.time() + self.cookie_lifetime
+        return True
+
+    def clear_cookies(self, url) -> None:
+        self.cleared.append(url)
+        self.clearance_expiry = None
+
+    def get_cookie_expiry(self) -> Dict[str, float]:
+        return {"cf_clearance": self.clearance_expiry} if self.clearance_expiry else {}
+
+    def get_cookies(self) -> Dict[str, str]:
+        return {"cf_clearance": "fake"}
+
+    def get_headers(self) -> Dict[str, str]:
+        return {"User-Agent": "fake-browser"}
+
+    def get_page(self) -> BrowserPage:
+        return BrowserPage(self.visits[-1], b"<html>solved</html>", self.get_cookies())
+
+    def close(self) -> None:
+        self.running = False
+
+
+@pytest.fixture
+def fake_engine():
+    """Register FakeBrowserEngine as the "fake" browser engine."""
+    FakeBrowserEngine.instances = []
+    register_engine("fake", FakeBrowserEngine)
+    try:
+        yield FakeBrowserEngine
+    finally:
+        _ENGINES.pop("fake", None)
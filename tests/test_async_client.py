@@ -0,0 +1,68 @@
+"""
+Tests for the asynchronous client.
+"""
+
+import asyncio
+import threading
+
+from cf_ares import AsyncAresClient
+from cf_ares.utils import SQLiteSessionStore
+
+
+def test_async_requests_reuse_solved_session(http_server):
+    """Concurrent requests run over the stored session without a browser."""
+
+    async def run():
+        async with AsyncAresClient() as client:
+            record = client._session_manager.update(
+                http_server, {"cf_clearance": "token"}, {"User-Agent": "ares-test"}
+            )
+            client._apply_session(http_server, record)
+            responses = await asyncio.gather(
+                *(client.get(f"{http_server}/item/{i}") for i in range(20))
+            )
+            posted = await client.post(f"{http_server}/submit", json={"key": "value"})
+            return responses, posted
+
+    responses, posted = asyncio.run(run())
+
+    assert [r.status_code for r in responses] == [200] * 20
+    assert responses[3].json()["path"] == "/item/3"
+    assert "cf_clearance=token" in responses[0].json()["headers"]["Cookie"]
+    assert responses[0].json()["headers"]["User-Agent"] == "ares-test"
+    assert posted.json()["method"] == "POST"
+
+
+class RecordingStore(SQLiteSessionStore):
+    """SQLite store that records the threads its session records are read and written on."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.current_thread())
+        return super().get(key)
+
+    def delete(self, key):
+        self.threads.add(threading.current_thread())
+        super().delete(key)
+
+
+def test_shared_store_stays_off_the_event_loop(fake_engine, http_server, tmp_path):
+    """Session lookups that miss the local cache, and clearing, run outside the loop."""
+    store = RecordingStore(str(tmp_path / "sessions.db"))
+
+    async def run():
+        async with AsyncAresClient(browser_engine="fake", session_store=store, probe_first=True) as client:
+            loop_thread = threading.current_thread()
+            responses = [await client.get(f"{http_server}/{i}") for i in range(3)]
+            await client._session_manager.aclear(http_server)
+            return loop_thread, responses
+
+    try:
+        loop_thread, responses = asyncio.run(run())
+    finally:
+        store.close()
+    assert [r.status_code for r in responses] == [200] * 3
+    assert store.threads and loop_thread not in store.threads
@@ -0,0 +1,41 @@
+"""
+Smoke tests for the offline benchmark suite.
+"""
+
+import copy
+
+from curl_cffi import requests
+
+from benchmarks.run import compare, percentile, run
+from benchmarks.server import BenchServer
+
+
+def test_server_serves_interstitial_until_cleared():
+    with BenchServer(body_size=100) as server:
+        challenged = requests.get(server.url("/challenge/page"))
+        cleared = requests.get(server.url("/challenge/page"), cookies={"cf_clearance": "x"})
+        sized = requests.get(server.url("/?size=10"))
+    assert challenged.status_code == 403 and challenged.headers["cf-mitigated"] == "challenge"
+    assert cleared.status_code == 200 and len(cleared.content) == 100
+    assert len(sized.content) == 10
+
+
+def test_run_reports_and_compares():
+    result = run(["curl_sequential", "client_sequential", "solve"], requests=20, solve_delay=0.0)
+    rows = result["results"]
+    assert all(row["errors"] == 0 and row["rps"] > 0 for row in rows.values())
+    assert rows["client_sequential"]["p50_ms"] <= rows["client_sequential"]["p99_ms"]
+    # The first client request and every explicit solve go through the mock browser
+    assert result["meta"]["solves"] == 1 + rows["solve"]["requests"]
+    assert compare(result, result) == []
+
+    slower = copy.deepcopy(result)
+    slower["results"]["solve"]["rps"] /= 2
+    assert [line.split(":")[0] for line in compare(result, slower)] == ["solve"]
+
+
+def test_percentile_uses_nearest_rank():
+    samples = [float(n) for n in range(1, 101)]
+    assert percentile(samples, 0.5) == 50.0
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
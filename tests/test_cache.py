@@ -0,0 +1,158 @@
+"""
+Tests for the HTTP response cache.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from cf_ares import AresClient
+from cf_ares.utils.cache import ResponseCache, parse_cache_control
+
+
+class CacheHandler(BaseHTTPRequestHandler):
+    """Serve documents with various caching headers and count full responses."""
+
+    protocol_version = "HTTP/1.1"
+    full = 0
+    not_modified = 0
+
+    def do_GET(self) -> None:
+        cls = type(self)
+        headers = {}
+        if self.path.startswith("/fresh"):
+            headers["Cache-Control"] = "max-age=60"
+        elif self.path.startswith("/etag"):
+            headers["Cache-Control"] = "no-cache"
+            headers["ETag"] = '"v1"'
+            if self.headers.get("If-None-Match") == '"v1"':
+                cls.not_modified += 1
+                self.send_response(304)
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        elif self.path.startswith("/conditional"):
+            headers["Cache-Control"] = "max-age=60"
+            if self.headers.get("If-None-Match") == '"v1"':
+                cls.not_modified += 1
+                self.send_response(304)
+                self.send_header("Cache-Control", "max-age=60")
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            headers["ETag"] = '"v1"'
+        elif self.path.startswith("/private"):
+            headers["Cache-Control"] = "no-store"
+        cls.full += 1
+        body = f"{self.path} #{cls.full}".encode("utf-8")
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def cache_server():
+    CacheHandler.full = CacheHandler.not_modified = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CacheHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_fresh_responses_are_served_from_memory(fake_engine, cache_server):
+    cache = ResponseCache()
+    with AresClient(browser_engine="fake", cache=cache) as client:
+        first = client.get(f"{cache_server}/fresh")
+        second = client.get(f"{cache_server}/fresh")
+        assert client.get(f"{cache_server}/private").text != client.get(f"{cache_server}/private").text
+    assert second.text == first.text
+    assert not first.from_cache and second.from_cache
+    assert cache.stats()["hits"] == 1
+    assert CacheHandler.full == 3
+
+
+def test_stale_responses_are_revalidated(fake_engine, cache_server):
+    cache = ResponseCache()
+    with AresClient(browser_engine="fake", cache=cache) as client:
+        first = client.get(f"{cache_server}/etag")
+        second = client.get(f"{cache_server}/etag")
+    assert second.status_code == 200
+    assert second.text == first.text
+    assert CacheHandler.full == 1 and CacheHandler.not_modified == 1
+    assert cache.stats() == {"hits": 0, "revalidations": 1, "misses": 1, "entries": 1}
+
+
+def test_callers_own_304_is_not_stored(fake_engine, cache_server):
+    cache = ResponseCache()
+    with AresClient(browser_engine="fake", cache=cache) as client:
+        conditional = client.get(f"{cache_server}/conditional", headers={"If-None-Match": '"v1"'})
+        assert conditional.status_code == 304
+        full = client.get(f"{cache_server}/conditional")
+    assert full.status_code == 200 and full.text.startswith("/conditional")
+    assert not full.from_cache
+    assert cache.stats()["entries"] == 1
+
+
+def test_entries_are_keyed_by_session(fake_engine, cache_server):
+    cache = ResponseCache()
+    with AresClient(browser_engine="fake", cache=cache) as client:
+        client.get(f"{cache_server}/fresh")
+        client.set_session_info({"cookies": {"cf_clearance": "other"}, "headers": {}}, cache_server)
+        assert not client.get(f"{cache_server}/fresh").from_cache
+        assert not client.get(f"{cache_server}/fresh", headers={"Authorization": "Bearer x"}).from_cache
+        assert client.get(f"{cache_server}/fresh").from_cache
+    assert CacheHandler.full == 3
+
+
+def test_unsafe_requests_invalidate(fake_engine, cache_server):
+    with AresClient(browser_engine="fake", cache=ResponseCache()) as client:
+        client.get(f"{cache_server}/fresh")
+        client.post(f"{cache_server}/fresh", data="x")
+        assert not client.get(f"{cache_server}/fresh").from_cache
+        assert not client.get(f"{cache_server}/fresh", headers={"Cache-Control": "no-store"}).from_cache
+
+
+def test_disk_tier_survives_restarts(fake_engine, cache_server, tmp_path):
+    path = str(tmp_path / "cache")
+    with AresClient(browser_engine="fake", cache=ResponseCache(path=path)) as client:
+        client.set_session_info({"cookies": {"cf_clearance": "a"}, "headers": {}}, cache_server)
+        text = client.get(f"{cache_server}/fresh").text
+    cache = ResponseCache(path=path)
+    with AresClient(browser_engine="fake", cache=cache) as client:
+        client.set_session_info({"cookies": {"cf_clearance": "a"}, "headers": {}}, cache_server)
+        response = client.get(f"{cache_server}/fresh")
+    assert response.from_cache and response.text == text
+    assert CacheHandler.full == 1
+
+
+def test_disk_tier_is_bounded(tmp_path):
+    class Response:
+        status_code = 200
+        headers = {"Cache-Control": "max-age=60"}
+        content = b"x" * 1000
+        url = "http://example.com/"
+
+    cache = ResponseCache(max_entries=1, path=str(tmp_path), max_disk_bytes=5000)
+    for i in range(20):
+        assert cache.store(ResponseCache.key(f"http://example.com/{i}"), None, Response())
+    assert sum(f.stat().st_size for f in tmp_path.iterdir()) <= 5000
+
+
+def test_parse_cache_control():
+    assert parse_cache_control('max-age=60, No-Cache, private="x"') == {
+        "max-age": "60", "no-cache": None, "private": "x",
+    }
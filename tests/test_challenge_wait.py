@@ -0,0 +1,56 @@
+"""
+Tests for event-driven challenge completion detection.
+"""
+
+import time
+
+import pytest
+
+from cf_ares.engines.challenge import wait_for_challenge
+from cf_ares.exceptions import CloudflareError
+
+
+class ScriptedDriver:
+    """Driver stub whose probe results follow a script."""
+
+    def __init__(self, states):
+        self.states = list(states)
+        self.calls = 0
+
+    def execute_script(self, script, *args):
+        self.calls += 1
+        if "readyState" in script and "selectors" not in script:
+            return "complete"
+        return self.states.pop(0) if len(self.states) > 1 else self.states[0]
+
+
+def page(challenge, ready="complete", error=None):
+    return {"ready": ready, "challenge": challenge, "error": error}
+
+
+def test_no_challenge_returns_after_one_probe():
+    """Pages without a challenge return immediately."""
+    driver = ScriptedDriver([page(False)])
+    start = time.perf_counter()
+    timings = wait_for_challenge(driver, timeout=5)
+    assert time.perf_counter() - start < 0.5
+    assert driver.calls == 1
+    assert timings["solve"] == 0.0
+
+
+def test_challenge_resolves_as_soon_as_markers_disappear():
+    """Completion is detected within a few short polls."""
+    driver = ScriptedDriver([page(True), page(True), page(True), page(False, ready="interactive")])
+    start = time.perf_counter()
+    timings = wait_for_challenge(driver, timeout=5, poll_frequency=0.01)
+    assert time.perf_counter() - start < 1
+    assert set(timings) == {"detect", "solve", "settle"}
+    assert timings["solve"] > 0
+
+
+def test_challenge_error_and_timeout_raise():
+    """Challenge errors and timeouts surface as CloudflareError."""
+    with pytest.raises(CloudflareError, match="blocked"):
+        wait_for_challenge(ScriptedDriver([page(True), page(True, error="blocked")]), timeout=5, poll_frequency=0.01)
+    with pytest.raises(CloudflareError, match="timed out"):
+        wait_for_challenge(ScriptedDriver([page(True)]), timeout=0.05, poll_frequency=0.01)
@@ -0,0 +1,149 @@
+"""
+Tests for connection pool settings and connection reuse statistics.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from curl_cffi.const import CurlHttpVersion, CurlMOpt, CurlOpt
+
+from benchmarks.server import BenchServer
+from cf_ares import AresClient, AsyncAresClient
+from cf_ares.engines import curl as curl_module
+from cf_ares.engines.curl import AsyncCurlEngine, CurlEngine, PoolConfig
+
+
+@pytest.fixture
+def slow_server():
+    with BenchServer(latency=0.05, body_size=100) as server:
+        yield server
+
+
+def test_reused_connections_are_counted(http_server):
+    engine = CurlEngine(pool=PoolConfig(idle_timeout=30, http2=False))
+    try:
+        for _ in range(3):
+            engine.request("GET", http_server)
+    finally:
+        engine.close()
+    stats = engine.connection_stats.snapshot("127.0.0.1")
+    assert stats["requests"] == 3
+    assert stats["new_connections"] == 1 and stats["reused"] == 2
+    assert stats["http_versions"] == {"1.1": 3}
+    assert engine.connection_stats.snapshot()["reuse_ratio"] == pytest.approx(2 / 3)
+
+
+def test_threaded_client_caps_total_connections(fake_engine, slow_server):
+    pool = PoolConfig(max_connections=2)
+    with AresClient(browser_engine="fake", thread_safe=True, connection_pool=pool) as client:
+        client.get(slow_server.url("/"))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(6) as executor:
+            list(executor.map(lambda _: client.get(slow_server.url("/")), range(6)))
+        elapsed = time.perf_counter() - start
+        assert client.connection_stats()["requests"] == 7
+    # Six requests two at a time take three round trips
+    assert elapsed >= 0.15
+
+
+def test_async_client_caps_connections_per_host(fake_engine, slow_server):
+    async def run():
+        pool = PoolConfig(max_connections_per_host=2)
+        async with AsyncAresClient(browser_engine="fake", max_clients=10, connection_pool=pool) as client:
+            await client.get(slow_server.url("/"))
+            start = time.perf_counter()
+            await asyncio.gather(*(client.get(slow_server.url("/")) for _ in range(8)))
+            return time.perf_counter() - start, client.connection_stats("127.0.0.1")
+
+    elapsed, stats = asyncio.run(run())
+    assert elapsed >= 0.2
+    assert stats["requests"] == 9 and stats["new_connections"] <= 2
+
+
+def test_http2_requests_are_multiplexed():
+    pytest.importorskip("h2")
+
+    async def run(server):
+        engine = AsyncCurlEngine(max_clients=10, pool=PoolConfig(max_connections_per_host=1))
+        try:
+            kwargs = {"http_version": CurlHttpVersion.V2_PRIOR_KNOWLEDGE}
+            await engine.request("GET", server.url("/"), **kwargs)
+            start = time.perf_counter()
+            await asyncio.gather(*(engine.request("GET", server.url("/"), **kwargs) for _ in range(8)))
+            return time.perf_counter() - start, engine.connection_stats.snapshot()
+        finally:
+            await engine.close()
+
+    with BenchServer(latency=0.05, http2=True) as server:
+        elapsed, stats = asyncio.run(run(server))
+    # One connection, yet the requests run concurrently as streams
+    assert stats["new_connections"] == 1 and stats["http_versions"] == {"2": 9}
+    assert elapsed < 0.3
+
+
+def test_pool_config_maps_to_curl_options():
+    pool = PoolConfig(
+        max_connections=20,
+        max_connections_per_host=4,
+        idle_timeout=30,
+        max_lifetime=300,
+        http2=True,
+        max_concurrent_streams=50,
+        tcp_keepalive=15,
+    )
+    options = pool.curl_options()
+    assert options[CurlOpt.MAXCONNECTS] == 20
+    assert options[CurlOpt.MAXAGE_CONN] == 30 and options[CurlOpt.MAXLIFETIME_CONN] == 300
+    assert options[CurlOpt.HTTP_VERSION] == CurlHttpVersion.V2TLS and options[CurlOpt.PIPEWAIT] == 1
+    assert options[CurlOpt.TCP_KEEPIDLE] == 15
+    multi = pool.multi_options()
+    assert multi[CurlMOpt.MAX_TOTAL_CONNECTIONS] == 20 and multi[CurlMOpt.MAX_HOST_CONNECTIONS] == 4
+    assert multi[CurlMOpt.MAX_CONCURRENT_STREAMS] == 50
+
+    assert CurlOpt.PIPEWAIT not in PoolConfig(http2=False).curl_options()
+    assert PoolConfig().curl_options() == {}
+    with pytest.raises(ValueError):
+        PoolConfig(max_connections=0)
+
+
+class RecordingLib:
+    """Forward curl_multi_setopt to libcurl and count the calls."""
+
+    def __init__(self, lib):
+        self.lib = lib
+        self.calls = 0
+
+    def curl_multi_setopt(self, curlm, option, value):
+        self.calls += 1
+        return self.lib.curl_multi_setopt(curlm, option, value)
+
+
+def test_every_multi_handle_is_configured(http_server, monkeypatch):
+    """A replacement AsyncCurl gets the pool settings too; a missing private API is skipped."""
+    recorder = RecordingLib(curl_module.lib)
+    monkeypatch.setattr(curl_module, "lib", recorder)
+    pool = PoolConfig(max_connections=2)
+    per_handle = len(pool.multi_options())
+
+    async def run():
+        engine = AsyncCurlEngine(pool=pool)
+        try:
+            await engine.request("GET", http_server)
+            await engine.request("GET", http_server)
+            assert recorder.calls == per_handle
+            # As when the session moves to another event loop
+            await engine.session.acurl.close()
+            engine.session._acurl = None
+            await engine.request("GET", http_server)
+            assert recorder.calls == 2 * per_handle
+
+            monkeypatch.setattr(curl_module, "lib", None)
+            await engine.session.acurl.close()
+            engine.session._acurl = None
+            assert (await engine.request("GET", http_server)).status_code == 200
+        finally:
+            await engine.close()
+
+    asyncio.run(run())
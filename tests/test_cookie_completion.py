@@ -0,0 +1,65 @@
+"""
+Tests for cookie-based challenge completion.
+"""
+
+import threading
+import time
+
+from cf_ares.engines import UndetectedEngine
+from cf_ares.engines.challenge import cookie_state, wait_for_cookie
+
+
+class CookieDriver:
+    """Driver stub that is issued the clearance cookie after a few checks."""
+
+    def __init__(self, issue_after, stale=None):
+        self.issue_after = issue_after
+        self.stale = stale
+        self.checks = 0
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.checks += 1
+        if self.checks > self.issue_after:
+            return {"cookies": [{"name": "cf_clearance", "value": "fresh", "expires": 2000.0}]}
+        if self.stale is not None:
+            return {"cookies": [{"name": "cf_clearance", "value": self.stale, "expires": 1000.0}]}
+        return {"cookies": []}
+
+    def execute_script(self, script, *args):
+        return {"ready": "loading", "challenge": True, "error": None}
+
+
+def test_wait_returns_once_cookie_is_issued():
+    """The wait ends on the first check that sees the cookie."""
+    driver = CookieDriver(issue_after=3)
+    timings = wait_for_cookie(driver, "https://example.com/", "cf_clearance", timeout=5, poll_frequency=0.01)
+    assert driver.checks == 4
+    assert timings["solve"] < 1
+
+
+def test_stale_cookie_does_not_end_the_wait():
+    """A clearance cookie left over from an earlier visit is not a solved challenge."""
+    driver = CookieDriver(issue_after=4, stale="old")
+    previous = cookie_state(driver, "https://example.com/", "cf_clearance")
+    assert previous == ("old", 1000.0)
+    wait_for_cookie(
+        driver, "https://example.com/", "cf_clearance", timeout=5, poll_frequency=0.01, previous=previous
+    )
+    assert driver.checks == 5
+
+
+def test_network_event_wakes_the_wait_early():
+    """A Set-Cookie seen on the Network domain wakes the waiter before its poll interval."""
+    engine = UndetectedEngine(completion="cookie", ready_cookies={"example.com": "session_ok"})
+    engine._target_url = "https://api.example.com/"
+    assert engine.get_ready_cookie(engine._target_url) == "session_ok"
+    assert engine.get_ready_cookie("https://other.org/") == "cf_clearance"
+
+    driver = CookieDriver(issue_after=1)
+    event = engine._cookie_event
+    threading.Timer(0.05, engine._on_response_extra_info, args=(
+        {"params": {"headers": {"set-cookie": "a=1; Path=/\nsession_ok=x; Path=/"}}},
+    )).start()
+    start = time.perf_counter()
+    wait_for_cookie(driver, engine._target_url, "cf_clearance", timeout=5, poll_frequency=10, cookie_event=event)
+    assert time.perf_counter() - start < 2
@@ -0,0 +1,61 @@
+"""
+Tests for subdomain-aware session lookup.
+"""
+
+import pytest
+
+from cf_ares.utils import SessionManager, SQLiteSessionStore
+from cf_ares.utils.domain import DomainIndex, candidate_scopes, normalize_host
+
+
+@pytest.mark.parametrize(
+    "url, host",
+    [
+        ("https://Example.COM:443/path", "example.com"),
+        ("http://example.com:80", "example.com"),
+        ("https://example.com.:8443/", "example.com"),
+        ("http://[::1]:8080/", "::1"),
+        ("api.example.com", "api.example.com"),
+    ],
+)
+def test_normalize_host(url, host):
+    assert normalize_host(url) == host
+
+
+def test_index_returns_covering_scopes_most_specific_first():
+    index = DomainIndex()
+    for scope in [".example.com", "api.example.com", ".api.example.com", "example.org"]:
+        index.add(scope)
+
+    assert index.lookup("api.example.com") == ["api.example.com", ".api.example.com", ".example.com"]
+    assert index.lookup("www.example.com") == [".example.com"]
+    assert index.lookup("example.com") == [".example.com"]
+    assert index.lookup("notexample.com") == []
+    assert index.lookup("www.example.org") == []
+
+    index.remove(".example.com")
+    assert index.lookup("www.example.com") == []
+    assert candidate_scopes("api.example.com") == ["api.example.com", ".api.example.com", ".example.com"]
+    assert candidate_scopes("127.0.0.1") == ["127.0.0.1"]
+
+
+def test_one_solve_covers_all_hosts_in_cookie_scope(tmp_path):
+    """A domain cookie session serves every subdomain and port, also for other workers."""
+    path = str(tmp_path / "sessions.db")
+    with SQLiteSessionStore(path) as first_store, SQLiteSessionStore(path) as second_store:
+        solver = SessionManager(store=first_store)
+        solver.update(
+            "https://www.example.com/login",
+            {"cf_clearance": "token"},
+            {"User-Agent": "ua"},
+            cookie_domains={"cf_clearance": ".example.com"},
+        )
+        solver.update("https://host-only.example.net", {"cf_clearance": "x"}, {}, cookie_domains={"cf_clearance": "host-only.example.net"})
+
+        for manager in (solver, SessionManager(store=second_store)):
+            assert manager.get_cookies("https://api.example.com:443/v1") == {"cf_clearance": "token"}
+            assert manager.has_valid_session("http://example.com")
+            assert not manager.has_valid_session("https://example.org")
+            assert not manager.has_valid_session("https://www.host-only.example.net")
+
+        assert sorted(solver.sessions) == [".example.com", "host-only.example.net"]
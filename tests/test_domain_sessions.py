@@ -0,0 +1,25 @@
+"""
+Tests for per-domain session binding in the curl engine.
+"""
+
+from cf_ares import AresClient
+
+
+def test_sessions_are_scoped_to_their_host(http_server):
+    """Each host only receives its own cookies and session headers."""
+    other_host = http_server.replace("127.0.0.1", "localhost")
+    with AresClient() as client:
+        client.set_session_info({"cookies": {"a": "1"}, "headers": {"X-Site": "ip"}, "url": http_server})
+        client.set_session_info({"cookies": {"b": "2"}, "headers": {"X-Site": "name"}, "url": other_host})
+
+        ip_headers = client.get(http_server).json()["headers"]
+        name_headers = client.get(other_host).json()["headers"]
+
+        assert ip_headers["Cookie"] == "a=1" and ip_headers["X-Site"] == "ip"
+        assert name_headers["Cookie"] == "b=2" and name_headers["X-Site"] == "name"
+
+        # Re-binding a host replaces its session instead of accumulating
+        client.set_session_info({"cookies": {"c": "3"}, "headers": {}, "url": http_server})
+        ip_headers = client.get(http_server, headers={"X-Extra": "1"}).json()["headers"]
+        assert ip_headers["Cookie"] == "c=3"
+        assert "X-Site" not in ip_headers and ip_headers["X-Extra"] == "1"
@@ -0,0 +1,37 @@
+"""
+Tests for on-demand browser launch and idle shutdown.
+"""
+
+import time
+
+from cf_ares import AresClient
+
+
+def test_browser_not_created_without_challenge(fake_engine, http_server):
+    """Restored sessions never create or launch a browser."""
+    with AresClient(browser_engine="fake") as client:
+        client.set_session_info({"cookies": {"a": "1"}, "headers": {}, "url": http_server})
+        client.get_session_info()
+        assert client.get(http_server).status_code == 200
+        assert client._browser_engine is None
+    assert fake_engine.instances == []
+
+
+def test_browser_launched_on_solve_and_closed_when_idle(fake_engine, http_server):
+    """The browser starts on the first solve and stops after the idle timeout."""
+    client = AresClient(browser_engine="fake", browser_idle_timeout=0.1)
+    try:
+        client.get(http_server)
+        engine = fake_engine.instances[0]
+        assert engine.launches == 1 and engine.is_running
+
+        deadline = time.monotonic() + 2
+        while engine.is_running and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert not engine.is_running
+
+        client._session_manager.clear()
+        client.get(http_server)
+        assert engine.launches == 2
+    finally:
+        client.close()
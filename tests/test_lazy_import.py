@@ -0,0 +1,32 @@
+"""
+Tests for lazy loading of browser engines.
+"""
+
+import subprocess
+import sys
+
+from cf_ares.engines import get_engine_class
+
+BROWSER_PACKAGES = ("selenium", "seleniumbase", "undetected_chromedriver")
+
+
+def test_import_does_not_load_browser_stacks():
+    """Importing cf_ares must not pull in selenium or undetected-chromedriver."""
+    code = (
+        "import cf_ares, sys; "
+        "loaded = {name.split('.')[0] for name in sys.modules}; "
+        "print(sorted(loaded & set(sys.argv[1:])))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code, *BROWSER_PACKAGES],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert output.strip() == "[]"
+
+
+def test_engine_registry_resolves_lazily():
+    """Engines are resolved by name on first use."""
+    engine_class = get_engine_class("undetected")
+    assert engine_class.__name__ == "UndetectedEngine"
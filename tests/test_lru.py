@@ -0,0 +1,61 @@
+"""
+Tests for the bounded session cache.
+"""
+
+import threading
+import time
+
+from cf_ares.utils import SessionManager
+from cf_ares.utils.lru import StripedLRU
+from cf_ares.utils.session import SessionRecord
+
+
+def test_lru_evicts_and_expires():
+    """Entries beyond capacity are evicted LRU-first and expired ones are purged."""
+    removed = []
+    cache = StripedLRU(max_entries=3, stripes=1, on_remove=removed.append)
+    for key in "abc":
+        cache.set(key, key.upper())
+    cache.get("a")
+    cache.set("d", "D")
+    assert removed == ["b"]
+    assert sorted(cache.keys()) == ["a", "c", "d"]
+
+    cache.set("e", "E", expires=time.time() - 1)
+    assert cache.get("e") is None
+    cache.set("c", "C", expires=time.time() + 0.05)
+    time.sleep(0.06)
+    assert cache.purge() == 1
+    assert sorted(cache.items()) == ["a", "d"]
+
+
+def test_session_manager_is_bounded():
+    """Tens of thousands of hosts never grow the manager past max_sessions."""
+    manager = SessionManager(max_sessions=64)
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(2000):
+                url = f"https://host{offset}-{i}.example"
+                manager.update(url, {"cf_clearance": str(i)}, {})
+                manager.has_valid_session(url)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(manager._cache) <= 64
+    assert len(manager.sessions) <= 64
+    assert not manager.has_valid_session("https://host0-0.example")
+    assert manager._index.lookup("host0-0.example") == []
+
+    manager.update("https://last.example", {"cf_clearance": "1999"}, {})
+    record = manager.get("https://last.example")
+    assert isinstance(record, SessionRecord) and not hasattr(record, "__dict__")
+    assert record["cookies"] == {"cf_clearance": "1999"} and dict(record)["cookie_expiry"] == {}
@@ -0,0 +1,80 @@
+"""
+Tests for request timings and the metrics registry.
+"""
+
+import socket
+
+import pytest
+
+from cf_ares import AresClient
+from cf_ares.exceptions import RequestError
+from cf_ares.utils.metrics import Histogram, RequestTimings, to_prometheus
+from cf_ares.utils.retry import RetryPolicy
+
+
+def test_responses_carry_timings(fake_engine, http_server):
+    with AresClient(browser_engine="fake") as client:
+        first = client.post(http_server, data="x" * 100)
+        second = client.get(http_server)
+
+    timings = first.timings
+    assert timings.total >= timings.starttransfer >= timings.connect > 0
+    assert timings.bytes_sent > 100 and timings.bytes_received > len(first.content)
+    assert timings.new_connections == 1
+    assert second.timings.new_connections == 0
+    assert set(timings.phases()) == {"dns", "connect", "tls", "server", "transfer", "total"}
+
+
+def test_registry_aggregates_per_host_and_method(fake_engine, http_server):
+    with AresClient(browser_engine="fake") as client:
+        for _ in range(3):
+            client.get(http_server)
+        client.post(http_server, data="x")
+        metrics = client.metrics
+
+    assert metrics.histogram("127.0.0.1", "GET").count == 3
+    assert metrics.histogram("127.0.0.1", "POST", "server").count == 1
+    assert metrics.responses[("127.0.0.1", "GET", "200")] == 3
+    assert metrics.connections["127.0.0.1"] == 1
+    assert metrics.bytes_received["127.0.0.1"] > metrics.bytes_sent["127.0.0.1"] > 0
+
+
+def test_errors_are_counted_by_class(fake_engine):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    url = f"http://127.0.0.1:{port}/"
+    client = AresClient(browser_engine="fake", retry_policy=RetryPolicy(max_retries=1, backoff_factor=0.001))
+    client.set_session_info({"cookies": {"cf_clearance": "x"}, "headers": {}}, url)
+    with client:
+        with pytest.raises(RequestError):
+            client.get(url)
+    assert client.metrics.errors == {("127.0.0.1", "GET", "COULDNT_CONNECT"): 2}
+
+
+def test_prometheus_export(fake_engine, http_server):
+    with AresClient(browser_engine="fake") as client:
+        client.get(http_server)
+        text = to_prometheus(client.metrics)
+
+    assert "# TYPE cf_ares_request_duration_seconds histogram" in text
+    assert 'cf_ares_request_duration_seconds_bucket{host="127.0.0.1",method="GET",phase="total",le="+Inf"} 1' in text
+    assert 'cf_ares_responses_total{host="127.0.0.1",method="GET",status="200"} 1' in text
+    assert text.endswith("\n")
+
+
+def test_histogram_buckets():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+
+
+def test_phases_of_a_reused_connection():
+    timings = RequestTimings(pretransfer=0.001, starttransfer=0.05, total=0.06)
+    phases = timings.phases()
+    assert phases["dns"] == phases["connect"] == phases["tls"] == 0.0
+    assert phases["server"] == pytest.approx(0.049)
+    assert phases["transfer"] == pytest.approx(0.01)
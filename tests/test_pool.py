@@ -0,0 +1,110 @@
+"""
+Tests for the warm browser pool.
+"""
+
+import threading
+import time
+
+import pytest
+
+from cf_ares import AresClient
+from cf_ares.engines import BrowserPool
+from cf_ares.exceptions import BrowserError, CloudflareError
+
+
+def test_pool_prelaunches_and_bounds_checkouts(fake_engine):
+    """All instances start up front and checkout blocks once the pool is exhausted."""
+    with BrowserPool("fake", size=2) as pool:
+        assert [e.launches for e in fake_engine.instances] == [1, 1]
+        first = pool.checkout()
+        second = pool.checkout()
+        assert first is not second
+        with pytest.raises(BrowserError):
+            pool.checkout(timeout=0.05)
+        pool.checkin(first)
+        assert pool.checkout(timeout=0.05) is first
+
+
+def test_pool_recycles_unhealthy_and_worn_out_engines(fake_engine):
+    """Dead or over-used browsers are replaced with fresh ones."""
+    with BrowserPool("fake", size=1, max_uses=2) as pool:
+        engine = pool.checkout()
+        engine.close()  # simulate a crashed browser
+        pool.checkin(engine)
+
+        replacement = pool.checkout()
+        assert replacement is not engine and replacement.is_running
+        pool.checkin(replacement)
+
+        pool.checkin(pool.checkout())  # second use hits max_uses
+        deadline = time.monotonic() + 2
+        while pool.stats["idle"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool.checkout() is not replacement
+        assert pool.stats["recycled"] == 2
+
+
+def test_clients_solve_concurrently_through_shared_pool(fake_engine, http_server):
+    """Solves for different clients run in parallel on different pooled browsers."""
+    active = []
+    peak = []
+    lock = threading.Lock()
+    original_wait = fake_engine.wait_for_cloudflare
+
+    def slow_wait(self):
+        with lock:
+            active.append(self)
+            peak.append(len(active))
+        time.sleep(0.1)
+        with lock:
+            active.remove(self)
+        return original_wait(self)
+
+    fake_engine.wait_for_cloudflare = slow_wait
+    try:
+        with BrowserPool("fake", size=3) as pool:
+            clients = [AresClient(browser_pool=pool) for _ in range(3)]
+            threads = [threading.Thread(target=c.get, args=(http_server,)) for c in clients]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert max(peak) == 3
+            assert all(c.get_session_info(http_server) for c in clients)
+            for client in clients:
+                client.close()
+    finally:
+        fake_engine.wait_for_cloudflare = original_wait
+
+
+def test_failed_solve_keeps_a_healthy_browser(fake_engine):
+    """Only browser failures discard the pooled instance, not unsolved challenges."""
+    with BrowserPool("fake", size=1) as pool:
+        with pytest.raises(CloudflareError):
+            with pool.engine() as engine:
+                raise CloudflareError("challenge not solved")
+        assert pool.checkout(timeout=0.05) is engine
+        pool.checkin(engine)
+
+        with pytest.raises(BrowserError):
+            with pool.engine() as engine:
+                raise BrowserError("session lost")
+        deadline = time.monotonic() + 2
+        while pool.stats["recycled"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool.checkout(timeout=2) is not engine
+
+
+def test_pool_inherits_client_browser_settings(fake_engine):
+    """Options the pool was not given come from the client, explicit ones win."""
+    with BrowserPool("fake", size=1, engine_kwargs={"headless": False}) as pool:
+        stale = fake_engine.instances[0]
+        client = AresClient(browser_pool=pool, proxy="http://127.0.0.1:8080", headless=True)
+        assert pool.engine_kwargs["proxy"] == "http://127.0.0.1:8080"
+        assert pool.engine_kwargs["headless"] is False
+
+        engine = pool.checkout()
+        assert engine is not stale and engine.proxy == "http://127.0.0.1:8080"
+        assert engine.headless is False
+        pool.checkin(engine)
+        client.close()
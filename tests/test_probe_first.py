@@ -0,0 +1,124 @@
+"""
+Tests for probe-first requests and the domain profile.
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from cf_ares import AresClient
+from cf_ares.utils.profile import CHALLENGED, CLEAN, DomainProfile
+
+
+class ChallengeHandler(BaseHTTPRequestHandler):
+    """Serve a Cloudflare-style interstitial unless the clearance cookie is sent."""
+
+    protocol_version = "HTTP/1.1"
+    unsolved_hits = 0
+
+    def do_GET(self) -> None:
+        solved = "cf_clearance=fake" in (self.headers.get("Cookie") or "")
+        if solved:
+            status, body = 200, b"<html>content</html>"
+        else:
+            type(self).unsolved_hits += 1
+            status, body = 503, b"<html><head><title>Just a moment...</title></head></html>"
+        self.send_response(status)
+        self.send_header("Server", "cloudflare")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def challenge_server():
+    ChallengeHandler.unsolved_hits = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ChallengeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_clean_hosts_never_start_a_browser(fake_engine, http_server, tmp_path):
+    profile = str(tmp_path / "profile.json")
+    with AresClient(browser_engine="fake", probe_first=True, domain_profile=profile) as client:
+        assert client.get(http_server).json()["method"] == "GET"
+        assert client.get(http_server).status_code == 200
+
+    assert fake_engine.instances == []
+    with open(profile, encoding="utf-8") as f:
+        assert json.load(f)["hosts"]["127.0.0.1"][0] == "clean"
+
+
+def test_challenged_hosts_escalate_and_are_remembered(fake_engine, challenge_server, tmp_path):
+    profile = str(tmp_path / "profile.json")
+    with AresClient(browser_engine="fake", probe_first=True, domain_profile=profile) as client:
+        response = client.get(challenge_server)
+    assert response.text == "<html>content</html>"
+    assert ChallengeHandler.unsolved_hits == 1
+    assert len(fake_engine.instances[0].visits) == 1
+
+    # A new client trusts the saved profile and skips the wasted probe
+    with AresClient(browser_engine="fake", probe_first=True, domain_profile=profile) as client:
+        assert client.get(challenge_server).status_code == 200
+    assert ChallengeHandler.unsolved_hits == 1
+
+
+def test_profile_writes_are_batched_off_the_caller(tmp_path):
+    path = str(tmp_path / "profile.json")
+    profile = DomainProfile(path, flush_delay=0.2)
+    for i in range(50):
+        profile.record(f"host{i}.example", CLEAN)
+    # Recording never touches the disk itself
+    assert not os.path.exists(path)
+
+    deadline = time.monotonic() + 5
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    with open(path, encoding="utf-8") as f:
+        assert len(json.load(f)["hosts"]) == 50
+
+    profile.record("late.example", CHALLENGED)
+    profile.close()
+    assert DomainProfile(path).get("late.example") == CHALLENGED
+
+
+def test_profile_skips_malformed_entries(tmp_path):
+    path = tmp_path / "profile.json"
+    now = time.time()
+    path.write_text(
+        json.dumps(
+            {
+                "hosts": {
+                    "good.example": ["clean", now],
+                    "short.example": ["clean"],
+                    "number.example": 5,
+                    "time.example": ["challenged", "soon"],
+                    "outcome.example": ["unknown", now],
+                    "stale.example": ["clean", now - 10 * 86400],
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    profile = DomainProfile(str(path))
+    assert profile.get("good.example") == CLEAN
+    for host in ("short", "number", "time", "outcome", "stale"):
+        assert profile.get(f"{host}.example") is None
+
+
+@pytest.mark.parametrize("content", ["[]", '{"hosts": []}', "not json"])
+def test_profile_ignores_a_malformed_file(tmp_path, content):
+    path = tmp_path / "profile.json"
+    path.write_text(content, encoding="utf-8")
+    assert DomainProfile(str(path)).get("good.example") is None
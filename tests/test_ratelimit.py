@@ -0,0 +1,141 @@
+"""
+Tests for per-host rate limiting.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cf_ares import AresClient
+from cf_ares.utils.ratelimit import AsyncRateLimiter, RateLimit, RateLimiter
+from cf_ares.utils.store import SQLiteSessionStore
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = b""
+
+
+def test_rate_and_burst_are_enforced():
+    limiter = RateLimiter(RateLimit(rate=20, burst=2))
+    start = time.monotonic()
+    for _ in range(6):
+        with limiter.limit("example.com"):
+            pass
+    # Two requests go at once, the other four 50 ms apart
+    assert 0.18 <= time.monotonic() - start < 1.0
+
+
+def test_domain_limits_are_shared_by_subdomains():
+    limiter = RateLimiter(hosts={".example.com": RateLimit(rate=1)}, default=RateLimit(concurrency=4))
+    assert limiter.resolve("api.example.com") == (".example.com", limiter.hosts[".example.com"])
+    assert limiter.resolve("example.com")[0] == ".example.com"
+    assert limiter.resolve("other.org")[0] == "other.org"
+    assert RateLimiter().resolve("other.org") == (None, None)
+
+
+def test_concurrency_cap():
+    limiter = RateLimiter(RateLimit(concurrency=2))
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def work(_):
+        with limiter.limit("example.com"):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(work, range(16)))
+    assert max(peak) == 2
+
+
+def test_refused_responses_slow_the_host_down():
+    limiter = RateLimiter(RateLimit(rate=100), recovery=0.25)
+    limiter.feedback("example.com", Response(429, {"Retry-After": "1"}))
+    assert limiter.factor("example.com") == 0.5
+
+    # The Retry-After pause is applied to the schedule
+    start = time.monotonic()
+    with limiter.limit("example.com"):
+        pass
+    assert time.monotonic() - start >= 0.9
+
+    # Challenges do not count as overload
+    limiter.feedback("example.com", Response(503, {"Server": "cloudflare", "cf-mitigated": "challenge"}))
+    assert limiter.factor("example.com") == 0.5
+    limiter.feedback("example.com", Response(200))
+    limiter.feedback("example.com", Response(200))
+    assert limiter.factor("example.com") == 1.0
+
+
+def test_schedules_are_shared_through_sqlite(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    with SQLiteSessionStore(path) as first, SQLiteSessionStore(path) as second:
+        limit = RateLimit(rate=10)
+        waits = [
+            RateLimiter(limit, store=store)._delay("example.com", limit)
+            for store in (first, second, first, second)
+        ]
+        assert first.keys() == []
+    # Each process sees the slots the other one reserved
+    assert waits[0] == 0.0
+    assert [round(w, 1) for w in waits[1:]] == [0.1, 0.2, 0.3]
+
+
+def test_async_concurrency_cap():
+    limiter = AsyncRateLimiter(RateLimit(concurrency=3))
+    active = []
+    peak = []
+
+    async def work():
+        async with limiter.limit("example.com"):
+            active.append(1)
+            peak.append(len(active))
+            await asyncio.sleep(0.01)
+            active.pop()
+
+    async def run():
+        await asyncio.gather(*(work() for _ in range(12)))
+
+    asyncio.run(run())
+    assert max(peak) == 3
+
+
+def test_async_limiter_reserves_shared_schedules_off_the_loop(tmp_path):
+    threads = []
+
+    class RecordingStore(SQLiteSessionStore):
+        def reserve(self, key, interval, burst=1):
+            threads.append(threading.current_thread())
+            return super().reserve(key, interval, burst)
+
+    with RecordingStore(str(tmp_path / "sessions.db")) as store:
+        limiter = AsyncRateLimiter(RateLimit(rate=1000), store=store)
+
+        async def run():
+            async with limiter.limit("example.com"):
+                pass
+            await limiter.afeedback("example.com", Response(429, {"Retry-After": "1"}))
+
+        asyncio.run(run())
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+    assert limiter.factor("example.com") == 0.5
+
+
+def test_client_requests_are_rate_limited(fake_engine, http_server):
+    limiter = RateLimiter(RateLimit(rate=20))
+    with AresClient(browser_engine="fake", rate_limiter=limiter) as client:
+        client.get(http_server)
+        start = time.monotonic()
+        for _ in range(3):
+            assert client.get(http_server).status_code == 200
+    assert time.monotonic() - start >= 0.13
@@ -0,0 +1,156 @@
+"""
+Tests for background session refresh.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from cf_ares import AresClient
+from cf_ares.utils import MemorySessionStore
+from cf_ares.utils import refresher as refresher_module
+
+
+def test_sessions_are_refreshed_before_expiry(fake_engine, http_server):
+    """A session nearing expiry is re-solved in the background while requests continue."""
+    with AresClient(browser_engine="fake", refresh_ahead=3600 - 0.3) as client:
+        client.get(http_server)
+        engine = fake_engine.instances[0]
+        first = client._session_manager.get(http_server)["timestamp"]
+
+        deadline = time.monotonic() + 5
+        while len(engine.visits) < 2 and time.monotonic() < deadline:
+            headers = client.get(http_server).json()["headers"]
+            assert headers["Cookie"] == "cf_clearance=fake"
+            time.sleep(0.05)
+
+        assert len(engine.visits) == 2
+        assert client._refresher.refreshes == 1
+        assert client._session_manager.get(http_server)["timestamp"] > first
+    assert client._refresher is None
+
+
+def test_refresh_obtains_a_new_clearance(fake_engine, http_server, monkeypatch):
+    """The refresh solve drops the browser's current clearance, so the session is extended."""
+    monkeypatch.setattr(fake_engine, "cookie_lifetime", 3600)
+    # Sessions are valid until the cookie expiry minus the 60 s margin
+    with AresClient(browser_engine="fake", refresh_ahead=3540 - 0.3) as client:
+        client.get(http_server)
+        engine = fake_engine.instances[0]
+        first = client.get_session_info(http_server)["cookie_expiry"]["cf_clearance"]
+
+        deadline = time.monotonic() + 5
+        while client._refresher.refreshes < 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        assert engine.cleared == [http_server]
+        assert client.get_session_info(http_server)["cookie_expiry"]["cf_clearance"] > first
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return predicate()
+
+
+def test_only_local_solves_are_tracked(fake_engine, http_server, tmp_path):
+    """Sessions from a shared store or an import are refreshed by whoever solved them."""
+    store = MemorySessionStore()
+    with AresClient(browser_engine="fake", session_store=store, refresh_ahead=60) as solver:
+        with AresClient(browser_engine="fake", session_store=store, refresh_ahead=60) as worker:
+            solver.get(http_server)
+            worker.get(http_server)
+            assert list(solver._refresher._tracked) == ["127.0.0.1"]
+            assert worker._refresher._tracked == {}
+
+            path = str(tmp_path / "session.json")
+            solver.save_session(path, http_server)
+            worker.load_session(path)
+            worker.set_session_info(solver.get_session_info(http_server), http_server)
+            assert worker._refresher._tracked == {}
+
+
+def test_one_worker_refreshes_a_shared_domain(fake_engine, http_server):
+    """Workers that solved the same domain take a store lease, so only one re-solves it."""
+    store = MemorySessionStore()
+    clients = [
+        AresClient(browser_engine="fake", session_store=store, refresh_ahead=3600 - 0.3) for _ in range(2)
+    ]
+    try:
+        for client in clients:
+            client.solve_challenge(http_server)
+        assert wait_until(lambda: sum(c._refresher.refreshes for c in clients) >= 1)
+        time.sleep(0.5)
+        for client in clients:
+            assert client.get(http_server).status_code == 200
+        assert sum(c._refresher.refreshes for c in clients) == 1
+    finally:
+        for client in clients:
+            client.close()
+
+
+def test_idle_sessions_are_not_refreshed(fake_engine, http_server, monkeypatch):
+    """A session no request used since its last solve is dropped instead of re-solved."""
+    monkeypatch.setattr(refresher_module, "RETRY_DELAY", 0.1)
+    with AresClient(browser_engine="fake", refresh_ahead=3600 - 0.3) as client:
+        client.get(http_server)
+        assert wait_until(lambda: client._refresher.refreshes == 1)
+        assert wait_until(lambda: client._refresher._tracked == {})
+        time.sleep(0.5)
+        assert client._refresher.refreshes == 1
+        assert len(fake_engine.instances[0].visits) == 2
+
+
+class HeadStatusHandler(BaseHTTPRequestHandler):
+    """Answer GET with 200 and HEAD with the server's head_headers and a 403."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def do_HEAD(self):
+        self.server.heads += 1
+        self.send_response(403)
+        for name, value in self.server.head_headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.mark.parametrize(
+    "head_headers, refreshed",
+    [
+        ({"Server": "cloudflare"}, False),
+        ({"Server": "cloudflare", "cf-mitigated": "challenge"}, True),
+    ],
+)
+def test_probe_only_refreshes_on_a_marked_challenge(fake_engine, head_headers, refreshed):
+    """An origin refusing HEAD behind Cloudflare does not look like a revoked session."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), HeadStatusHandler)
+    server.heads = 0
+    server.head_headers = head_headers
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+    try:
+        with AresClient(browser_engine="fake", refresh_ahead=60, refresh_probe_interval=0.05) as client:
+            client.get(url)
+            deadline = time.monotonic() + 5
+            while server.heads < 3 and time.monotonic() < deadline:
+                client.get(url)
+                client._refresher._wakeup.set()
+                time.sleep(0.05)
+            assert server.heads >= 3
+            assert (client._refresher.refreshes > 0) is refreshed
+    finally:
+        server.shutdown()
+        server.server_close()
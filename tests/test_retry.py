@@ -0,0 +1,152 @@
+"""
+Tests for the retry policy.
+"""
+
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from curl_cffi.requests.exceptions import RequestException
+
+from cf_ares import AresClient
+from cf_ares.exceptions import BrowserError, RequestError
+from cf_ares.utils.retry import (
+    RetryBudget,
+    RetryPolicy,
+    curl_error_code,
+    parse_retry_after,
+)
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Fail the first `failures` requests with `status`, then succeed."""
+
+    protocol_version = "HTTP/1.1"
+    failures = 2
+    status = 503
+    retry_after = "0"
+    hits = 0
+
+    def _respond(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        cls = type(self)
+        cls.hits += 1
+        failing = cls.hits <= cls.failures
+        body = b"busy" if failing else b"ok"
+        self.send_response(cls.status if failing else 200)
+        if failing and cls.retry_after is not None:
+            self.send_header("Retry-After", cls.retry_after)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def flaky_server():
+    FlakyHandler.failures, FlakyHandler.status, FlakyHandler.retry_after = 2, 503, "0"
+    FlakyHandler.hits = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def fast_policy(**kwargs):
+    kwargs.setdefault("backoff_factor", 0.001)
+    return RetryPolicy(**kwargs)
+
+
+def test_transient_statuses_are_retried(fake_engine, flaky_server):
+    with AresClient(browser_engine="fake", retry_policy=fast_policy()) as client:
+        response = client.get(flaky_server)
+    assert response.status_code == 200
+    assert response.text == "ok"
+    assert FlakyHandler.hits == 3
+
+
+def test_non_idempotent_requests_skip_gateway_retries(fake_engine, flaky_server):
+    FlakyHandler.status, FlakyHandler.retry_after = 502, None
+    with AresClient(browser_engine="fake", retry_policy=fast_policy()) as client:
+        assert client.post(flaky_server, data="x").status_code == 502
+        assert client.get(flaky_server).status_code == 200
+    assert FlakyHandler.hits == 3
+
+
+def test_long_retry_after_is_not_waited_for(fake_engine, flaky_server):
+    FlakyHandler.retry_after = "3600"
+    with AresClient(browser_engine="fake", retry_policy=fast_policy()) as client:
+        assert client.get(flaky_server).status_code == 503
+    assert FlakyHandler.hits == 1
+
+
+def test_budget_limits_retries_per_host(fake_engine, flaky_server):
+    FlakyHandler.failures = 100
+    policy = fast_policy(max_retries=5, budget=RetryBudget(ratio=0.0, max_tokens=2))
+    with AresClient(browser_engine="fake", retry_policy=policy) as client:
+        assert client.get(flaky_server).status_code == 503
+        assert client.get(flaky_server).status_code == 503
+    # Two retries in total, then only first attempts
+    assert FlakyHandler.hits == 4
+
+
+def test_max_retries_feeds_the_default_policy():
+    assert AresClient(max_retries=7).retry_policy.max_retries == 7
+
+
+def test_errors_are_classified_by_curl_code():
+    policy = RetryPolicy()
+    try:
+        try:
+            raise RequestException("Failed to connect", code=7)
+        except RequestException as e:
+            raise RequestError(f"Request failed: {e}") from e
+    except RequestError as e:
+        refused = e
+    timeout = RequestError("Request failed")
+    timeout.__cause__ = RequestException("Operation timed out", code=28)
+
+    assert curl_error_code(refused) == 7
+    assert policy.retryable_error(refused, "POST")
+    assert policy.retryable_error(timeout, "GET")
+    assert not policy.retryable_error(timeout, "POST")
+    assert not policy.retryable_error(RequestError("challenge captcha cloudflare"), "GET")
+    assert policy.retryable_error(BrowserError("Failed to visit URL"))
+
+
+def test_run_retries_errors_and_gives_up():
+    policy = fast_policy(max_retries=2)
+    calls = []
+
+    def solve():
+        calls.append(1)
+        raise BrowserError("crashed")
+
+    with pytest.raises(BrowserError):
+        policy.run(solve, "example.com")
+    assert len(calls) == 3
+
+
+def test_backoff_is_capped_and_jittered():
+    policy = RetryPolicy(backoff_factor=1.0, backoff_max=4.0, jitter=False)
+    assert [policy.backoff(n) for n in range(4)] == [1.0, 2.0, 4.0, 4.0]
+    jittered = RetryPolicy(backoff_factor=1.0, backoff_max=4.0)
+    assert all(0.0 <= jittered.backoff(3) <= 4.0 for _ in range(50))
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(formatdate(1000.0 + 30, usegmt=True), now=1000.0) == 30.0
+    assert parse_retry_after(formatdate(1000.0, usegmt=True), now=2000.0) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
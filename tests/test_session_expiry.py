@@ -0,0 +1,94 @@
+"""
+Tests for cookie-expiry-aware session validity.
+"""
+
+import time
+
+from cf_ares import AresClient
+from cf_ares.engines.base import split_cookie_records
+from cf_ares.utils import SessionManager
+
+URL = "https://example.com/page"
+
+
+def test_validity_follows_clearance_cookie_expiry():
+    """The earliest clearance cookie expiry, minus the margin, bounds a session."""
+    manager = SessionManager(session_ttl=3600, expiry_margin=60)
+    now = time.time()
+
+    manager.update(URL, {"cf_clearance": "x"}, {}, {"cf_clearance": now + 30})
+    assert not manager.has_valid_session(URL)
+
+    manager.update(URL, {"cf_clearance": "x", "_ga": "y"}, {}, {"cf_clearance": now + 600, "_ga": now + 10})
+    assert manager.has_valid_session(URL)
+    assert abs(manager.get_expiry(URL) - (now + 540)) < 1
+
+    # Without expiry metadata the fixed TTL still applies
+    manager.update(URL, {"cf_clearance": "x"}, {})
+    assert abs(manager.get_expiry(URL) - (now + 3600)) < 1
+
+    # expiry_cookies=None considers every cookie
+    strict = SessionManager(expiry_cookies=None, expiry_margin=0)
+    strict.update(URL, {"cf_clearance": "x", "_ga": "y"}, {}, {"cf_clearance": now + 600, "_ga": now + 10})
+    assert abs(strict.get_expiry(URL) - (now + 10)) < 1
+
+
+def test_saved_sessions_keep_cookie_expiry(tmp_path):
+    """Cookie expiry survives save_session/load_session, so stale files are not reused."""
+    path = str(tmp_path / "sessions.json")
+    fresh = time.time() + 3600
+    with AresClient() as client:
+        client.set_session_info({
+            "url": "https://fresh.example",
+            "cookies": {"cf_clearance": "a"},
+            "headers": {"User-Agent": "ua"},
+            "cookie_expiry": {"cf_clearance": fresh},
+        })
+        client.set_session_info({
+            "url": "https://stale.example",
+            "cookies": {"cf_clearance": "b"},
+            "headers": {"User-Agent": "ua"},
+            "cookie_expiry": {"cf_clearance": time.time() + 30},
+        })
+        client.save_session(path)
+
+    with AresClient() as client:
+        client.load_session(path)
+        manager = client._session_manager
+        assert manager.has_valid_session("https://fresh.example")
+        assert not manager.has_valid_session("https://stale.example")
+        assert client.get_session_info("https://fresh.example")["cookie_expiry"] == {"cf_clearance": fresh}
+
+
+class CookieReadsDriver:
+    """WebDriver stub that counts cookie reads."""
+
+    def __init__(self, cookies):
+        self.cookies = cookies
+        self.reads = 0
+
+    def get_cookies(self):
+        self.reads += 1
+        return self.cookies
+
+
+def test_solve_reads_browser_cookies_once(fake_engine, http_server, monkeypatch):
+    """Values, expiry and domains of a solve come from a single cookie read."""
+    expires = time.time() + 1800
+    driver = CookieReadsDriver([
+        {"name": "cf_clearance", "value": "c", "expiry": expires, "domain": ".127.0.0.1"},
+        {"name": "sid", "value": "s", "domain": "127.0.0.1"},
+    ])
+    assert split_cookie_records(driver.cookies) == (
+        {"cf_clearance": "c", "sid": "s"},
+        {"cf_clearance": expires},
+        {"cf_clearance": ".127.0.0.1", "sid": "127.0.0.1"},
+    )
+
+    monkeypatch.setattr(fake_engine, "get_cookie_records", lambda self: driver.get_cookies())
+    with AresClient(browser_engine="fake") as client:
+        client.get(http_server)
+        info = client.get_session_info(http_server)
+    assert driver.reads == 1
+    assert info["cookies"] == {"cf_clearance": "c", "sid": "s"}
+    assert info["cookie_expiry"] == {"cf_clearance": expires}
@@ -0,0 +1,319 @@
+"""
+Tests for the pluggable session stores.
+"""
+
+import socket
+import socketserver
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+
+import pytest
+
+from cf_ares import AresClient
+from cf_ares.exceptions import SessionError
+from cf_ares.utils import (
+    MemorySessionStore,
+    RedisSessionStore,
+    SessionManager,
+    SQLiteSessionStore,
+)
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    """Tiny in-process server for the subset of the Redis protocol the store uses."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), RespHandler)
+        self.lock = threading.Lock()
+        self.data = {}
+        self.subscribers = {}
+        # Commands received by name, seconds to stall before answering by name
+        self.calls = Counter()
+        self.delays = {}
+        self.connections = set()
+
+    def drop_connections(self):
+        """Close every client connection, as a server restart or idle timeout would."""
+        with self.lock:
+            connections, self.connections = list(self.connections), set()
+        for connection in connections:
+            connection.shutdown(socket.SHUT_RDWR)
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _write(self, value):
+        if value is None:
+            self.wfile.write(b"$-1\r\n")
+        elif isinstance(value, int):
+            self.wfile.write(b":%d\r\n" % value)
+        elif isinstance(value, list):
+            self.wfile.write(b"*%d\r\n" % len(value))
+            for item in value:
+                self._write(item)
+        elif value == "OK":
+            self.wfile.write(b"+OK\r\n")
+        else:
+            self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+
+    def _get(self, key):
+        entry = self.server.data.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.time():
+            del self.server.data[key]
+            return None
+        return entry[0] if entry else None
+
+    def handle(self):
+        with self.server.lock:
+            self.server.connections.add(self.request)
+        try:
+            self._serve()
+        except OSError:
+            pass
+        finally:
+            with self.server.lock:
+                for subscribers in self.server.subscribers.values():
+                    if self.wfile in subscribers:
+                        subscribers.remove(self.wfile)
+
+    def _serve(self):
+        server = self.server
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            name = args[0].upper()
+            with server.lock:
+                server.calls[name] += 1
+            time.sleep(server.delays.get(name, 0))
+            with server.lock:
+                if name == b"SET":
+                    options = [arg.upper() for arg in args[3:]]
+                    expires = None
+                    if b"PX" in options:
+                        expires = time.time() + int(options[options.index(b"PX") + 1]) / 1000
+                    if b"NX" in options and self._get(args[1]) is not None:
+                        reply = None
+                    else:
+                        server.data[args[1]] = (args[2], expires)
+                        reply = "OK"
+                elif name == b"GET":
+                    reply = self._get(args[1])
+                elif name == b"MGET":
+                    reply = [self._get(key) for key in args[1:]]
+                elif name == b"DEL":
+                    reply = sum(server.data.pop(key, None) is not None for key in args[1:])
+                elif name == b"SCAN":
+                    pattern = args[3].decode()
+                    keys = [k for k in list(server.data) if fnmatchcase(k.decode(), pattern) and self._get(k)]
+                    reply = [b"0", keys]
+                elif name == b"PUBLISH":
+                    subscribers = list(server.subscribers.get(args[1], []))
+                    for wfile in subscribers:
+                        message = [b"message", args[1], args[2]]
+                        wfile.write(b"*3\r\n" + b"".join(b"$%d\r\n%s\r\n" % (len(m), m) for m in message))
+                    reply = len(subscribers)
+                elif name == b"SUBSCRIBE":
+                    server.subscribers.setdefault(args[1], []).append(self.wfile)
+                    reply = [b"subscribe", args[1], 1]
+                else:
+                    reply = "OK"
+                self._write(reply)
+
+
+@pytest.fixture
+def resp_stand_in():
+    """Run the Redis-protocol stand-in and yield the server itself."""
+    server = RespStandIn()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def redis_url(server):
+    return f"redis://127.0.0.1:{server.server_address[1]}/0"
+
+
+@pytest.fixture
+def resp_server(resp_stand_in):
+    """Yield the URL of the Redis-protocol stand-in."""
+    return redis_url(resp_stand_in)
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store_pair(request, tmp_path):
+    """Two handles on the same backing store, as two workers would have."""
+    if request.param == "memory":
+        store = MemorySessionStore()
+        yield store, store
+        return
+    if request.param == "sqlite":
+        path = str(tmp_path / "sessions.db")
+        first, second = SQLiteSessionStore(path, poll_interval=0.05), SQLiteSessionStore(path, poll_interval=0.05)
+    else:
+        url = request.getfixturevalue("resp_server")
+        first, second = RedisSessionStore(url), RedisSessionStore(url)
+    try:
+        yield first, second
+    finally:
+        first.close()
+        second.close()
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_upsert_expiry_and_notification(store_pair):
+    """Writes through one handle are visible, expire and are announced on the other."""
+    writer, reader = store_pair
+    events = []
+    reader.subscribe(lambda key, record: events.append((key, record)))
+    time.sleep(0.1)
+
+    writer.set("example.com", {"cookies": {"a": "1"}, "headers": {}, "timestamp": 1.0}, ttl=60)
+    writer.set("example.com", {"cookies": {"a": "2"}, "headers": {}, "timestamp": 2.0}, ttl=60)
+    writer.set("short.example", {"cookies": {}, "headers": {}, "timestamp": 1.0}, ttl=0.05)
+
+    assert reader.get("example.com")["cookies"] == {"a": "2"}
+    assert wait_for(lambda: ("example.com", writer.get("example.com")) in events)
+
+    time.sleep(0.1)
+    assert reader.get("short.example") is None
+    assert list(reader.items()) == ["example.com"]
+
+    writer.delete("example.com")
+    assert reader.get("example.com") is None
+    assert reader.keys() == []
+
+
+def watcher_threads():
+    return [t for t in threading.enumerate() if t.name in ("cf-ares-sqlite-store", "cf-ares-redis-store")]
+
+
+def test_redis_never_resends_after_a_read_timeout(resp_stand_in):
+    """A command the server may already have run is not sent a second time."""
+    store = RedisSessionStore(redis_url(resp_stand_in), timeout=0.2)
+    try:
+        resp_stand_in.delays[b"SET"] = 0.5
+        with pytest.raises(SessionError):
+            store.set("example.com", {"cookies": {}, "headers": {}, "timestamp": 1.0})
+        assert resp_stand_in.calls[b"SET"] == 1
+
+        # The timed-out connection is discarded, not handed to the next caller
+        del resp_stand_in.delays[b"SET"]
+        time.sleep(0.4)
+        assert store.get("example.com")["timestamp"] == 1.0
+    finally:
+        store.close()
+
+
+def test_redis_replaces_dropped_connections(resp_stand_in):
+    """Idle connections the server closed are detected and replaced before sending."""
+    store = RedisSessionStore(redis_url(resp_stand_in))
+    try:
+        store.set("example.com", {"cookies": {}, "headers": {}, "timestamp": 1.0})
+        resp_stand_in.drop_connections()
+        time.sleep(0.05)
+        assert store.get("example.com")["timestamp"] == 1.0
+        assert resp_stand_in.calls[b"GET"] == 1
+    finally:
+        store.close()
+
+
+def test_redis_commands_use_a_connection_pool(resp_stand_in):
+    """Threads sharing a store run their round-trips side by side."""
+    store = RedisSessionStore(redis_url(resp_stand_in), max_connections=4)
+    try:
+        resp_stand_in.delays[b"GET"] = 0.2
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: store.get("example.com"), range(8)))
+        assert time.monotonic() - start < 1.2
+        assert len(resp_stand_in.connections) <= 4
+    finally:
+        store.close()
+
+
+def test_leases_have_one_owner(store_pair):
+    """A lease is held by the first claimant until it expires, across handles."""
+    first, second = store_pair
+    assert first.lease("refresh:example.com", "a", 60)
+    assert not second.lease("refresh:example.com", "b", 60)
+    assert second.lease("refresh:example.com", "a", 60)
+
+    assert first.lease("refresh:short.example", "a", 0.05)
+    time.sleep(0.1)
+    assert second.lease("refresh:short.example", "b", 60)
+    assert not first.lease("refresh:short.example", "a", 60)
+    # Leases are not session records
+    assert first.keys() == []
+
+
+def test_watcher_follows_listeners_across_reopen(store_pair):
+    """Closing and reopening managers never leaves more than one watcher or duplicate events."""
+    writer, reader = store_pair
+    events = []
+
+    def listener(key, record):
+        events.append(key)
+
+    shared = not isinstance(reader, MemorySessionStore)
+
+    managers = [SessionManager(store=reader) for _ in range(2)]
+    for _ in range(3):
+        for manager in managers:
+            manager.close()
+        assert wait_for(lambda: len(watcher_threads()) == 0)
+        for manager in managers:
+            manager.open()
+        assert len(watcher_threads()) == int(shared)
+
+    reader.subscribe(listener)
+    time.sleep(0.1)
+    writer.set("example.com", {"cookies": {}, "headers": {}, "timestamp": 1.0}, ttl=60)
+    assert wait_for(lambda: events)
+    time.sleep(0.2)
+    assert events == ["example.com"]
+
+    reader.unsubscribe(listener)
+    for manager in managers:
+        manager.close()
+    assert wait_for(lambda: len(watcher_threads()) == 0)
+
+
+def test_shared_store_serves_every_client(fake_engine, http_server, tmp_path):
+    """A session solved by one client is reused by another without a browser."""
+    path = str(tmp_path / "sessions.db")
+    with SQLiteSessionStore(path) as first_store, SQLiteSessionStore(path) as second_store:
+        with AresClient(browser_engine="fake", session_store=first_store) as first:
+            first.get(http_server)
+        with AresClient(browser_engine="fake", session_store=second_store) as second:
+            headers = second.get(http_server).json()["headers"]
+
+    assert len(fake_engine.instances) == 1
+    assert headers["Cookie"] == "cf_clearance=fake"
+    assert headers["User-Agent"] == "fake-browser"
@@ -0,0 +1,158 @@
+"""
+Tests for the shared DNS cache and curl handle reuse.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.server import BenchServer
+from cf_ares import AresClient, AsyncAresClient
+from cf_ares.engines.curl import AsyncCurlEngine, CurlEngine
+from cf_ares.utils.dns import DNSCache
+
+# Reserved TLD, so only the fake resolver can resolve it
+FAKE_HOST = "ares-bench.invalid"
+
+
+class FakeResolver:
+    """Resolve FAKE_HOST to the loopback address and count lookups."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, host, port):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if host != FAKE_HOST:
+            raise socket.gaierror(f"unknown host {host}")
+        return ["127.0.0.1"]
+
+
+def fake_url(base_url: str, path: str = "/") -> str:
+    return base_url.replace("127.0.0.1", FAKE_HOST) + path
+
+
+def test_engine_resolves_through_the_cache(http_server):
+    resolver = FakeResolver()
+    cache = DNSCache(resolver=resolver)
+    engine = CurlEngine(dns_cache=cache)
+    try:
+        responses = [engine.request("GET", fake_url(http_server, f"/{i}")) for i in range(3)]
+    finally:
+        engine.close()
+    assert [r.json()["headers"]["Host"].split(":")[0] for r in responses] == [FAKE_HOST] * 3
+    assert resolver.calls == 1
+    assert cache.stats() == {"hits": 2, "misses": 1, "failures": 0, "entries": 1}
+
+
+def test_engines_share_the_cache(http_server):
+    resolver = FakeResolver()
+    cache = DNSCache(resolver=resolver)
+    engines = [CurlEngine(dns_cache=cache) for _ in range(3)]
+    try:
+        for engine in engines:
+            assert engine.request("GET", fake_url(http_server)).status_code == 200
+    finally:
+        for engine in engines:
+            engine.close()
+    assert resolver.calls == 1
+
+
+def test_thread_safe_engine_reuses_warm_handles():
+    with BenchServer(latency=0.02) as server:
+        engine = CurlEngine(thread_safe=True, max_connections_per_host=3)
+        try:
+            with ThreadPoolExecutor(max_workers=12) as pool:
+                statuses = list(pool.map(lambda _: engine.request("GET", server.url("/")).status_code, range(24)))
+            stats = engine.shared_cache_stats()
+        finally:
+            engine.close()
+    assert statuses == [200] * 24
+    # Twelve threads, but never more than three requests and handles at once
+    assert stats["handles"]["created"] <= 3
+    assert stats["handles"]["created"] + stats["handles"]["reused"] == 24
+    assert stats["connections"]["new"] <= 3 and stats["connections"]["reused"] >= 21
+    assert stats["dns"] is None and stats["tls_handshakes"] == 0
+
+
+def test_concurrent_misses_resolve_once():
+    resolver = FakeResolver(delay=0.05)
+    cache = DNSCache(resolver=resolver)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        entries = list(pool.map(lambda _: cache.resolve_option(f"https://{FAKE_HOST}/"), range(8)))
+    assert entries == [f"{FAKE_HOST}:443:127.0.0.1"] * 8
+    assert resolver.calls == 1
+
+
+def test_resolve_option_formats_entries():
+    cache = DNSCache(ttl=0.05, resolver=lambda host, port: ["::1", "127.0.0.1"])
+    assert cache.resolve_option("http://example.test:8080/x") == "example.test:8080:[::1],127.0.0.1"
+    assert cache.resolve_option("http://127.0.0.1/") is None
+    assert cache.resolve_option("ftp://example.test/") is None
+
+    failing = DNSCache(resolver=FakeResolver())
+    assert failing.resolve_option("https://unknown.test/") == "-unknown.test:443"
+    assert failing.stats()["failures"] == 1
+
+    time.sleep(0.06)
+    cache.resolve_option("http://example.test:8080/")
+    assert cache.stats()["misses"] == 2
+
+
+def test_proxied_requests_skip_the_cache():
+    cache = DNSCache(resolver=FakeResolver())
+    proxied = CurlEngine(proxy="http://127.0.0.1:9", dns_cache=cache)
+    direct = CurlEngine(dns_cache=cache)
+    try:
+        assert not proxied._uses_dns_cache({})
+        assert not direct._uses_dns_cache({"proxies": {"https": "http://127.0.0.1:9"}})
+        assert direct._uses_dns_cache({})
+    finally:
+        proxied.close()
+        direct.close()
+
+
+def test_async_engine_resolves_through_the_cache(http_server):
+    resolver = FakeResolver()
+    cache = DNSCache(resolver=resolver)
+
+    async def run():
+        engine = AsyncCurlEngine(dns_cache=cache)
+        try:
+            responses = await asyncio.gather(*(engine.request("GET", fake_url(http_server)) for _ in range(5)))
+            return responses, engine.shared_cache_stats()
+        finally:
+            await engine.close()
+
+    responses, stats = asyncio.run(run())
+    assert all(r.status_code == 200 for r in responses)
+    assert stats["handles"] == {"created": 1, "reused": 4, "idle": 0}
+    assert resolver.calls == 1
+
+
+def test_clients_accept_the_process_wide_cache(fake_engine, http_server):
+    with AresClient(browser_engine="fake", dns_cache=True) as client:
+        client.get(http_server)
+        stats = client.shared_cache_stats()
+    assert stats["dns"] is not None and stats["handles"]["created"] == 1
+
+    async_client = AsyncAresClient(browser_engine="fake", dns_cache=True)
+    assert async_client.shared_cache_stats()["dns"] is not None
+    asyncio.run(async_client.close())
+
+
+@pytest.mark.parametrize("dns_cache", [None, False])
+def test_dns_cache_is_off_by_default(dns_cache):
+    engine = CurlEngine(dns_cache=dns_cache)
+    try:
+        assert engine.dns_cache is None
+    finally:
+        engine.close()
@@ -0,0 +1,122 @@
+"""
+Tests for single-flight challenge solving.
+"""
+
+import asyncio
+import threading
+import time
+
+from cf_ares import AresClient
+from cf_ares.exceptions import CloudflareError
+from cf_ares.utils import AsyncSingleFlight, SingleFlight
+
+
+def test_single_flight_shares_result_and_error():
+    """Concurrent callers share one execution, including its exception."""
+    group = SingleFlight()
+    calls = []
+    barrier = threading.Barrier(5)
+    results = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    def caller():
+        barrier.wait()
+        try:
+            group.do("key", work)
+        except ValueError as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=caller) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 5 and len({id(e) for e in results}) == 1
+    assert group.do("key", lambda: 42) == 42
+
+
+def test_async_single_flight_keeps_a_newer_call():
+    """A finished call does not remove the entry of a newer call for the same key."""
+
+    async def run():
+        group = AsyncSingleFlight()
+        gate = asyncio.Event()
+
+        async def newer():
+            await gate.wait()
+            return "new"
+
+        async def older():
+            # The key is handed to a newer call before this one finishes
+            del group._calls["key"]
+            waiter = asyncio.ensure_future(group.do("key", newer))
+            await asyncio.sleep(0)
+            return "old", waiter
+
+        result, waiter = await group.do("key", older)
+        await asyncio.sleep(0)
+        assert result == "old" and group.in_flight("key")
+        gate.set()
+        assert await waiter == "new"
+        await asyncio.sleep(0)
+        assert not group.in_flight("key")
+
+    asyncio.run(run())
+
+
+def test_concurrent_requests_trigger_one_solve(fake_engine, http_server):
+    """Many threads hitting an unsolved domain cause a single browser visit."""
+    original_wait = fake_engine.wait_for_cloudflare
+
+    def slow_wait(self):
+        time.sleep(0.1)
+        return original_wait(self)
+
+    fake_engine.wait_for_cloudflare = slow_wait
+    try:
+        with AresClient(browser_engine="fake") as client:
+            threads = [threading.Thread(target=client.get, args=(http_server,)) for _ in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(fake_engine.instances[0].visits) == 1
+    finally:
+        fake_engine.wait_for_cloudflare = original_wait
+
+
+def test_solve_failure_reaches_every_waiter(fake_engine, http_server):
+    """When the shared solve fails every caller sees the error."""
+    def failing_wait(self):
+        time.sleep(0.05)
+        raise CloudflareError("challenge failed")
+
+    original_wait = fake_engine.wait_for_cloudflare
+    fake_engine.wait_for_cloudflare = failing_wait
+    errors = []
+    barrier = threading.Barrier(4)
+
+    def call(client):
+        barrier.wait()
+        try:
+            client.get(http_server)
+        except CloudflareError as e:
+            errors.append(e)
+
+    try:
+        with AresClient(browser_engine="fake") as client:
+            threads = [threading.Thread(target=call, args=(client,)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert len(errors) == 4
+        assert len(fake_engine.instances[0].visits) == 1
+    finally:
+        fake_engine.wait_for_cloudflare = original_wait
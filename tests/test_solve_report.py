@@ -0,0 +1,89 @@
+"""
+Tests for challenge solve reports and per-domain solve statistics.
+"""
+
+import json
+
+import pytest
+
+from cf_ares import AresClient
+from cf_ares.exceptions import BrowserError, CloudflareChallengeFailed
+from cf_ares.utils.retry import RetryPolicy
+from cf_ares.utils.telemetry import SolveReport, SolveStats
+
+
+@pytest.fixture
+def flaky_engine(fake_engine, monkeypatch):
+    """Make the fake engine's first `failures` visits crash."""
+    original = fake_engine.get
+
+    def get(self, url):
+        original(self, url)
+        if len(self.visits) <= fake_engine.failures:
+            raise BrowserError("Failed to visit URL")
+
+    monkeypatch.setattr(fake_engine, "failures", 1, raising=False)
+    monkeypatch.setattr(fake_engine, "get", get)
+    return fake_engine
+
+
+def test_solve_challenge_attaches_report(fake_engine, http_server):
+    with AresClient(browser_engine="fake", solve_verification="get") as client:
+        response = client.solve_challenge(http_server)
+        info = client.get_session_info(http_server)
+
+    report = response.solve_report
+    assert report.outcome == "success" and report.retries == 0
+    assert list(report.phases) == ["acquire", "launch", "navigate", "detect", "wait", "extract", "verify"]
+    assert report.total == pytest.approx(sum(report.phases.values()))
+    assert info["solve_report"]["host"] == report.host
+    assert info["solve_report"]["phases"] == report.phases
+    json.dumps(info)
+
+
+def test_retries_accumulate_in_one_report(flaky_engine, http_server):
+    policy = RetryPolicy(backoff_factor=0.001)
+    with AresClient(browser_engine="fake", retry_policy=policy) as client:
+        report = client.solve_challenge(http_server).solve_report
+        stats = client.solve_stats.summary(report.host)
+    assert report.retries == 1 and report.outcome == "success"
+    assert stats["solves"] == 1 and stats["retries"] == 1
+    assert set(stats["phases"]) >= {"navigate", "verify", "total"}
+
+
+def test_failed_solve_is_recorded(flaky_engine, http_server):
+    flaky_engine.failures = 10
+    policy = RetryPolicy(backoff_factor=0.001)
+    with AresClient(browser_engine="fake", retry_policy=policy) as client:
+        with pytest.raises(CloudflareChallengeFailed) as excinfo:
+            client.solve_challenge(http_server, max_retries=2)
+        report = excinfo.value.solve_report
+        assert client.solve_stats.last(report.host) is report
+    assert report.outcome == "failure" and report.retries == 1
+    assert report.error.startswith("BrowserError")
+
+
+def test_implicit_solves_are_recorded(fake_engine, http_server):
+    with AresClient(browser_engine="fake") as client:
+        client.get(http_server)
+        assert client.get_session_info()["127.0.0.1"]["solve_report"]["outcome"] == "success"
+        assert client.solve_stats.histogram("127.0.0.1", "navigate").count == 1
+
+
+def test_stats_keep_a_rolling_window():
+    stats = SolveStats(window=3, max_domains=1)
+    for seconds in (1.0, 2.0, 3.0, 4.0):
+        report = SolveReport("https://a.example", "a.example")
+        report.add("wait", seconds)
+        stats.record(report.finish())
+    failed = SolveReport("https://a.example", "a.example")
+    stats.record(failed.finish(BrowserError("crashed")))
+
+    assert [r.phases.get("wait") for r in stats.reports("a.example")] == [3.0, 4.0, None]
+    summary = stats.summary("a.example")
+    assert summary["solves"] == 3 and summary["failures"] == 1
+    assert summary["phases"]["wait"]["mean"] == 3.5
+    assert stats.histogram("a.example", "wait").count == 2
+
+    stats.record(SolveReport("https://b.example", "b.example").finish())
+    assert stats.last("a.example") is None
@@ -0,0 +1,128 @@
+"""
+Tests for challenge detection and solve verification.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from cf_ares import AresClient
+from cf_ares.engines.base import BrowserPage
+from cf_ares.exceptions import CloudflareChallengeFailed
+from cf_ares.utils.detection import (
+    is_challenge_document,
+    is_challenge_response,
+    needs_body,
+)
+
+CF_HEADERS = {"Server": "cloudflare", "Content-Type": "text/html"}
+
+
+@pytest.mark.parametrize(
+    "status, headers, body, expected",
+    [
+        (200, CF_HEADERS, b"<html>Protected by Cloudflare</html>", False),
+        (503, CF_HEADERS, b"<html><head><title>Just a moment...</title>", True),
+        (403, {"cf-mitigated": "challenge"}, None, True),
+        (403, CF_HEADERS, None, False),
+        (403, {"Server": "nginx"}, b"<title>Just a moment...</title>", False),
+        (503, CF_HEADERS, b"x" * 10000 + b"cf_chl_", False),
+    ],
+)
+def test_challenge_classification(status, headers, body, expected):
+    """Classification uses status, headers and a bounded body prefix."""
+    assert is_challenge_response(status, headers, body) is expected
+
+
+def test_page_verification_skips_extra_request(fake_engine, http_server, monkeypatch):
+    """The default mode builds the response from the browser page without refetching."""
+    with AresClient(browser_engine="fake") as client:
+        calls = []
+        original = client._curl_engine.request
+        monkeypatch.setattr(client._curl_engine, "request", lambda *a, **k: calls.append(a) or original(*a, **k))
+
+        response = client.solve_challenge(http_server)
+        assert response.text == "<html>solved</html>"
+        assert calls == []
+
+        response = client.solve_challenge(http_server, verify="head")
+        assert response.status_code == 200
+        assert [c[0] for c in calls] == ["HEAD"]
+
+
+def test_page_verification_checks_the_snapshot(fake_engine, http_server, monkeypatch):
+    """A snapshot still showing the interstitial fails, an unfinished one falls back to HEAD."""
+    challenge = b"<html><head><title>Just a moment...</title></head></html>"
+    monkeypatch.setattr(fake_engine, "get_page", lambda self: BrowserPage(self.visits[-1], challenge))
+    with AresClient(browser_engine="fake") as client:
+        with pytest.raises(CloudflareChallengeFailed):
+            client.solve_challenge(http_server, max_retries=1)
+
+        calls = []
+        original = client._curl_engine.request
+        monkeypatch.setattr(client._curl_engine, "request", lambda *a, **k: calls.append(a) or original(*a, **k))
+        monkeypatch.setattr(
+            fake_engine, "get_page", lambda self: BrowserPage(self.visits[-1], challenge, complete=False)
+        )
+        response = client.solve_challenge(http_server, max_retries=1)
+        assert response.status_code == 200
+        assert [c[0] for c in calls] == ["HEAD"]
+
+
+def test_document_markers_ignore_injected_scripts():
+    """Regular pages with Cloudflare's injected scripts are not interstitials."""
+    assert not is_challenge_document(b'<html><script src="/cdn-cgi/challenge-platform/scripts/jsd/main.js">')
+    assert is_challenge_document(b"<html><head><title>Just a moment...</title>")
+    assert not is_challenge_document(b"")
+
+
+class HeadRefusingHandler(BaseHTTPRequestHandler):
+    """An origin behind Cloudflare that answers HEAD with 403; GET serves self.server.page."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status, body, send_body):
+        self.send_response(status)
+        self.send_header("Server", "cloudflare")
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self._reply(403, b"", False)
+
+    def do_GET(self):
+        self.server.gets += 1
+        self._reply(*self.server.page, True)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def head_refusing_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), HeadRefusingHandler)
+    server.gets = 0
+    server.page = (200, b"<html>content</html>")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_head_verification_falls_back_to_the_page(fake_engine, head_refusing_server):
+    """A Cloudflare-served 403 on HEAD is settled by the start of the page."""
+    url = f"http://127.0.0.1:{head_refusing_server.server_port}/"
+    assert needs_body(403, CF_HEADERS) and not needs_body(403, {"cf-mitigated": "challenge"})
+    with AresClient(browser_engine="fake") as client:
+        response = client.solve_challenge(url, max_retries=1, verify="head")
+        assert response.status_code == 403 and head_refusing_server.gets == 1
+
+        head_refusing_server.page = (403, b"<html><head><title>Just a moment...</title>" + b" " * 100000)
+        with pytest.raises(CloudflareChallengeFailed):
+            client.solve_challenge(url, max_retries=1, verify="head")
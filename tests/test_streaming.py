@@ -0,0 +1,213 @@
+"""
+Tests for streamed responses and file downloads.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from benchmarks.server import BenchServer
+from cf_ares import AresClient, AsyncAresClient
+from cf_ares.client import AresResponse
+from cf_ares.exceptions import RequestError, StreamConsumedError
+from cf_ares.utils.detection import is_challenge
+from cf_ares.utils.ratelimit import RateLimit, RateLimiter
+
+LINES = [f"event {i}".encode() for i in range(50)]
+
+
+class SlowLinesHandler(BaseHTTPRequestHandler):
+    """Send the first line at once and the rest a while later; /missing is a 404."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        body = b"\r\n".join(LINES) + b"\n"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        first, rest = body[:10], body[10:]
+        self.wfile.write(first)
+        self.wfile.flush()
+        time.sleep(0.3)
+        self.wfile.write(rest)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def slow_lines_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowLinesHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def bench_server():
+    with BenchServer() as server:
+        yield server
+
+
+def test_stream_returns_before_the_whole_body(fake_engine, slow_lines_server):
+    with AresClient(browser_engine="fake") as client:
+        client.get(slow_lines_server)
+        start = time.perf_counter()
+        with client.get(slow_lines_server, stream=True) as response:
+            headers_after = time.perf_counter() - start
+            lines = list(response.iter_lines())
+    assert response.status_code == 200 and headers_after < 0.25
+    assert lines == LINES
+
+
+def test_iter_content_rechunks_without_buffering(fake_engine, bench_server):
+    with AresClient(browser_engine="fake") as client:
+        response = client.get(bench_server.url("/?size=100000"), stream=True)
+        chunks = list(response.iter_content(4096))
+        assert [len(chunk) for chunk in chunks] == [4096] * 24 + [100000 - 24 * 4096]
+        with pytest.raises(StreamConsumedError):
+            response.content
+        assert response.raw.status_code == 200
+
+        # Reading content buffers a streamed body once, like a regular response
+        buffered = client.get(bench_server.url("/?size=1000"), stream=True)
+        assert len(buffered.content) == 1000 and buffered.text.startswith("cf-ares benchmark")
+        assert b"".join(buffered.iter_content(300)) == buffered.content
+
+
+def test_download_writes_in_bounded_memory(fake_engine, bench_server, tmp_path):
+    size = 16 * 1024 * 1024
+    target = tmp_path / "export.bin"
+    updates = []
+    with AresClient(browser_engine="fake") as client:
+        url = bench_server.url(f"/?size={size}")
+        # Warm up the session and the server's cached body outside the measurement
+        client.download(url, str(target))
+        tracemalloc.start()
+        try:
+            client.download(url, str(target), progress=lambda done, total: updates.append((done, total)))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    assert target.stat().st_size == size and not os.path.exists(f"{target}.part")
+    assert updates[-1] == (size, size) and len(updates) >= size // (64 * 1024)
+    assert peak < size // 2
+
+
+def test_failed_download_leaves_no_file(fake_engine, slow_lines_server, tmp_path):
+    target = tmp_path / "missing.bin"
+    with AresClient(browser_engine="fake") as client:
+        with pytest.raises(RequestError):
+            client.download(slow_lines_server + "missing", str(target))
+    assert not os.path.exists(target) and not os.path.exists(f"{target}.part")
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"max_connections_per_host": 1},
+        {"rate_limiter": RateLimiter(RateLimit(concurrency=1))},
+    ],
+)
+def test_stream_holds_its_slot_until_closed(fake_engine, bench_server, options):
+    url = bench_server.url("/?size=100000")
+    with AresClient(browser_engine="fake", thread_safe=True, **options) as client:
+        client.get(url)
+        done = threading.Event()
+
+        def second():
+            client.get(url)
+            done.set()
+
+        # Reading the body to the end releases the slot
+        streamed = client.get(url, stream=True)
+        worker = threading.Thread(target=second)
+        worker.start()
+        assert not done.wait(0.2)
+        assert len(streamed.content) == 100000
+        assert done.wait(2)
+        worker.join()
+
+        # So does closing the response without reading it
+        done.clear()
+        with client.get(url, stream=True):
+            worker = threading.Thread(target=second)
+            worker.start()
+            assert not done.wait(0.2)
+        assert done.wait(2)
+        worker.join()
+
+
+def test_streamed_responses_are_classified_without_reading():
+    class Streamed:
+        status_code = 403
+        headers = {"Server": "cloudflare", "cf-mitigated": "challenge"}
+        queue = object()
+
+        @property
+        def content(self):
+            raise AssertionError("body read")
+
+    class Unavailable(Streamed):
+        status_code = 503
+        headers = {"Server": "cloudflare"}
+
+    assert is_challenge(Streamed())
+    assert is_challenge(AresResponse(Streamed(), stream=True))
+    # Without the body, a Cloudflare-served error is not taken for a challenge
+    assert not is_challenge(Unavailable())
+    assert not is_challenge(AresResponse(Unavailable(), stream=True))
+
+
+class UnavailableHandler(BaseHTTPRequestHandler):
+    """Answer every request with the origin's own 503, proxied by Cloudflare."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"<html>maintenance</html>"
+        self.send_response(503)
+        self.send_header("Server", "cloudflare")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_streamed_origin_error_keeps_the_session(fake_engine):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), UnavailableHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+    try:
+        with AresClient(browser_engine="fake") as client:
+            client.solve_challenge(url)
+            with client.get(url, stream=True) as response:
+                assert response.status_code == 503
+            assert client._session_manager.get(url) is not None
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_async_client_rejects_stream(fake_engine):
+    async def run():
+        async with AsyncAresClient(browser_engine="fake") as client:
+            await client.get("http://127.0.0.1:9/", stream=True)
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
@@ -0,0 +1,64 @@
+"""
+Tests for the thread-safe curl engine mode.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cf_ares import AresClient
+from cf_ares.engines import CurlEngine
+
+
+def test_thread_pool_shares_one_client(http_server):
+    """A 32-worker pool drives one client while session state changes mid-flight."""
+    with AresClient(thread_safe=True) as client:
+        client.set_session_info({"cookies": {"cf_clearance": "ok"}, "headers": {}, "url": http_server})
+
+        def fetch(i):
+            if i % 10 == 0:
+                client._curl_engine.set_headers({"X-Batch": str(i)})
+            return client.get(f"{http_server}/{i}")
+
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            responses = list(pool.map(fetch, range(200)))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert all("cf_clearance=ok" in r.json()["headers"]["Cookie"] for r in responses)
+
+
+def test_max_connections_per_host_caps_concurrency():
+    """No more than max_connections_per_host requests reach one host at a time."""
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    class SlowHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            with lock:
+                state["active"] -= 1
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+    engine = CurlEngine(thread_safe=True, max_connections_per_host=3)
+    try:
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            statuses = list(pool.map(lambda _: engine.request("GET", url).status_code, range(24)))
+    finally:
+        engine.close()
+        server.shutdown()
+        server.server_close()
+
+    assert statuses == [200] * 24
+    assert state["peak"] == 3